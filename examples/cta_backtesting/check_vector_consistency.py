@@ -0,0 +1,87 @@
+"""
+Check vectorized backtesting of DoubleMaStrategy against event-driven
+backtesting, with random walk bars which gap at open so that orders are
+not always filled on next bar.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from vnpy.trader.constant import Exchange, Interval
+from vnpy.trader.object import BarData
+from vnpy.trader.columnar import create_history_array
+from vnpy.app.cta_strategy.vector_backtesting import VectorBacktestingEngine
+from vnpy.app.cta_strategy.strategies.double_ma_strategy import DoubleMaStrategy
+
+
+DAY_COUNT = 60
+BAR_COUNT = 240
+
+# Short windows have more signals on bars with orders still pending
+WINDOWS = [(3, 7), (5, 20), (10, 20), (10, 30)]
+
+
+def generate_bars() -> list:
+    """"""
+    random = np.random.default_rng(0)
+
+    bars = []
+    price = 4000.0
+    start = datetime(2020, 1, 1, 9)
+
+    for day in range(DAY_COUNT):
+        for n in range(BAR_COUNT):
+            open_price = round(price + random.normal(0, 3), 0)
+            close_price = round(open_price + random.normal(0, 2), 0)
+
+            bar = BarData(
+                symbol="IF",
+                exchange=Exchange.CFFEX,
+                datetime=start + timedelta(days=day, minutes=n),
+                interval=Interval.MINUTE,
+                open_price=open_price,
+                high_price=max(open_price, close_price) + abs(round(random.normal(0, 1))),
+                low_price=min(open_price, close_price) - abs(round(random.normal(0, 1))),
+                close_price=close_price,
+                volume=1,
+                gateway_name="DB"
+            )
+            bars.append(bar)
+
+            price = close_price
+
+    return bars
+
+
+def run_check() -> None:
+    """"""
+    engine = VectorBacktestingEngine()
+    engine.output = lambda msg: None
+    engine.set_parameters(
+        vt_symbol="IF.CFFEX",
+        interval="1m",
+        start=datetime(2020, 1, 1),
+        end=datetime(2020, 3, 1),
+        rate=0.3 / 10000,
+        slippage=0.2,
+        size=300,
+        pricetick=0.2,
+        capital=1_000_000,
+    )
+    engine.history_data = create_history_array(generate_bars())
+
+    for fast_window, slow_window in WINDOWS:
+        engine.clear_data()
+        engine.add_strategy(
+            DoubleMaStrategy,
+            {"fast_window": fast_window, "slow_window": slow_window}
+        )
+        engine.daily_df = None
+
+        diff_df = engine.check_consistency()
+        print(f"均线{fast_window}/{slow_window} 成交{len(engine.trades)}笔，结果不一致天数：{len(diff_df)}")
+
+
+if __name__ == "__main__":
+    run_check()
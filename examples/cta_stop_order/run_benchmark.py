@@ -0,0 +1,125 @@
+"""
+Micro-benchmark of checking local stop orders on every tick, with
+thousands of resting stop orders across hundreds of contracts.
+"""
+
+from datetime import datetime
+from random import Random
+from time import perf_counter
+
+from vnpy.event import EventEngine
+from vnpy.trader.constant import Direction, Exchange, Offset
+from vnpy.trader.engine import MainEngine
+from vnpy.trader.object import TickData
+from vnpy.app.cta_strategy.engine import CtaEngine
+from vnpy.app.cta_strategy.base import StopOrder, StopOrderBook
+
+
+SYMBOL_COUNT = 500
+ORDER_COUNT = 5000
+TICK_COUNT = 100000
+
+
+def check_stop_order_linear(stop_orders: dict, tick: TickData) -> list:
+    """
+    Previous implementation, scanning all stop orders on every tick.
+    """
+    triggered = []
+
+    for stop_order in list(stop_orders.values()):
+        if stop_order.vt_symbol != tick.vt_symbol:
+            continue
+
+        long_triggered = (
+            stop_order.direction == Direction.LONG and tick.last_price >= stop_order.price
+        )
+        short_triggered = (
+            stop_order.direction == Direction.SHORT and tick.last_price <= stop_order.price
+        )
+
+        if long_triggered or short_triggered:
+            triggered.append(stop_order.stop_orderid)
+
+    return triggered
+
+
+def generate_data():
+    """
+    Generate stop orders resting away from market price, and ticks
+    moving around market price.
+    """
+    random = Random(0)
+
+    symbols = [f"sym{n}" for n in range(SYMBOL_COUNT)]
+
+    stop_orders = {}
+    for n in range(ORDER_COUNT):
+        direction = random.choice([Direction.LONG, Direction.SHORT])
+        if direction == Direction.LONG:
+            price = 100 + random.randint(5, 50)
+        else:
+            price = 100 - random.randint(5, 50)
+
+        stop_order = StopOrder(
+            vt_symbol=f"{random.choice(symbols)}.LOCAL",
+            direction=direction,
+            offset=Offset.OPEN,
+            price=price,
+            volume=1,
+            stop_orderid=f"STOP.{n}",
+            strategy_name="",
+            datetime=datetime.now()
+        )
+        stop_orders[stop_order.stop_orderid] = stop_order
+
+    ticks = []
+    for n in range(TICK_COUNT):
+        tick = TickData(
+            symbol=random.choice(symbols),
+            exchange=Exchange.LOCAL,
+            datetime=datetime.now(),
+            last_price=100 + random.randint(-4, 4),
+            gateway_name="BENCHMARK"
+        )
+        ticks.append(tick)
+
+    return stop_orders, ticks
+
+
+def run_benchmark():
+    """"""
+    stop_orders, ticks = generate_data()
+
+    book = StopOrderBook()
+    for stop_order in stop_orders.values():
+        book.add(stop_order)
+
+    start = perf_counter()
+    for tick in ticks:
+        check_stop_order_linear(stop_orders, tick)
+    cost = perf_counter() - start
+    print(f"遍历全部停止单：{cost / TICK_COUNT * 1000000:.2f}微秒/Tick")
+
+    start = perf_counter()
+    for tick in ticks:
+        book.get_triggered(tick.vt_symbol, tick.last_price)
+    cost = perf_counter() - start
+    print(f"停止单索引查询：{cost / TICK_COUNT * 1000000:.2f}微秒/Tick")
+
+    # Full check_stop_order function of CtaEngine
+    main_engine = MainEngine(EventEngine())
+    cta_engine = CtaEngine(main_engine, main_engine.event_engine)
+    cta_engine.stop_orders = stop_orders
+    cta_engine.stop_order_book = book
+
+    start = perf_counter()
+    for tick in ticks:
+        cta_engine.check_stop_order(tick)
+    cost = perf_counter() - start
+    print(f"CtaEngine.check_stop_order：{cost / TICK_COUNT * 1000000:.2f}微秒/Tick")
+
+    main_engine.close()
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,73 @@
+"""
+Memory and allocation cost of holding and copying tick data, comparing
+slotted TickData with the same dataclass keeping attributes in __dict__.
+"""
+
+import tracemalloc
+from copy import copy
+from dataclasses import fields, make_dataclass
+from datetime import datetime
+from time import perf_counter
+
+from vnpy.trader.constant import Exchange
+from vnpy.trader.object import BaseData, TickData
+
+
+TICK_COUNT = 200000
+
+
+# Previous TickData without __slots__
+DictTickData = make_dataclass(
+    "DictTickData",
+    [(field.name, field.type, field) for field in fields(TickData)[1:]],
+    bases=(BaseData,),
+    namespace={"__post_init__": TickData.__post_init__}
+)
+
+
+def generate_tick(tick_class: type, n: int) -> BaseData:
+    """"""
+    return tick_class(
+        symbol=f"rb{2101 + n % 10}",
+        exchange=Exchange.SHFE,
+        datetime=datetime.now(),
+        volume=n,
+        last_price=3500.0 + n % 10,
+        bid_price_1=3499.0,
+        ask_price_1=3501.0,
+        bid_volume_1=10,
+        ask_volume_1=20,
+        gateway_name="CTP"
+    )
+
+
+def run_benchmark(tick_class: type) -> None:
+    """"""
+    name = tick_class.__name__
+
+    # Memory of holding ticks in cache
+    tracemalloc.start()
+    ticks = [generate_tick(tick_class, n) for n in range(TICK_COUNT)]
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"{name} 缓存{TICK_COUNT}条Tick内存：{memory / 1024 / 1024:.1f}MB，"
+          f"每条{memory / TICK_COUNT:.0f}字节")
+
+    # Time of creating and copying ticks
+    start = perf_counter()
+    for n in range(TICK_COUNT):
+        generate_tick(tick_class, n)
+    cost = (perf_counter() - start) / TICK_COUNT
+    print(f"{name} 创建耗时：{cost * 1000000:.2f}微秒")
+
+    start = perf_counter()
+    for tick in ticks:
+        copy(tick)
+    cost = (perf_counter() - start) / TICK_COUNT
+    print(f"{name} 复制耗时：{cost * 1000000:.2f}微秒")
+
+
+if __name__ == "__main__":
+    run_benchmark(DictTickData)
+    run_benchmark(TickData)
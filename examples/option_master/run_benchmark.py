@@ -0,0 +1,126 @@
+"""
+Latency of refreshing impv and greeks of a whole option chain on each
+underlying tick, with scalar and vectorized Black-76 pricing model.
+"""
+
+from datetime import datetime, timedelta
+from random import Random
+from time import perf_counter
+
+from vnpy.trader.constant import Exchange, OptionType, Product
+from vnpy.trader.object import ContractData, TickData
+from vnpy.app.option_master.base import PortfolioData
+from vnpy.app.option_master.pricing import black_76, black_76_vector
+
+
+STRIKE_COUNT = 50
+TICK_COUNT = 20
+
+
+def generate_contract(symbol: str, **kwargs) -> ContractData:
+    """"""
+    return ContractData(
+        symbol=symbol,
+        exchange=Exchange.CFFEX,
+        name=symbol,
+        product=Product.OPTION,
+        size=100,
+        pricetick=0.2,
+        gateway_name="CTP",
+        **kwargs
+    )
+
+
+def generate_tick(vt_symbol: str, bid_price: float, ask_price: float) -> TickData:
+    """"""
+    symbol, exchange_str = vt_symbol.split(".")
+
+    return TickData(
+        symbol=symbol,
+        exchange=Exchange(exchange_str),
+        datetime=datetime.now(),
+        last_price=(bid_price + ask_price) / 2,
+        bid_price_1=bid_price,
+        ask_price_1=ask_price,
+        gateway_name="CTP"
+    )
+
+
+def create_portfolio(pricing_model) -> PortfolioData:
+    """
+    Create portfolio with one chain of call and put options around
+    underlying price 4000, with quotes of 20% volatility.
+    """
+    random = Random(0)
+
+    portfolio = PortfolioData("IO")
+    expiry = datetime.now() + timedelta(days=60)
+
+    for n in range(STRIKE_COUNT):
+        strike = 3500 + n * 20
+
+        for option_type in [OptionType.CALL, OptionType.PUT]:
+            contract = generate_contract(
+                f"IO-{option_type.name}-{strike}",
+                option_strike=strike,
+                option_underlying="IO",
+                option_type=option_type,
+                option_expiry=expiry,
+                option_portfolio="IO",
+                option_index=str(strike)
+            )
+            portfolio.add_option(contract)
+
+    underlying = generate_contract("IF")
+    portfolio.set_chain_underlying("IO.CFFEX", underlying)
+    portfolio.set_interest_rate(0.03)
+    portfolio.set_pricing_model(pricing_model)
+
+    for option in portfolio.options.values():
+        price = black_76.calculate_price(
+            4000,
+            option.strike_price,
+            0.03,
+            option.time_to_expiry,
+            0.2,
+            option.option_type
+        )
+        spread = random.randint(1, 5) * 0.2
+        tick = generate_tick(option.vt_symbol, max(price - spread, 0.2), price + spread)
+        portfolio.update_tick(tick)
+
+    return portfolio
+
+
+def run_benchmark(name: str, pricing_model) -> PortfolioData:
+    """"""
+    portfolio = create_portfolio(pricing_model)
+
+    start = perf_counter()
+    for n in range(TICK_COUNT):
+        price = 4000 + n % 5 * 0.2
+        tick = generate_tick("IF.CFFEX", price - 0.2, price + 0.2)
+        portfolio.update_tick(tick)
+    cost = (perf_counter() - start) / TICK_COUNT
+
+    option_count = len(portfolio.options)
+    print(f"{name} 全链{option_count}个期权刷新耗时：{cost * 1000:.2f}毫秒")
+
+    return portfolio
+
+
+if __name__ == "__main__":
+    scalar_portfolio = run_benchmark("Black-76", black_76)
+    vector_portfolio = run_benchmark("Black-76(向量化)", black_76_vector)
+
+    # Check results of both models are the same
+    diff = 0
+    for vt_symbol, option in scalar_portfolio.options.items():
+        vector_option = vector_portfolio.options[vt_symbol]
+        diff = max(
+            diff,
+            abs(option.mid_impv - vector_option.mid_impv),
+            abs(option.cash_delta - vector_option.cash_delta),
+            abs(option.cash_vega - vector_option.cash_vega)
+        )
+    print(f"两种模型计算结果最大差异：{diff}")
@@ -0,0 +1,135 @@
+"""
+Throughput benchmark of RPC transport in pickle and fast mode.
+"""
+
+from datetime import datetime
+from multiprocessing import Process
+from threading import Event as Signal
+from time import perf_counter, sleep
+
+from vnpy.event import Event
+from vnpy.trader.constant import Exchange
+from vnpy.trader.event import EVENT_TICK
+from vnpy.trader.object import TickData
+from vnpy.rpc import RpcServer, RpcClient, PICKLE_MODE, FAST_MODE
+
+
+CALL_COUNT = 20000
+TICK_COUNT = 100000
+
+
+class BenchmarkServer(RpcServer):
+    """"""
+
+    def __init__(self, mode: str, batch_size: int = 0):
+        """"""
+        super().__init__(mode, batch_size)
+
+        self.register(self.echo)
+        self.register(self.publish_ticks)
+
+    def echo(self, data):
+        """"""
+        return data
+
+    def publish_ticks(self, count: int) -> None:
+        """"""
+        events = [Event(EVENT_TICK, generate_tick(n)) for n in range(count)]
+        for event in events:
+            self.publish("", event)
+
+
+class BenchmarkClient(RpcClient):
+    """"""
+
+    def __init__(self, mode: str):
+        """"""
+        super().__init__(mode)
+
+        self.count = 0
+        self.target = 0
+        self.signal = Signal()
+
+    def callback(self, topic, data):
+        """"""
+        self.count += 1
+        if self.count == self.target:
+            self.signal.set()
+
+
+def generate_tick(n: int) -> TickData:
+    """"""
+    return TickData(
+        symbol=f"rb{2101 + n % 10}",
+        exchange=Exchange.SHFE,
+        datetime=datetime.now(),
+        name="螺纹钢",
+        volume=n,
+        last_price=3500 + n % 10,
+        bid_price_1=3499,
+        ask_price_1=3501,
+        bid_volume_1=10,
+        ask_volume_1=20,
+        gateway_name="CTP"
+    )
+
+
+def run_server(mode: str, batch_size: int, port: int) -> None:
+    """
+    Run server in another process, so that it won't compete with
+    client for GIL.
+    """
+    server = BenchmarkServer(mode, batch_size)
+    server.start(f"tcp://*:{port}", f"tcp://*:{port + 1}")
+
+    while True:
+        sleep(1)
+
+
+def run_benchmark(mode: str, batch_size: int = 0, port: int = 2014) -> None:
+    """"""
+    process = Process(target=run_server, args=(mode, batch_size, port), daemon=True)
+    process.start()
+
+    client = BenchmarkClient(mode)
+    client.subscribe_topic("")
+    client.start(f"tcp://localhost:{port}", f"tcp://localhost:{port + 1}")
+    sleep(1)
+
+    tick = generate_tick(0)
+    name = f"{mode}(batch={batch_size})"
+
+    # Call one by one
+    start = perf_counter()
+    for _ in range(CALL_COUNT):
+        client.echo(tick)
+    cost = perf_counter() - start
+    print(f"{name} 串行调用：{CALL_COUNT / cost:,.0f}次/秒")
+
+    # Pipelined calls
+    if mode == FAST_MODE:
+        start = perf_counter()
+        futures = [client.call_async("echo", tick) for _ in range(CALL_COUNT)]
+        for future in futures:
+            future.result()
+        cost = perf_counter() - start
+        print(f"{name} 并发调用：{CALL_COUNT / cost:,.0f}次/秒")
+
+    # Publish tick events, time of generating ticks is also included
+    client.target = TICK_COUNT
+
+    start = perf_counter()
+    client.publish_ticks(TICK_COUNT)
+    client.signal.wait(60)
+    cost = perf_counter() - start
+    print(f"{name} 行情推送：{client.count / cost:,.0f}条/秒，收到{client.count}/{TICK_COUNT}")
+
+    client.stop()
+    client.join()
+    process.terminate()
+
+
+if __name__ == "__main__":
+    run_benchmark(PICKLE_MODE, port=2014)
+    run_benchmark(FAST_MODE, port=2016)
+    run_benchmark(FAST_MODE, batch_size=100, port=2018)
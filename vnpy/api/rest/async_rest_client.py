@@ -0,0 +1,295 @@
+import asyncio
+import json
+from enum import Enum
+from threading import Condition, Lock, Thread
+from time import monotonic
+from typing import Any, Dict, List, Optional, Union
+
+import aiohttp
+
+from .rest_client import (
+    CALLBACK_TYPE,
+    ON_ERROR_TYPE,
+    ON_FAILED_TYPE,
+    Request,
+    RestClient
+)
+
+
+class RequestPriority(Enum):
+    """"""
+
+    high = 0        # Trading requests, e.g. send and cancel order
+    normal = 1      # Query requests, e.g. account and history data
+
+
+class Response:
+    """
+    Response data with the same attributes as requests.Response used
+    by gateways.
+    """
+
+    def __init__(self, status_code: int, text: str, headers: dict):
+        """"""
+        self.status_code: int = status_code
+        self.text: str = text
+        self.headers: dict = headers
+
+    def json(self) -> Any:
+        """"""
+        return json.loads(self.text)
+
+
+class TokenBucket:
+    """
+    Rate limit of at most limit requests within interval seconds,
+    with burst up to limit.
+    """
+
+    def __init__(self, limit: int, interval: float):
+        """"""
+        self.capacity: float = limit
+        self.rate: float = limit / interval
+
+        self.tokens: float = limit
+        self.update_time: float = monotonic()
+
+    async def acquire(self) -> None:
+        """
+        Wait until a token is available and take it.
+        """
+        while True:
+            now = monotonic()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.update_time) * self.rate
+            )
+            self.update_time = now
+
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncRestClient(RestClient):
+    """
+    RestClient sending requests with asyncio and aiohttp in a
+    background thread, with the same usage as RestClient.
+    * Requests share one keep-alive connection pool.
+    * Each priority has its own lane of workers, so that trading
+      requests won't wait behind queued query requests.
+    * Use add_rate_limit to limit request rate of api paths.
+
+    Callback functions are called in the background thread, so they
+    should not block for long.
+    """
+
+    def __init__(self):
+        """"""
+        super().__init__()
+
+        self._loop: asyncio.AbstractEventLoop = None
+        self._thread: Thread = None
+        self._session: aiohttp.ClientSession = None
+
+        # Requests added before event loop started are kept in pending
+        self._lanes: Dict[RequestPriority, asyncio.Queue] = None
+        self._pending: List[Request] = []
+        self._lock: Lock = Lock()
+
+        self._buckets: Dict[str, TokenBucket] = {}
+
+        # Count of requests not finished, used by join
+        self._unfinished: int = 0
+        self._condition: Condition = Condition()
+
+    def start(self, n: int = 3) -> None:
+        """
+        Start rest client with n workers for each priority.
+        """
+        if self._active:
+            return
+
+        self._active = True
+        self._loop = asyncio.new_event_loop()
+        self._thread = Thread(target=self._run, args=(n,), daemon=True)
+        self._thread.start()
+
+    def join(self) -> None:
+        """
+        Wait till all requests are processed.
+        """
+        with self._condition:
+            while self._unfinished:
+                self._condition.wait()
+
+    def add_rate_limit(self, path: str, limit: int, interval: float = 1) -> None:
+        """
+        Limit requests of paths starting with path to at most limit
+        within interval seconds. Use empty path for all requests, the
+        longest matched path is used if more than one matched.
+        """
+        self._buckets[path] = TokenBucket(limit, interval)
+
+    def add_request(
+        self,
+        method: str,
+        path: str,
+        callback: CALLBACK_TYPE,
+        params: dict = None,
+        data: Union[dict, str, bytes] = None,
+        headers: dict = None,
+        on_failed: ON_FAILED_TYPE = None,
+        on_error: ON_ERROR_TYPE = None,
+        extra: Any = None,
+        priority: RequestPriority = None
+    ) -> Request:
+        """
+        Add a new request, see RestClient.add_request for parameters.
+        :param priority: requests other than GET are of high priority
+        if not provided.
+        """
+        request = Request(
+            method,
+            path,
+            params,
+            data,
+            headers,
+            callback,
+            on_failed,
+            on_error,
+            extra,
+        )
+
+        if not priority:
+            if method.upper() == "GET":
+                priority = RequestPriority.normal
+            else:
+                priority = RequestPriority.high
+        request.priority = priority
+
+        with self._condition:
+            self._unfinished += 1
+
+        with self._lock:
+            if self._lanes is None:
+                self._pending.append(request)
+            else:
+                self._loop.call_soon_threadsafe(
+                    self._lanes[priority].put_nowait, request
+                )
+
+        return request
+
+    def _run(self, n: int) -> None:
+        """"""
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._run_async(n))
+
+    async def _run_async(self, n: int) -> None:
+        """"""
+        connector = aiohttp.TCPConnector(limit=n * len(RequestPriority))
+        self._session = aiohttp.ClientSession(connector=connector)
+
+        with self._lock:
+            self._lanes = {priority: asyncio.Queue() for priority in RequestPriority}
+
+            for request in self._pending:
+                self._lanes[request.priority].put_nowait(request)
+            self._pending.clear()
+
+        workers = []
+        for queue in self._lanes.values():
+            for _ in range(n):
+                workers.append(asyncio.ensure_future(self._run_worker(queue)))
+
+        while self._active:
+            await asyncio.sleep(1)
+
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+        await self._session.close()
+
+        with self._lock:
+            self._lanes = None
+
+    async def _run_worker(self, queue: asyncio.Queue) -> None:
+        """"""
+        while True:
+            request = await queue.get()
+            try:
+                await self._process_request_async(request)
+            finally:
+                with self._condition:
+                    self._unfinished -= 1
+                    self._condition.notify_all()
+
+    def _get_bucket(self, path: str) -> Optional[TokenBucket]:
+        """
+        Get rate limit bucket of the longest path matched.
+        """
+        matched = None
+
+        for bucket_path in self._buckets:
+            if path.startswith(bucket_path):
+                if matched is None or len(bucket_path) > len(matched):
+                    matched = bucket_path
+
+        if matched is None:
+            return None
+        return self._buckets[matched]
+
+    async def _process_request_async(self, request: Request) -> None:
+        """
+        Sending request to server and get result.
+        """
+        try:
+            # Wait for rate limit before sign, as signature may expire
+            bucket = self._get_bucket(request.path)
+            if bucket:
+                await bucket.acquire()
+
+            request = self.sign(request)
+
+            url = self.make_full_url(request.path)
+
+            if self.proxies:
+                proxy = self.proxies["http"]
+            else:
+                proxy = None
+
+            async with self._session.request(
+                request.method,
+                url,
+                headers=request.headers,
+                params=convert_params(request.params),
+                data=request.data,
+                proxy=proxy,
+            ) as response:
+                text = await response.text()
+
+            request.response = Response(response.status, text, response.headers)
+            self._process_response(request)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self._process_exception(request)
+
+
+def convert_params(params: Any) -> Any:
+    """
+    Convert values of query params into str in the same way as requests,
+    since aiohttp only accepts str and int values.
+    """
+    if not isinstance(params, dict):
+        return params
+
+    return {
+        k: str(v) if not isinstance(v, (str, int)) or isinstance(v, bool) else v
+        for k, v in params.items()
+        if v is not None
+    }
@@ -262,29 +262,42 @@ class RestClient(object):
                 proxies=self.proxies,
             )
             request.response = response
-            status_code = response.status_code
-            if status_code // 100 == 2:  # 2xx codes are all successful
-                if status_code == 204:
-                    json_body = None
-                else:
-                    json_body = response.json()
-
-                request.callback(json_body, request)
-                request.status = RequestStatus.success
+            self._process_response(request)
+        except Exception:
+            self._process_exception(request)
+
+    def _process_response(self, request: Request) -> None:
+        """
+        Call callback function according to status code of response.
+        """
+        response = request.response
+        status_code = response.status_code
+        if status_code // 100 == 2:  # 2xx codes are all successful
+            if status_code == 204:
+                json_body = None
             else:
-                request.status = RequestStatus.failed
+                json_body = response.json()
 
-                if request.on_failed:
-                    request.on_failed(status_code, request)
-                else:
-                    self.on_failed(status_code, request)
-        except Exception:
-            request.status = RequestStatus.error
-            t, v, tb = sys.exc_info()
-            if request.on_error:
-                request.on_error(t, v, tb, request)
+            request.callback(json_body, request)
+            request.status = RequestStatus.success
+        else:
+            request.status = RequestStatus.failed
+
+            if request.on_failed:
+                request.on_failed(status_code, request)
             else:
-                self.on_error(t, v, tb, request)
+                self.on_failed(status_code, request)
+
+    def _process_exception(self, request: Request) -> None:
+        """
+        Call on_error function with exception being handled.
+        """
+        request.status = RequestStatus.error
+        t, v, tb = sys.exc_info()
+        if request.on_error:
+            request.on_error(t, v, tb, request)
+        else:
+            self.on_error(t, v, tb, request)
 
     def make_full_url(self, path: str) -> str:
         """
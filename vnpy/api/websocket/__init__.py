@@ -1 +1,2 @@
 from .websocket_client import WebsocketClient
+from .async_websocket_client import AsyncWebsocketClient, GZIP, DEFLATE
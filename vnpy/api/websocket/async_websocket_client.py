@@ -0,0 +1,383 @@
+import asyncio
+import json
+import logging
+import sys
+import traceback
+import zlib
+from concurrent.futures import Future
+from datetime import datetime
+from threading import Lock, Thread
+from time import perf_counter
+from typing import Any, Callable, Optional, Union
+
+import aiohttp
+
+from vnpy.trader.utility import get_file_logger
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+
+# Compression format of binary frames
+GZIP = "gzip"           # e.g. huobi
+DEFLATE = "deflate"     # raw deflate, e.g. okex
+
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock: Lock = Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get the event loop shared by all AsyncWebsocketClient, which is
+    running in a background thread.
+    """
+    global _loop
+
+    with _loop_lock:
+        if not _loop:
+            _loop = asyncio.new_event_loop()
+            thread = Thread(target=_loop.run_forever, daemon=True)
+            thread.start()
+
+    return _loop
+
+
+class ConnectionStats:
+    """
+    Message count and decode latency of a websocket connection.
+    """
+
+    def __init__(self):
+        """"""
+        self.count: int = 0
+        self.decode_time: float = 0
+        self.decode_max: float = 0
+
+        self.last_count: int = 0
+        self.last_time: float = perf_counter()
+
+    def update(self, decode_time: float) -> None:
+        """"""
+        self.count += 1
+        self.decode_time += decode_time
+
+        if decode_time > self.decode_max:
+            self.decode_max = decode_time
+
+    def get_stats(self) -> dict:
+        """
+        Get message rate since last call and decode latency in
+        microseconds.
+        """
+        now = perf_counter()
+        rate = (self.count - self.last_count) / (now - self.last_time)
+
+        self.last_count = self.count
+        self.last_time = now
+
+        if self.count:
+            decode_mean = self.decode_time / self.count * 1000000
+        else:
+            decode_mean = 0
+
+        return {
+            "count": self.count,
+            "rate": rate,
+            "decode_mean": decode_mean,
+            "decode_max": self.decode_max * 1000000
+        }
+
+
+class AsyncWebsocketClient:
+    """
+    Websocket API running with asyncio, has the same usage as
+    WebsocketClient.
+
+    All clients share one event loop running in a background thread
+    instead of having their own worker and ping threads, so callbacks
+    should not block for long.
+
+    Received data is decoded by decoder (orjson if installed), binary
+    frames are decompressed first if compression is set. Last sent and
+    received text is only recorded for debugging when log_path is set.
+
+    Callbacks to overrides:
+    * unpack_data
+    * on_connected
+    * on_disconnected
+    * on_packet
+    * on_error
+    """
+
+    def __init__(self):
+        """Constructor"""
+        self.host = None
+
+        self.proxy_host = None
+        self.proxy_port = None
+        self.ping_interval = 60  # seconds
+        self.header = {}
+
+        self.decoder: Callable[[Union[str, bytes]], Any] = json_loads
+        self.compression: str = ""
+
+        self.logger: Optional[logging.Logger] = None
+        self.stats: ConnectionStats = ConnectionStats()
+
+        self._active = False
+        self._loop: asyncio.AbstractEventLoop = None
+        self._future: Future = None
+        self._ws: aiohttp.ClientWebSocketResponse = None
+
+        # For debugging
+        self._last_sent_text = None
+        self._last_received_text = None
+
+    def init(
+        self,
+        host: str,
+        proxy_host: str = "",
+        proxy_port: int = 0,
+        ping_interval: int = 60,
+        header: dict = None,
+        log_path: Optional[str] = None,
+        compression: str = "",
+        decoder: Callable[[Union[str, bytes]], Any] = None
+    ):
+        """
+        :param compression: GZIP or DEFLATE for compressed binary frames.
+        :param decoder: function decoding text or bytes into packet.
+        """
+        self.host = host
+        self.ping_interval = ping_interval  # seconds
+        self.compression = compression
+
+        if decoder:
+            self.decoder = decoder
+
+        if log_path is not None:
+            self.logger = get_file_logger(log_path)
+            self.logger.setLevel(logging.DEBUG)
+
+        if header:
+            self.header = header
+
+        if proxy_host and proxy_port:
+            self.proxy_host = proxy_host
+            self.proxy_port = proxy_port
+
+    def start(self):
+        """
+        Start the client and on_connected function is called after webscoket
+        is connected succesfully.
+
+        Please don't send packet untill on_connected fucntion is called.
+        """
+        self._active = True
+        self._loop = get_event_loop()
+        self._future = asyncio.run_coroutine_threadsafe(self._run(), self._loop)
+
+    def stop(self):
+        """
+        Stop the client.
+        """
+        self._active = False
+
+        ws = self._ws
+        if ws:
+            asyncio.run_coroutine_threadsafe(ws.close(), self._loop)
+
+    def join(self):
+        """
+        Wait till connection is closed.
+
+        This function cannot be called from callback function.
+        """
+        if self._future:
+            self._future.result()
+
+    def get_stats(self) -> dict:
+        """
+        Get message rate and decode latency of the connection.
+        """
+        return self.stats.get_stats()
+
+    def send_packet(self, packet: dict):
+        """
+        Send a packet (dict data) to server
+
+        override this if you want to send non-json packet
+        """
+        text = json.dumps(packet)
+        if self.logger:
+            self._record_last_sent_text(text)
+        return self._send_text(text)
+
+    def _log(self, msg, *args):
+        logger = self.logger
+        if logger:
+            logger.debug(msg, *args)
+
+    def _send_text(self, text: str):
+        """
+        Send a text string to server.
+        """
+        ws = self._ws
+        if ws:
+            asyncio.run_coroutine_threadsafe(ws.send_str(text), self._loop)
+            self._log('sent text: %s', text)
+
+    def _send_binary(self, data: bytes):
+        """
+        Send bytes data to server.
+        """
+        ws = self._ws
+        if ws:
+            asyncio.run_coroutine_threadsafe(ws.send_bytes(data), self._loop)
+            self._log('sent binary: %s', data)
+
+    async def _run(self):
+        """
+        Keep running till stop is called.
+        """
+        if self.proxy_host:
+            proxy = f"http://{self.proxy_host}:{self.proxy_port}"
+        else:
+            proxy = None
+
+        async with aiohttp.ClientSession() as session:
+            while self._active:
+                try:
+                    self._ws = await session.ws_connect(
+                        self.host,
+                        ssl=False,
+                        proxy=proxy,
+                        headers=self.header,
+                        heartbeat=self.ping_interval,
+                        max_msg_size=0
+                    )
+
+                    self.on_connected()
+
+                    await self._receive(self._ws)
+                except (aiohttp.ClientError, OSError, asyncio.TimeoutError):
+                    pass
+                # other internal exception raised in on_packet
+                except Exception:
+                    et, ev, tb = sys.exc_info()
+                    self.on_error(et, ev, tb)
+
+                if self._ws:
+                    await self._ws.close()
+                    self._ws = None
+                    self.on_disconnected()
+
+                # Wait before reconnecting
+                if self._active:
+                    await asyncio.sleep(1)
+
+    async def _receive(self, ws: aiohttp.ClientWebSocketResponse):
+        """
+        Receive messages till connection closed.
+        """
+        logger = self.logger
+        stats = self.stats
+
+        async for msg in ws:
+            if msg.type == aiohttp.WSMsgType.TEXT or msg.type == aiohttp.WSMsgType.BINARY:
+                data = msg.data
+
+                if logger:
+                    self._record_last_received_text(data)
+
+                start = perf_counter()
+                try:
+                    packet = self.unpack_data(data)
+                except ValueError as e:
+                    print(f"websocket unable to parse data: {data}")
+                    raise e
+                stats.update(perf_counter() - start)
+
+                if logger:
+                    self._log('recv data: %s', packet)
+
+                self.on_packet(packet)
+            elif msg.type == aiohttp.WSMsgType.ERROR:
+                break
+
+    def unpack_data(self, data: Union[str, bytes]):
+        """
+        Decompress binary frame if needed and decode with decoder.
+
+        override this method if you want to use other serialization format.
+        """
+        if self.compression and isinstance(data, bytes):
+            if self.compression == GZIP:
+                data = zlib.decompress(data, 31)
+            else:
+                data = zlib.decompress(data, -zlib.MAX_WBITS)
+
+        return self.decoder(data)
+
+    @staticmethod
+    def on_connected():
+        """
+        Callback when websocket is connected successfully.
+        """
+        pass
+
+    @staticmethod
+    def on_disconnected():
+        """
+        Callback when websocket connection is lost.
+        """
+        pass
+
+    @staticmethod
+    def on_packet(packet: dict):
+        """
+        Callback when receiving data from server.
+        """
+        pass
+
+    def on_error(self, exception_type: type, exception_value: Exception, tb):
+        """
+        Callback when exception raised.
+        """
+        sys.stderr.write(
+            self.exception_detail(exception_type, exception_value, tb)
+        )
+        return sys.excepthook(exception_type, exception_value, tb)
+
+    def exception_detail(
+        self, exception_type: type, exception_value: Exception, tb
+    ):
+        """
+        Print detailed exception information.
+        """
+        text = "[{}]: Unhandled WebSocket Error:{}\n".format(
+            datetime.now().isoformat(), exception_type
+        )
+        text += "LastSentText:\n{}\n".format(self._last_sent_text)
+        text += "LastReceivedText:\n{}\n".format(self._last_received_text)
+        text += "Exception trace: \n"
+        text += "".join(
+            traceback.format_exception(exception_type, exception_value, tb)
+        )
+        return text
+
+    def _record_last_sent_text(self, text: str):
+        """
+        Record last sent text for debug purpose.
+        """
+        self._last_sent_text = text[:1000]
+
+    def _record_last_received_text(self, text: Union[str, bytes]):
+        """
+        Record last received text for debug purpose.
+        """
+        self._last_received_text = text[:1000]
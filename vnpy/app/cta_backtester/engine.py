@@ -12,7 +12,7 @@ from vnpy.trader.constant import Interval
 from vnpy.trader.utility import extract_vt_symbol
 from vnpy.trader.object import HistoryRequest
 from vnpy.trader.rqdata import rqdata_client
-from vnpy.trader.database import database_manager
+from vnpy.trader.downloader import HistoryDownloader
 from vnpy.app.cta_strategy import CtaTemplate
 from vnpy.app.cta_strategy.backtesting import (
     BacktestingEngine, OptimizationSetting, BacktestingMode
@@ -39,6 +39,10 @@ class BacktesterEngine(BaseEngine):
         self.backtesting_engine = None
         self.thread = None
 
+        self.downloader: HistoryDownloader = HistoryDownloader(
+            main_engine, write_log=self.write_log
+        )
+
         # Backtesting reuslt
         self.result_df = None
         self.result_statistics = None
@@ -395,21 +399,15 @@ class BacktesterEngine(BaseEngine):
             end=end
         )
 
-        contract = self.main_engine.get_contract(vt_symbol)
-
         try:
-            # If history data provided in gateway, then query
-            if contract and contract.history_data:
-                data = self.main_engine.query_history(
-                    req, contract.gateway_name
-                )
-            # Otherwise use RQData to query data
-            else:
-                data = rqdata_client.query_history(req)
+            # Query from gateway if history data provided, otherwise RQData
+            progress = self.downloader.download_bar_data([req])
 
-            if data:
-                database_manager.save_bar_data(data)
-                self.write_log(f"{vt_symbol}-{interval}历史数据下载完成")
+            if progress.count:
+                self.write_log(
+                    f"{vt_symbol}-{interval}历史数据下载完成，"
+                    f"共{progress.count}条，{progress.rate:,.0f}条/秒"
+                )
             else:
                 self.write_log(f"数据下载失败，无法获取{vt_symbol}的历史数据")
         except Exception:
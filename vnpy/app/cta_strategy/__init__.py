@@ -3,7 +3,7 @@ from pathlib import Path
 from vnpy.trader.app import BaseApp
 from vnpy.trader.constant import Direction
 from vnpy.trader.object import TickData, BarData, TradeData, OrderData
-from vnpy.trader.utility import BarGenerator, ArrayManager
+from vnpy.trader.utility import BarGenerator, ArrayManager, IncrementalArrayManager
 
 from .base import APP_NAME, StopOrder
 from .engine import CtaEngine
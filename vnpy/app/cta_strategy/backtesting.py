@@ -1,11 +1,14 @@
 from collections import defaultdict
 from datetime import date, datetime, timedelta
-from typing import Callable
-from itertools import product
+from pathlib import Path
+from typing import Callable, Iterator
+from itertools import chain, product
 from functools import lru_cache
 from time import time
 import multiprocessing
 import random
+import shutil
+import tempfile
 import traceback
 
 import numpy as np
@@ -16,9 +19,15 @@ from deap import creator, base, tools, algorithms
 
 from vnpy.trader.constant import (Direction, Offset, Exchange,
                                   Interval, Status)
-from vnpy.trader.database import database_manager
+from vnpy.trader.database import database_manager, CHUNK_SIZE
 from vnpy.trader.object import OrderData, TradeData, BarData, TickData
 from vnpy.trader.utility import round_to
+from vnpy.trader.columnar import (
+    HistoryArray,
+    create_history_array,
+    concat_history_arrays,
+    load_history_array
+)
 
 from .base import (
     BacktestingMode,
@@ -129,7 +138,9 @@ class BacktestingEngine:
         self.interval = None
         self.days = 0
         self.callback = None
-        self.history_data = []
+        self.history_data: HistoryArray = None
+        self.stream_data: bool = False
+        self.ix: int = 0
 
         self.stop_order_count = 0
         self.stop_orders = {}
@@ -213,10 +224,24 @@ class BacktestingEngine:
             self, strategy_class.__name__, self.vt_symbol, setting
         )
 
-    def load_data(self):
-        """"""
+    def load_data(self, file_path: str = "", stream: bool = True):
+        """
+        Load history data into columnar array.
+
+        If file_path is given and the file exists, data is memory-mapped
+        from the file instead of loading from database. Otherwise data
+        loaded from database is also saved into the file for later use.
+
+        Tick data is not loaded here if stream is True and file_path is
+        not given, but streamed from database chunk by chunk when running
+        backtesting, so that long tick history is replayed in constant
+        memory.
+        """
         self.output("开始加载历史数据")
 
+        self.history_data = None
+        self.stream_data = False
+
         if not self.end:
             self.end = datetime.now()
 
@@ -224,7 +249,17 @@ class BacktestingEngine:
             self.output("起始日期必须小于结束日期")
             return
 
-        self.history_data.clear()       # Clear previously loaded history data
+        if file_path and Path(file_path).with_suffix(".npy").exists():
+            self.history_data = load_history_array(file_path)
+            self.output(f"历史数据文件加载完成，数据量：{len(self.history_data)}")
+            return
+
+        if self.mode == BacktestingMode.TICK and stream and not file_path:
+            self.stream_data = True
+            self.output("Tick数据将在回放时从数据库分块加载")
+            return
+
+        history_arrays = []
 
         # Load 30 days of data each time and allow for progress update
         total_days = (self.end - self.start).days
@@ -243,7 +278,7 @@ class BacktestingEngine:
             end = min(end, self.end)  # Make sure end time stays within set range
 
             if self.mode == BacktestingMode.BAR:
-                data = load_bar_data(
+                history = load_bar_array(
                     self.symbol,
                     self.exchange,
                     self.interval,
@@ -251,14 +286,14 @@ class BacktestingEngine:
                     end
                 )
             else:
-                data = load_tick_data(
+                history = load_tick_array(
                     self.symbol,
                     self.exchange,
                     start,
                     end
                 )
 
-            self.history_data.extend(data)
+            history_arrays.append(history)
 
             progress += progress_days / total_days
             progress = min(progress, 1)
@@ -266,6 +301,17 @@ class BacktestingEngine:
             start = end + interval_delta
             end += progress_delta
 
+        if history_arrays:
+            self.history_data = concat_history_arrays(history_arrays)
+        else:
+            self.history_data = create_history_array(
+                [], self.symbol, self.exchange, self.interval,
+                self.mode == BacktestingMode.TICK
+            )
+
+        if file_path:
+            self.history_data.save(file_path)
+
         self.output(f"历史数据加载完成，数据量：{len(self.history_data)}")
 
     def run_backtesting(self):
@@ -277,24 +323,38 @@ class BacktestingEngine:
 
         self.strategy.on_init()
 
+        # History data is replayed chunk by chunk if streamed from database
+        chunks = self.iter_history_data()
+
         # Use the first [days] of history data for initializing strategy
         day_count = 1
-        ix = 0
+        last_date = None
+        start_ix = None
+
+        for history_data in chunks:
+            self.history_data = history_data
+            dates = history_data.column("datetime").astype("datetime64[D]")
 
-        for ix, data in enumerate(self.history_data):
-            if self.datetime and data.datetime.day != self.datetime.day:
-                day_count += 1
-                if day_count >= self.days:
-                    break
+            for ix in range(len(history_data)):
+                if last_date is not None and dates[ix] != last_date:
+                    day_count += 1
+                    if day_count >= self.days:
+                        start_ix = ix + 1
+                        break
+                last_date = dates[ix]
 
-            self.datetime = data.datetime
+                self.ix = ix
+                self.datetime = history_data.get_datetime(ix)
+
+                try:
+                    self.callback(history_data[ix])
+                except Exception:
+                    self.output("触发异常，回测终止")
+                    self.output(traceback.format_exc())
+                    return
 
-            try:
-                self.callback(data)
-            except Exception:
-                self.output("触发异常，回测终止")
-                self.output(traceback.format_exc())
-                return
+            if start_ix is not None:
+                break
 
         self.strategy.inited = True
         self.output("策略初始化完成")
@@ -304,31 +364,72 @@ class BacktestingEngine:
         self.output("开始回放历史数据")
 
         # Use the rest of history data for running backtesting
-        backtesting_data = self.history_data[ix + 1:]
-        if not backtesting_data:
+        if start_ix is None:
             self.output("历史数据不足，回测终止")
             return
 
-        total_size = len(backtesting_data)
-        batch_size = max(int(total_size / 10), 1)
+        # Progress is estimated by date since total size of streamed
+        # data is unknown
+        start_date = last_date
+        if self.stream_data:
+            end_date = np.datetime64(self.end.date(), "D")
+        else:
+            end_date = dates[-1]
+        total_days = max((end_date - start_date).astype(int), 1)
 
-        for ix, i in enumerate(range(0, total_size, batch_size)):
-            batch_data = backtesting_data[i: i + batch_size]
-            for data in batch_data:
-                try:
-                    func(data)
-                except Exception:
-                    self.output("触发异常，回测终止")
-                    self.output(traceback.format_exc())
-                    return
+        replay_count = 0
+        progress_step = 0
+
+        for history_data in chain([self.history_data], chunks):
+            self.history_data = history_data
+            data_size = len(history_data)
+            dates = history_data.column("datetime").astype("datetime64[D]")
 
-            progress = min(ix / 10, 1)
-            progress_bar = "=" * (ix + 1)
-            self.output(f"回放进度：{progress_bar} [{progress:.0%}]")
+            for i in range(start_ix, data_size, CHUNK_SIZE):
+                for ix in range(i, min(i + CHUNK_SIZE, data_size)):
+                    self.ix = ix
+
+                    try:
+                        func(history_data[ix])
+                    except Exception:
+                        self.output("触发异常，回测终止")
+                        self.output(traceback.format_exc())
+                        return
+
+                replay_count += ix + 1 - i
+
+                progress = min((dates[ix] - start_date).astype(int) / total_days, 1)
+                while progress_step < int(progress * 10):
+                    progress_step += 1
+                    progress_bar = "=" * progress_step
+                    self.output(f"回放进度：{progress_bar} [{progress_step / 10:.0%}]")
+
+            start_ix = 0
+
+        if not replay_count:
+            self.output("历史数据不足，回测终止")
+            return
 
         self.strategy.on_stop()
         self.output("历史数据回放结束")
 
+    def iter_history_data(self) -> Iterator[HistoryArray]:
+        """
+        Get history data to be replayed in chunks. Tick data is streamed
+        from database if not loaded by load_data.
+        """
+        if not self.stream_data:
+            yield self.history_data
+            return
+
+        for ticks in database_manager.iter_tick_data(
+            self.symbol,
+            self.exchange,
+            self.start,
+            self.end
+        ):
+            yield create_history_array(ticks, self.symbol, self.exchange, None, True)
+
     def calculate_result(self):
         """"""
         self.output("开始计算逐日盯市盈亏")
@@ -601,33 +702,51 @@ class BacktestingEngine:
             self.output("优化目标未设置，请检查")
             return
 
-        # Use multiprocessing pool for running backtesting with different setting
-        # Force to use spawn method to create new process (instead of fork on Linux)
-        ctx = multiprocessing.get_context("spawn")
-        pool = ctx.Pool(multiprocessing.cpu_count())
+        # Load history data only once in main process, and save it into
+        # a temp file which is memory-mapped by every worker process.
+        self.load_data(stream=False)
+        if self.history_data is None:
+            return
 
-        results = []
-        for setting in settings:
-            result = (pool.apply_async(optimize, (
-                target_name,
-                self.strategy_class,
-                setting,
-                self.vt_symbol,
-                self.interval,
-                self.start,
-                self.rate,
-                self.slippage,
-                self.size,
-                self.pricetick,
-                self.capital,
-                self.end,
-                self.mode,
-                self.inverse
-            )))
-            results.append(result)
+        temp_dir = tempfile.mkdtemp()
+        file_path = str(Path(temp_dir).joinpath("history"))
+
+        try:
+            self.history_data.save(file_path)
 
-        pool.close()
-        pool.join()
+            # Use multiprocessing pool for running backtesting with different setting
+            # Force to use spawn method to create new process (instead of fork on Linux)
+            ctx = multiprocessing.get_context("spawn")
+            pool = ctx.Pool(
+                multiprocessing.cpu_count(),
+                initializer=init_optimization_history,
+                initargs=(file_path,)
+            )
+
+            results = []
+            for setting in settings:
+                result = (pool.apply_async(optimize, (
+                    target_name,
+                    self.strategy_class,
+                    setting,
+                    self.vt_symbol,
+                    self.interval,
+                    self.start,
+                    self.rate,
+                    self.slippage,
+                    self.size,
+                    self.pricetick,
+                    self.capital,
+                    self.end,
+                    self.mode,
+                    self.inverse
+                )))
+                results.append(result)
+
+            pool.close()
+            pool.join()
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
 
         # Sort results and output
         result_values = [result.get() for result in results]
@@ -657,20 +776,6 @@ class BacktestingEngine:
             self.output("优化目标未设置，请检查")
             return
 
-        # Define parameter generation function
-        def generate_parameter():
-            """"""
-            return random.choice(settings)
-
-        def mutate_individual(individual, indpb):
-            """"""
-            size = len(individual)
-            paramlist = generate_parameter()
-            for i in range(size):
-                if random.random() < indpb:
-                    individual[i] = paramlist[i]
-            return individual,
-
         # Create ga object function
         global ga_target_name
         global ga_strategy_class
@@ -686,6 +791,7 @@ class BacktestingEngine:
         global ga_end
         global ga_mode
         global ga_inverse
+        global optimization_history
 
         ga_target_name = target_name
         ga_strategy_class = self.strategy_class
@@ -702,6 +808,37 @@ class BacktestingEngine:
         ga_mode = self.mode
         ga_inverse = self.inverse
 
+        # Load history data only once and share it with all backtestings,
+        # which are run in this process
+        self.load_data(stream=False)
+        if self.history_data is None:
+            return
+
+        optimization_history = self.history_data
+
+        try:
+            return self.run_ga_algorithm(settings, population_size, ngen_size)
+        finally:
+            optimization_history = None
+
+    def run_ga_algorithm(self, settings: list, population_size: int, ngen_size: int) -> list:
+        """
+        Run genetic algorithm with ga_optimize as evaluate function.
+        """
+        # Define parameter generation function
+        def generate_parameter():
+            """"""
+            return random.choice(settings)
+
+        def mutate_individual(individual, indpb):
+            """"""
+            size = len(individual)
+            paramlist = generate_parameter()
+            for i in range(size):
+                if random.random() < indpb:
+                    individual[i] = paramlist[i]
+            return individual,
+
         # Set up genetic algorithm
         toolbox = base.Toolbox()
         toolbox.register("individual", tools.initIterate, creator.Individual, generate_parameter)
@@ -805,16 +942,20 @@ class BacktestingEngine:
 
     def cross_limit_order(self):
         """
-        Cross limit order with last bar/tick data.
+        Cross limit order with last bar/tick data, prices are read
+        from columns of history data at current index.
         """
+        array = self.history_data.array
+        ix = self.ix
+
         if self.mode == BacktestingMode.BAR:
-            long_cross_price = self.bar.low_price
-            short_cross_price = self.bar.high_price
-            long_best_price = self.bar.open_price
-            short_best_price = self.bar.open_price
+            long_cross_price = float(array["low_price"][ix])
+            short_cross_price = float(array["high_price"][ix])
+            long_best_price = float(array["open_price"][ix])
+            short_best_price = long_best_price
         else:
-            long_cross_price = self.tick.ask_price_1
-            short_cross_price = self.tick.bid_price_1
+            long_cross_price = float(array["ask_price_1"][ix])
+            short_cross_price = float(array["bid_price_1"][ix])
             long_best_price = long_cross_price
             short_best_price = short_cross_price
 
@@ -877,16 +1018,20 @@ class BacktestingEngine:
 
     def cross_stop_order(self):
         """
-        Cross stop order with last bar/tick data.
+        Cross stop order with last bar/tick data, prices are read
+        from columns of history data at current index.
         """
+        array = self.history_data.array
+        ix = self.ix
+
         if self.mode == BacktestingMode.BAR:
-            long_cross_price = self.bar.high_price
-            short_cross_price = self.bar.low_price
-            long_best_price = self.bar.open_price
-            short_best_price = self.bar.open_price
+            long_cross_price = float(array["high_price"][ix])
+            short_cross_price = float(array["low_price"][ix])
+            long_best_price = float(array["open_price"][ix])
+            short_best_price = long_best_price
         else:
-            long_cross_price = self.tick.last_price
-            short_cross_price = self.tick.last_price
+            long_cross_price = float(array["last_price"][ix])
+            short_cross_price = long_cross_price
             long_best_price = long_cross_price
             short_best_price = short_cross_price
 
@@ -1278,7 +1423,13 @@ def optimize(
     )
 
     engine.add_strategy(strategy_class, setting)
-    engine.load_data()
+
+    # Use shared history data if provided, otherwise load from database
+    if optimization_history:
+        engine.history_data = optimization_history
+    else:
+        engine.load_data()
+
     engine.run_backtesting()
     engine.calculate_result()
     statistics = engine.calculate_statistics(output=False)
@@ -1287,6 +1438,16 @@ def optimize(
     return (str(setting), target_value, statistics)
 
 
+def init_optimization_history(file_path: str) -> None:
+    """
+    Initializer of optimization worker process, attach to history data
+    file saved by main process with memory-mapping.
+    """
+    global optimization_history
+
+    optimization_history = load_history_array(file_path)
+
+
 @lru_cache(maxsize=1000000)
 def _ga_optimize(parameter_values: tuple):
     """"""
@@ -1343,6 +1504,36 @@ def load_tick_data(
     )
 
 
+@lru_cache(maxsize=999)
+def load_bar_array(
+    symbol: str,
+    exchange: Exchange,
+    interval: Interval,
+    start: datetime,
+    end: datetime
+) -> HistoryArray:
+    """"""
+    return database_manager.load_bar_array(
+        symbol, exchange, interval, start, end
+    )
+
+
+@lru_cache(maxsize=999)
+def load_tick_array(
+    symbol: str,
+    exchange: Exchange,
+    start: datetime,
+    end: datetime
+) -> HistoryArray:
+    """"""
+    return database_manager.load_tick_array(
+        symbol, exchange, start, end
+    )
+
+
+# History data shared by optimization
+optimization_history = None
+
 # GA related global value
 ga_end = None
 ga_mode = None
@@ -2,9 +2,13 @@
 Defines constants and objects used in CtaStrategy App.
 """
 
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
 from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime, timedelta
+from itertools import count
+from typing import Dict, List, Tuple
 
 from vnpy.trader.constant import Direction, Offset, Interval
 
@@ -44,6 +48,80 @@ class StopOrder:
     status: StopOrderStatus = StopOrderStatus.WAITING
 
 
+class StopOrderBook:
+    """
+    Index of local stop orders by vt_symbol and direction, with orders
+    sorted by trigger price, so that only orders triggered by the new
+    price are touched on every tick.
+
+    Long orders are sorted by price and short orders by negative price,
+    so orders triggered are always at the head of the list.
+    """
+
+    def __init__(self):
+        """"""
+        # vt_symbol: [(sort key, sequence, stop_orderid)]
+        self.long_books: Dict[str, List[Tuple[float, int, str]]] = defaultdict(list)
+        self.short_books: Dict[str, List[Tuple[float, int, str]]] = defaultdict(list)
+
+        # stop_orderid: (sort key, sequence, stop_orderid)
+        self.entries: Dict[str, Tuple[float, int, str]] = {}
+        self.sequence: count = count()
+
+    def get_book(self, stop_order: StopOrder) -> List[Tuple[float, int, str]]:
+        """"""
+        if stop_order.direction == Direction.LONG:
+            return self.long_books[stop_order.vt_symbol]
+        else:
+            return self.short_books[stop_order.vt_symbol]
+
+    def add(self, stop_order: StopOrder) -> None:
+        """"""
+        if stop_order.direction == Direction.LONG:
+            key = stop_order.price
+        else:
+            key = -stop_order.price
+
+        entry = (key, next(self.sequence), stop_order.stop_orderid)
+        self.entries[stop_order.stop_orderid] = entry
+
+        insort(self.get_book(stop_order), entry)
+
+    def remove(self, stop_order: StopOrder) -> None:
+        """"""
+        entry = self.entries.pop(stop_order.stop_orderid, None)
+        if not entry:
+            return
+
+        book = self.get_book(stop_order)
+        ix = bisect_left(book, entry)
+        if ix < len(book) and book[ix] == entry:
+            book.pop(ix)
+
+    def get_triggered(self, vt_symbol: str, price: float) -> List[str]:
+        """
+        Get stop_orderids of orders triggered by price, in the same order
+        as they are added.
+        """
+        entries = []
+
+        book = self.long_books.get(vt_symbol, None)
+        if book:
+            ix = bisect_right(book, (price, float("inf")))
+            entries.extend(book[:ix])
+
+        book = self.short_books.get(vt_symbol, None)
+        if book:
+            ix = bisect_right(book, (-price, float("inf")))
+            entries.extend(book[:ix])
+
+        if not entries:
+            return entries
+
+        entries.sort(key=lambda entry: entry[1])
+        return [entry[2] for entry in entries]
+
+
 EVENT_CTA_LOG = "eCtaLog"
 EVENT_CTA_STRATEGY = "eCtaStrategy"
 EVENT_CTA_STOPORDER = "eCtaStopOrder"
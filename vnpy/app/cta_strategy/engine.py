@@ -36,7 +36,7 @@ from vnpy.trader.constant import (
     Offset,
     Status
 )
-from vnpy.trader.utility import load_json, save_json, extract_vt_symbol, round_to
+from vnpy.trader.utility import load_json, save_json, extract_vt_symbol, round_to, JsonStore
 from vnpy.trader.rqdata import rqdata_client
 from vnpy.trader.converter import OffsetConverter
 from vnpy.trader.database import database_manager
@@ -48,6 +48,7 @@ from .base import (
     EVENT_CTA_STOPORDER,
     EngineType,
     StopOrder,
+    StopOrderBook,
     StopOrderStatus,
     STOPORDER_PREFIX
 )
@@ -81,6 +82,7 @@ class CtaEngine(BaseEngine):
 
         self.strategy_setting = {}  # strategy_name: dict
         self.strategy_data = {}     # strategy_name: dict
+        self.data_store = JsonStore(self.data_filename)
 
         self.classes = {}           # class_name: stategy_class
         self.strategies = {}        # strategy_name: strategy
@@ -93,6 +95,7 @@ class CtaEngine(BaseEngine):
 
         self.stop_order_count = 0   # for generating stop_orderid
         self.stop_orders = {}       # stop_orderid: stop_order
+        self.stop_order_book = StopOrderBook()
 
         self.init_executor = ThreadPoolExecutor(max_workers=1)
 
@@ -116,6 +119,7 @@ class CtaEngine(BaseEngine):
     def close(self):
         """"""
         self.stop_all_strategies()
+        self.data_store.close()
 
     def register_event(self):
         """"""
@@ -233,18 +237,13 @@ class CtaEngine(BaseEngine):
 
     def check_stop_order(self, tick: TickData):
         """"""
-        for stop_order in list(self.stop_orders.values()):
-            if stop_order.vt_symbol != tick.vt_symbol:
-                continue
+        stop_orderids = self.stop_order_book.get_triggered(tick.vt_symbol, tick.last_price)
 
-            long_triggered = (
-                stop_order.direction == Direction.LONG and tick.last_price >= stop_order.price
-            )
-            short_triggered = (
-                stop_order.direction == Direction.SHORT and tick.last_price <= stop_order.price
-            )
+        for stop_orderid in stop_orderids:
+            # Stop order may be cancelled by callback of previous one
+            stop_order = self.stop_orders.get(stop_orderid, None)
 
-            if long_triggered or short_triggered:
+            if stop_order:
                 strategy = self.strategies[stop_order.strategy_name]
 
                 # To get excuted immediately after stop order is
@@ -278,6 +277,7 @@ class CtaEngine(BaseEngine):
                 if vt_orderids:
                     # Remove from relation map.
                     self.stop_orders.pop(stop_order.stop_orderid)
+                    self.stop_order_book.remove(stop_order)
 
                     strategy_vt_orderids = self.strategy_orderid_map[strategy.strategy_name]
                     if stop_order.stop_orderid in strategy_vt_orderids:
@@ -427,6 +427,7 @@ class CtaEngine(BaseEngine):
         )
 
         self.stop_orders[stop_orderid] = stop_order
+        self.stop_order_book.add(stop_order)
 
         vt_orderids = self.strategy_orderid_map[strategy.strategy_name]
         vt_orderids.add(stop_orderid)
@@ -459,6 +460,7 @@ class CtaEngine(BaseEngine):
 
         # Remove from relation map.
         self.stop_orders.pop(stop_orderid)
+        self.stop_order_book.remove(stop_order)
 
         vt_orderids = self.strategy_orderid_map[strategy.strategy_name]
         if stop_orderid in vt_orderids:
@@ -740,6 +742,7 @@ class CtaEngine(BaseEngine):
 
         # Sync strategy variables to data file
         self.sync_strategy_data(strategy)
+        self.data_store.flush()
 
         # Update GUI
         self.put_strategy_event(strategy)
@@ -825,7 +828,7 @@ class CtaEngine(BaseEngine):
         """
         Load strategy data from json file.
         """
-        self.strategy_data = load_json(self.data_filename)
+        self.strategy_data = self.data_store.load()
 
     def sync_strategy_data(self, strategy: CtaTemplate):
         """
@@ -836,7 +839,7 @@ class CtaEngine(BaseEngine):
         data.pop("trading")
 
         self.strategy_data[strategy.strategy_name] = data
-        save_json(self.data_filename, self.strategy_data)
+        self.data_store.save(self.strategy_data)
 
     def get_all_strategy_class_names(self):
         """
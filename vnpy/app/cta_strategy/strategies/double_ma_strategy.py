@@ -1,3 +1,8 @@
+from typing import List
+
+import numpy as np
+import talib
+
 from vnpy.app.cta_strategy import (
     CtaTemplate,
     StopOrder,
@@ -97,6 +102,51 @@ class DoubleMaStrategy(CtaTemplate):
 
         self.put_event()
 
+    def generate_signal(self, data: dict):
+        """
+        Generate signal of the whole bar series for vectorized backtesting.
+        """
+        close = data["close_price"]
+
+        fast_ma = talib.SMA(close, self.fast_window)
+        slow_ma = talib.SMA(close, self.slow_window)
+
+        fast_ma1 = np.roll(fast_ma, 1)
+        slow_ma1 = np.roll(slow_ma, 1)
+
+        cross_over = (fast_ma > slow_ma) & (fast_ma1 < slow_ma1)
+        cross_below = (fast_ma < slow_ma) & (fast_ma1 > slow_ma1)
+
+        # No signal before array manager inited
+        cross_over[:self.am.size - 1] = False
+        cross_below[:self.am.size - 1] = False
+
+        target = np.full(len(close), np.nan)
+        target[cross_over] = 1
+        target[cross_below] = -1
+
+        # Signal is converted into orders by get_signal_orders
+
+        return target, close, None
+
+    def get_signal_orders(self, signal: float, pos: float) -> List[float]:
+        """
+        Get volumes of orders sent on signal for vectorized backtesting,
+        which depend on current position the same as on_bar.
+        """
+        if signal > 0:
+            if pos == 0:
+                return [1]
+            elif pos < 0:
+                return [1, 1]
+        elif signal < 0:
+            if pos == 0:
+                return [-1]
+            elif pos > 0:
+                return [-1, -1]
+
+        return []
+
     def on_order(self, order: OrderData):
         """
         Callback of new order data update.
@@ -0,0 +1,364 @@
+"""
+Vectorized backtesting for signal-only CTA strategies.
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+from pandas import DataFrame
+
+from vnpy.trader.constant import Direction, Offset
+from vnpy.trader.object import TradeData
+from vnpy.trader.utility import round_to
+from vnpy.trader.columnar import HistoryArray
+
+from .backtesting import (
+    BacktestingEngine,
+    BacktestingMode,
+    DailyResult,
+    OptimizationSetting
+)
+
+
+class VectorBacktestingEngine(BacktestingEngine):
+    """
+    Backtesting engine for strategies driven purely by indicators
+    calculated on closed bars.
+
+    Strategy class needs to implement generate_signal function, which
+    calculates indicators of the whole bar series in one pass and returns
+    three arrays of the same length as bar data:
+        * target: target position after bar closed, nan for no change
+        * price: order price used for reaching target position
+        * stop: whether to use stop order instead of limit order
+
+    If orders sent by strategy depend on current position instead of a
+    fixed target, strategy should also implement get_signal_orders, which
+    is called with value of target array (as signal) and current position
+    on each signal bar, and returns volumes of orders to send (positive
+    for long and negative for short).
+
+    Orders are then crossed against OHLC of following bars with the same
+    rules used by BacktestingEngine, without creating any bar object.
+    Unfilled orders stay active until traded, unless strategy sets
+    cancel_on_signal to True which cancels them on every new signal.
+    """
+
+    def __init__(self):
+        """"""
+        super().__init__()
+
+        self.setting: dict = {}
+        self.vector_data: HistoryArray = None
+
+        # Bar data without the skipped bar is kept for following runs
+        # (e.g. optimization) on the same history data.
+        self.vector_source: HistoryArray = None
+        self.vector_start_ix: int = 0
+        self.day_starts: np.ndarray = None
+
+    def add_strategy(self, strategy_class: type, setting: dict):
+        """"""
+        super().add_strategy(strategy_class, setting)
+        self.setting = setting
+
+    def run_backtesting(self):
+        """"""
+        if self.mode != BacktestingMode.BAR:
+            self.output("向量化回测仅支持K线模式")
+            return
+
+        if not hasattr(self.strategy, "generate_signal"):
+            self.output(f"策略{self.strategy_class.__name__}不支持向量化回测")
+            return
+
+        # Get number of days for initializing strategy
+        self.strategy.on_init()
+
+        history_data = self.history_data
+
+        if self.vector_source is not history_data:
+            dates = history_data.column("datetime").astype("datetime64[D]")
+            self.day_starts = np.flatnonzero(dates[1:] != dates[:-1]) + 1
+            self.vector_source = history_data
+            self.vector_data = None
+
+        # Find index where initializing ends, same as BacktestingEngine
+        # the bar on this index is skipped.
+        day_starts = self.day_starts
+        day_count = max(self.days - 1, 1)
+
+        if len(day_starts) < day_count:
+            self.output("历史数据不足，回测终止")
+            return
+
+        start_ix = day_starts[day_count - 1]
+
+        if self.vector_data is None or self.vector_start_ix != start_ix:
+            array = np.delete(history_data.array, start_ix)
+            self.vector_data = history_data.new_array(array)
+            self.vector_start_ix = start_ix
+
+        array = self.vector_data.array
+        data_size = len(array)
+
+        if start_ix >= data_size:
+            self.output("历史数据不足，回测终止")
+            return
+
+        self.strategy.inited = True
+        self.output("策略初始化完成")
+
+        # Calculate signal of the whole series
+        data = {name: array[name] for name in array.dtype.names}
+        target, price, stop = self.strategy.generate_signal(data)
+
+        if stop is None:
+            stop = np.zeros(data_size, dtype=bool)
+
+        self.output("开始回放历史数据")
+
+        self.cross_vector_orders(array, start_ix, target, price, stop)
+        self.update_vector_daily_close(array, start_ix)
+
+        self.output("历史数据回放结束")
+
+    def cross_vector_orders(
+        self,
+        array: np.ndarray,
+        start_ix: int,
+        target: np.ndarray,
+        price: np.ndarray,
+        stop: np.ndarray
+    ) -> None:
+        """
+        Simulate order filling against next bars.
+        """
+        open_prices = array["open_price"]
+        high_prices = array["high_price"]
+        low_prices = array["low_price"]
+
+        # Only check bars on which strategy has orders or new signal
+        signal_ixs = np.flatnonzero(~np.isnan(target[start_ix:])) + start_ix
+
+        cancel_on_signal = getattr(self.strategy, "cancel_on_signal", False)
+        get_signal_orders = getattr(self.strategy, "get_signal_orders", None)
+
+        pos = 0
+        orders: List[Tuple[float, float, bool]] = []     # (volume, price, stop)
+
+        next_signal = 0
+        ix = start_ix
+
+        while ix < len(array):
+            # Cross active orders with current bar
+            if orders:
+                open_price = float(open_prices[ix])
+                high_price = float(high_prices[ix])
+                low_price = float(low_prices[ix])
+
+                active_orders = []
+
+                # Limit orders are crossed before stop orders
+                for volume, order_price, is_stop in sorted(orders, key=lambda o: o[2]):
+                    if not is_stop:
+                        if volume > 0 and order_price >= low_price and low_price > 0:
+                            trade_price = min(order_price, open_price)
+                        elif volume < 0 and order_price <= high_price and high_price > 0:
+                            trade_price = max(order_price, open_price)
+                        else:
+                            active_orders.append((volume, order_price, is_stop))
+                            continue
+                    else:
+                        if volume > 0 and order_price <= high_price:
+                            trade_price = max(order_price, open_price)
+                        elif volume < 0 and order_price >= low_price:
+                            trade_price = min(order_price, open_price)
+                        else:
+                            active_orders.append((volume, order_price, is_stop))
+                            continue
+
+                    self.add_vector_trade(ix, volume, trade_price, pos)
+                    pos += volume
+
+                orders = active_orders
+
+            # Send new orders to reach target position
+            while next_signal < len(signal_ixs) and signal_ixs[next_signal] < ix:
+                next_signal += 1
+
+            if next_signal < len(signal_ixs) and signal_ixs[next_signal] == ix:
+                target_pos = float(target[ix])
+
+                if cancel_on_signal:
+                    orders = []
+
+                if get_signal_orders:
+                    volumes = get_signal_orders(target_pos, pos)
+                elif target_pos == pos:
+                    volumes = []
+                # Close existing position and open new position separately
+                elif pos and target_pos * pos < 0:
+                    volumes = [-pos, target_pos]
+                else:
+                    volumes = [target_pos - pos]
+
+                if volumes:
+                    order_price = round_to(float(price[ix]), self.pricetick)
+                    is_stop = bool(stop[ix])
+
+                    for volume in volumes:
+                        orders.append((volume, order_price, is_stop))
+
+            # Jump to next signal if no active order left
+            if not orders:
+                if next_signal >= len(signal_ixs):
+                    break
+                ix = max(ix + 1, int(signal_ixs[next_signal]))
+            else:
+                ix += 1
+
+        self.strategy.pos = pos
+
+    def add_vector_trade(self, ix: int, volume: float, price: float, pos: float) -> None:
+        """
+        Record trade data of vectorized backtesting.
+        """
+        self.datetime = self.vector_data.get_datetime(ix)
+
+        if volume > 0:
+            direction = Direction.LONG
+        else:
+            direction = Direction.SHORT
+
+        if pos and pos * volume < 0:
+            offset = Offset.CLOSE
+        else:
+            offset = Offset.OPEN
+
+        self.limit_order_count += 1
+        self.trade_count += 1
+
+        trade = TradeData(
+            symbol=self.symbol,
+            exchange=self.exchange,
+            orderid=str(self.limit_order_count),
+            tradeid=str(self.trade_count),
+            direction=direction,
+            offset=offset,
+            price=price,
+            volume=abs(volume),
+            datetime=self.datetime,
+            gateway_name=self.gateway_name,
+        )
+        self.trades[trade.vt_tradeid] = trade
+
+    def update_vector_daily_close(self, array: np.ndarray, start_ix: int) -> None:
+        """
+        Create daily result with close price of last bar in each day.
+        """
+        dates = array["datetime"][start_ix:].astype("datetime64[D]")
+        close_prices = array["close_price"][start_ix:]
+
+        day_ends = np.append(np.flatnonzero(dates[1:] != dates[:-1]), len(dates) - 1)
+
+        for ix in day_ends:
+            d = dates[ix].item()
+            self.daily_results[d] = DailyResult(d, float(close_prices[ix]))
+
+    def run_vector_optimization(
+        self,
+        optimization_setting: OptimizationSetting,
+        output: bool = True
+    ) -> list:
+        """
+        Run parameter optimization with vectorized backtesting in
+        current process, history data is only loaded once.
+        """
+        settings = optimization_setting.generate_setting()
+        target_name = optimization_setting.target_name
+
+        if not settings:
+            self.output("优化参数组合为空，请检查")
+            return
+
+        if not target_name:
+            self.output("优化目标未设置，请检查")
+            return
+
+        if not self.history_data:
+            self.load_data()
+
+        strategy_class = self.strategy_class
+
+        result_values = []
+        for setting in settings:
+            self.clear_data()
+            self.add_strategy(strategy_class, setting)
+            self.run_backtesting()
+            self.calculate_result()
+
+            statistics = self.calculate_statistics(output=False)
+            target_value = statistics[target_name]
+            result_values.append((str(setting), target_value, statistics))
+
+        result_values.sort(reverse=True, key=lambda result: result[1])
+
+        if output:
+            for value in result_values:
+                msg = f"参数：{value[0]}, 目标：{value[1]}"
+                self.output(msg)
+
+        return result_values
+
+    def check_consistency(self, columns: List[str] = None) -> DataFrame:
+        """
+        Run the same strategy with event-driven BacktestingEngine, and
+        return days on which daily results are different.
+        """
+        if not columns:
+            columns = ["trade_count", "end_pos", "net_pnl"]
+
+        if self.daily_df is None:
+            self.run_backtesting()
+            self.calculate_result()
+
+        engine = BacktestingEngine()
+        engine.output = self.output
+        engine.set_parameters(
+            vt_symbol=self.vt_symbol,
+            interval=self.interval,
+            start=self.start,
+            rate=self.rate,
+            slippage=self.slippage,
+            size=self.size,
+            pricetick=self.pricetick,
+            capital=self.capital,
+            end=self.end,
+            mode=self.mode,
+            inverse=self.inverse
+        )
+        engine.add_strategy(self.strategy_class, self.setting)
+        engine.history_data = self.history_data
+        engine.run_backtesting()
+        engine.calculate_result()
+
+        vector_df = self.daily_df
+        event_df = engine.daily_df
+
+        if vector_df is None or event_df is None:
+            self.output("回测结果为空，无法比较")
+            return None
+
+        df = vector_df[columns].join(
+            event_df[columns], how="outer", lsuffix="_vector", rsuffix="_event"
+        ).fillna(0)
+
+        diff = np.zeros(len(df), dtype=bool)
+        for column in columns:
+            diff |= ~np.isclose(df[f"{column}_vector"], df[f"{column}_event"])
+
+        diff_df = df[diff]
+        self.output(f"一致性检查完成，结果不一致天数：{len(diff_df)}/{len(df)}")
+
+        return diff_df
@@ -1,15 +1,19 @@
 import csv
 from datetime import datetime
-from typing import List, Tuple
+from operator import attrgetter
+from typing import Iterator, List, TextIO, Tuple
 
+import numpy as np
+import pandas as pd
 from pytz import timezone
 
-from vnpy.trader.database import BarOverview, DB_TZ
+from vnpy.trader.columnar import TICK_FIELDS
+from vnpy.trader.database import BarOverview, DB_TZ, CHUNK_SIZE
 from vnpy.trader.engine import BaseEngine, MainEngine, EventEngine
 from vnpy.trader.constant import Interval, Exchange
-from vnpy.trader.object import BarData, HistoryRequest
-from vnpy.trader.rqdata import rqdata_client
+from vnpy.trader.object import BarData, TickData, HistoryRequest
 from vnpy.trader.database import database_manager
+from vnpy.trader.downloader import HistoryDownloader, DownloadProgress, CallbackType
 
 
 APP_NAME = "DataManager"
@@ -26,6 +30,8 @@ class ManagerEngine(BaseEngine):
         """"""
         super().__init__(main_engine, event_engine, APP_NAME)
 
+        self.downloader: HistoryDownloader = HistoryDownloader(main_engine)
+
     def import_data_from_csv(
         self,
         file_path: str,
@@ -42,55 +48,110 @@ class ManagerEngine(BaseEngine):
         open_interest_head: str,
         datetime_format: str
     ) -> Tuple:
-        """"""
-        with open(file_path, "rt") as f:
-            buf = [line.replace("\0", "") for line in f]
-
-        reader = csv.DictReader(buf, delimiter=",")
-
-        bars = []
+        """
+        Import bar data from csv file chunk by chunk, so that memory usage
+        is bounded no matter how large the file is.
+        """
         start = None
+        end = None
         count = 0
-        tz = timezone(tz_name)
-
-        for item in reader:
-            if datetime_head not in item and all([i in item for i in ["date", "time"]]):
-                item[datetime_head] = "{} {}".format(item["date"], item["time"])
-            if open_interest_head not in item and "spread" in item:
-                item[open_interest_head] = item["spread"]
-            if datetime_format:
-                dt = datetime.strptime(item[datetime_head], datetime_format)
+
+        for df in read_csv_chunks(file_path, [datetime_head, "date", "time"]):
+            if datetime_head not in df and "date" in df and "time" in df:
+                df[datetime_head] = df["date"] + " " + df["time"]
+            if open_interest_head not in df and "spread" in df:
+                df[open_interest_head] = df["spread"]
+
+            dts = parse_datetime(df[datetime_head], datetime_format, tz_name)
+
+            if open_interest_head in df:
+                open_interests = get_column(df, open_interest_head)
             else:
-                dt = datetime.fromisoformat(item[datetime_head])
-            dt = tz.localize(dt)
-
-            open_interest = item.get(open_interest_head, 0)
-
-            bar = BarData(
-                symbol=symbol,
-                exchange=exchange,
-                datetime=dt,
-                interval=interval,
-                volume=float(item[volume_head]),
-                open_price=float(item[open_head]),
-                high_price=float(item[high_head]),
-                low_price=float(item[low_head]),
-                close_price=float(item[close_head]),
-                open_interest=float(open_interest),
-                gateway_name="DB",
-            )
-
-            bars.append(bar)
+                open_interests = [0.0] * len(df)
+
+            bars = [
+                BarData(
+                    symbol=symbol,
+                    exchange=exchange,
+                    datetime=dt,
+                    interval=interval,
+                    volume=volume,
+                    open_price=open_price,
+                    high_price=high_price,
+                    low_price=low_price,
+                    close_price=close_price,
+                    open_interest=open_interest,
+                    gateway_name="DB",
+                )
+                for dt, volume, open_price, high_price, low_price, close_price, open_interest in zip(
+                    dts,
+                    get_column(df, volume_head),
+                    get_column(df, open_head),
+                    get_column(df, high_head),
+                    get_column(df, low_head),
+                    get_column(df, close_head),
+                    open_interests
+                )
+            ]
+
+            if not bars:
+                continue
+
+            # insert into database
+            database_manager.save_bar_data(bars)
 
             # do some statistics
-            count += 1
+            count += len(bars)
             if not start:
-                start = bar.datetime
+                start = bars[0].datetime
+            end = bars[-1].datetime
 
-        # insert into database
-        database_manager.save_bar_data(bars)
+        return start, end, count
+
+    def import_tick_data_from_csv(
+        self,
+        file_path: str,
+        symbol: str,
+        exchange: Exchange,
+        tz_name: str,
+        datetime_head: str,
+        datetime_format: str
+    ) -> Tuple:
+        """
+        Import tick data from csv file chunk by chunk.
+
+        Columns are matched by field names of TickData (e.g. last_price,
+        bid_price_1), fields without column in file are set to 0.
+        """
+        start = None
+        end = None
+        count = 0
+
+        for df in read_csv_chunks(file_path, [datetime_head]):
+            dts = parse_datetime(df[datetime_head], datetime_format, tz_name)
+            names = [name for name in TICK_FIELDS if name in df]
+
+            ticks = [
+                TickData(
+                    symbol=symbol,
+                    exchange=exchange,
+                    datetime=dt,
+                    gateway_name="DB",
+                    **dict(zip(names, values))
+                )
+                for dt, *values in zip(dts, *[get_column(df, name) for name in names])
+            ]
+
+            if not ticks:
+                continue
+
+            database_manager.save_tick_data(ticks)
+
+            count += len(ticks)
+            if not start:
+                start = ticks[0].datetime
+            end = ticks[-1].datetime
 
-        end = bar.datetime
         return start, end, count
 
     def output_data_to_csv(
@@ -103,8 +164,6 @@ class ManagerEngine(BaseEngine):
         end: datetime
     ) -> bool:
         """"""
-        bars = self.load_bar_data(symbol, exchange, interval, start, end)
-
         fieldnames = [
             "symbol",
             "exchange",
@@ -119,22 +178,64 @@ class ManagerEngine(BaseEngine):
 
         try:
             with open(file_path, "w") as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator="\n")
-                writer.writeheader()
-
-                for bar in bars:
-                    d = {
-                        "symbol": bar.symbol,
-                        "exchange": bar.exchange.value,
-                        "datetime": bar.datetime.strftime("%Y-%m-%d %H:%M:%S"),
-                        "open": bar.open_price,
-                        "high": bar.high_price,
-                        "low": bar.low_price,
-                        "close": bar.close_price,
-                        "volume": bar.volume,
-                        "open_interest": bar.open_interest,
-                    }
-                    writer.writerow(d)
+                writer = csv.writer(f, lineterminator="\n")
+                writer.writerow(fieldnames)
+
+                # Write data chunk by chunk to keep memory usage constant
+                for bars in database_manager.iter_bar_data(
+                    symbol, exchange, interval, start, end
+                ):
+                    writer.writerows(
+                        (
+                            bar.symbol,
+                            bar.exchange.value,
+                            bar.datetime.strftime("%Y-%m-%d %H:%M:%S"),
+                            bar.open_price,
+                            bar.high_price,
+                            bar.low_price,
+                            bar.close_price,
+                            bar.volume,
+                            bar.open_interest,
+                        )
+                        for bar in bars
+                    )
+
+            return True
+        except PermissionError:
+            return False
+
+    def output_tick_data_to_csv(
+        self,
+        file_path: str,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime
+    ) -> bool:
+        """
+        Output tick data to csv file chunk by chunk, which can be imported
+        again by import_tick_data_from_csv.
+        """
+        fieldnames = ["symbol", "exchange", "datetime"] + TICK_FIELDS
+        getter = attrgetter(*TICK_FIELDS)
+
+        try:
+            with open(file_path, "w") as f:
+                writer = csv.writer(f, lineterminator="\n")
+                writer.writerow(fieldnames)
+
+                for ticks in database_manager.iter_tick_data(
+                    symbol, exchange, start, end
+                ):
+                    writer.writerows(
+                        (
+                            tick.symbol,
+                            tick.exchange.value,
+                            tick.datetime.strftime("%Y-%m-%d %H:%M:%S.%f"),
+                            *getter(tick)
+                        )
+                        for tick in ticks
+                    )
 
             return True
         except PermissionError:
@@ -144,6 +245,12 @@ class ManagerEngine(BaseEngine):
         """"""
         return database_manager.get_bar_overview()
 
+    def rebuild_bar_overview(self) -> None:
+        """
+        Rebuild overview of all bar data in database.
+        """
+        database_manager.rebuild_bar_overview()
+
     def load_bar_data(
         self,
         symbol: str,
@@ -186,7 +293,7 @@ class ManagerEngine(BaseEngine):
         start: datetime
     ) -> int:
         """
-        Query bar data from RQData.
+        Query bar data from gateway or RQData.
         """
         req = HistoryRequest(
             symbol=symbol,
@@ -196,26 +303,8 @@ class ManagerEngine(BaseEngine):
             end=datetime.now(DB_TZ)
         )
 
-        vt_symbol = f"{symbol}.{exchange.value}"
-        contract = self.main_engine.get_contract(vt_symbol)
-
-        # If history data provided in gateway, then query
-        if contract and contract.history_data:
-            data = self.main_engine.query_history(
-                req, contract.gateway_name
-            )
-        # Otherwise use RQData to query data
-        else:
-            if not rqdata_client.inited:
-                rqdata_client.init()
-
-            data = rqdata_client.query_history(req)
-
-        if data:
-            database_manager.save_bar_data(data)
-            return(len(data))
-
-        return 0
+        progress = self.downloader.download_bar_data([req])
+        return progress.count
 
     def download_tick_data(
         self,
@@ -233,13 +322,69 @@ class ManagerEngine(BaseEngine):
             end=datetime.now(DB_TZ)
         )
 
-        if not rqdata_client.inited:
-            rqdata_client.init()
+        progress = self.downloader.download_tick_data([req])
+        return progress.count
+
+    def update_bar_data(self, callback: CallbackType = None) -> DownloadProgress:
+        """
+        Update bar data of all symbols in database to latest.
+        """
+        return self.downloader.update_bar_data(callback)
+
+
+class NullStripper:
+    """
+    Remove null characters from text file when read by pandas.
+    """
+
+    def __init__(self, f: TextIO):
+        """"""
+        self.f: TextIO = f
+
+    def read(self, size: int = -1) -> str:
+        """"""
+        return self.f.read(size).replace("\0", "")
+
+    def __iter__(self) -> Iterator[str]:
+        """"""
+        for line in self.f:
+            yield line.replace("\0", "")
+
+
+def read_csv_chunks(file_path: str, str_columns: List[str]) -> Iterator[pd.DataFrame]:
+    """
+    Read csv file into DataFrames of at most CHUNK_SIZE rows.
+
+    Columns in str_columns are kept as text, otherwise datetime like
+    001500 is read as integer and leading zeros are lost.
+    """
+    dtype = {name: str for name in str_columns}
+
+    with open(file_path, "rt") as f:
+        yield from pd.read_csv(NullStripper(f), chunksize=CHUNK_SIZE, dtype=dtype)
+
+
+def get_column(df: pd.DataFrame, name: str) -> List[float]:
+    """
+    Convert column of DataFrame into list of float.
+    """
+    return df[name].to_numpy(dtype=float).tolist()
+
+
+def parse_datetime(column: pd.Series, datetime_format: str, tz_name: str) -> List[datetime]:
+    """
+    Parse column of datetime string and localize into timezone of tz_name.
 
-        data = rqdata_client.query_tick_history(req)
+    Ambiguous time at the end of DST is treated as standard time, the
+    same as pytz localize, and non-existent time at the start of DST is
+    shifted forward.
+    """
+    dts = pd.to_datetime(column, format=datetime_format or None)
 
-        if data:
-            database_manager.save_tick_data(data)
-            return(len(data))
+    dts = dts.dt.tz_localize(
+        timezone(tz_name),
+        ambiguous=np.zeros(len(dts), dtype=bool),
+        nonexistent="shift_forward"
+    )
 
-        return 0
+    return list(dts.dt.to_pydatetime())
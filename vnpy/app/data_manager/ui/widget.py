@@ -8,6 +8,7 @@ from vnpy.trader.ui import QtWidgets, QtCore
 from vnpy.trader.engine import MainEngine, EventEngine
 from vnpy.trader.constant import Interval, Exchange
 from vnpy.trader.database import DB_TZ
+from vnpy.trader.downloader import DownloadProgress
 
 from ..engine import APP_NAME, ManagerEngine
 
@@ -36,6 +37,9 @@ class ManagerWidget(QtWidgets.QWidget):
         refresh_button = QtWidgets.QPushButton("刷新")
         refresh_button.clicked.connect(self.refresh_tree)
 
+        rebuild_button = QtWidgets.QPushButton("重建统计")
+        rebuild_button.clicked.connect(self.rebuild_overview)
+
         import_button = QtWidgets.QPushButton("导入数据")
         import_button.clicked.connect(self.import_data)
 
@@ -47,6 +51,7 @@ class ManagerWidget(QtWidgets.QWidget):
 
         hbox1 = QtWidgets.QHBoxLayout()
         hbox1.addWidget(refresh_button)
+        hbox1.addWidget(rebuild_button)
         hbox1.addStretch()
         hbox1.addWidget(import_button)
         hbox1.addWidget(update_button)
@@ -197,6 +202,14 @@ class ManagerWidget(QtWidgets.QWidget):
         self.hour_child.setExpanded(True)
         self.daily_child.setExpanded(True)
 
+    def rebuild_overview(self) -> None:
+        """
+        Rebuild overview of bar data, in case it is lost or not matching
+        data changed outside.
+        """
+        self.engine.rebuild_bar_overview()
+        self.refresh_tree()
+
     def import_data(self) -> None:
         """"""
         dialog = ImportDialog()
@@ -218,21 +231,32 @@ class ManagerWidget(QtWidgets.QWidget):
         open_interest_head = dialog.open_interest_edit.text()
         datetime_format = dialog.format_edit.text()
 
-        start, end, count = self.engine.import_data_from_csv(
-            file_path,
-            symbol,
-            exchange,
-            interval,
-            tz_name,
-            datetime_head,
-            open_head,
-            high_head,
-            low_head,
-            close_head,
-            volume_head,
-            open_interest_head,
-            datetime_format
-        )
+        # Columns of tick data are matched by field names of TickData
+        if interval == Interval.TICK:
+            start, end, count = self.engine.import_tick_data_from_csv(
+                file_path,
+                symbol,
+                exchange,
+                tz_name,
+                datetime_head,
+                datetime_format
+            )
+        else:
+            start, end, count = self.engine.import_data_from_csv(
+                file_path,
+                symbol,
+                exchange,
+                interval,
+                tz_name,
+                datetime_head,
+                open_head,
+                high_head,
+                low_head,
+                close_head,
+                volume_head,
+                open_interest_head,
+                datetime_format
+            )
 
         msg = f"\
         CSV载入成功\n\
@@ -356,10 +380,6 @@ class ManagerWidget(QtWidgets.QWidget):
 
     def update_data(self) -> None:
         """"""
-        overviews = self.engine.get_bar_overview()
-        total = len(overviews)
-        count = 0
-
         dialog = QtWidgets.QProgressDialog(
             "历史数据更新中",
             "取消",
@@ -370,22 +390,23 @@ class ManagerWidget(QtWidgets.QWidget):
         dialog.setWindowModality(QtCore.Qt.WindowModal)
         dialog.setValue(0)
 
-        for overview in overviews:
-            if dialog.wasCanceled():
-                break
-
-            self.engine.download_bar_data(
-                overview.symbol,
-                overview.exchange,
-                overview.interval,
-                overview.end
-            )
-            count += 1
-            progress = int(round(count / total * 100, 0))
-            dialog.setValue(progress)
+        def update_progress(progress: DownloadProgress) -> bool:
+            """"""
+            value = int(round(progress.finished / progress.total * 100, 0))
+            dialog.setValue(value)
+            dialog.setLabelText(f"历史数据更新中，{progress.rate:,.0f}条/秒")
+            return not dialog.wasCanceled()
 
+        progress = self.engine.update_bar_data(update_progress)
         dialog.close()
 
+        QtWidgets.QMessageBox.information(
+            self,
+            "更新完成",
+            f"共更新{progress.count}条数据，耗时{progress.cost:.1f}秒，失败{progress.failed}次",
+            QtWidgets.QMessageBox.Ok
+        )
+
     def download_data(self) -> None:
         """"""
         dialog = DownloadDialog(self.engine)
@@ -475,8 +496,7 @@ class ImportDialog(QtWidgets.QDialog):
 
         self.interval_combo = QtWidgets.QComboBox()
         for i in Interval:
-            if i != Interval.TICK:
-                self.interval_combo.addItem(str(i.name), i)
+            self.interval_combo.addItem(str(i.name), i)
 
         self.tz_combo = QtWidgets.QComboBox()
         self.tz_combo.addItems(all_timezones)
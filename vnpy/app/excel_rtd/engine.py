@@ -3,7 +3,7 @@
 from typing import Set
 
 from vnpy.event import Event, EventEngine
-from vnpy.rpc import RpcServer
+from vnpy.rpc import RpcServer, ConflatedQueue
 from vnpy.trader.engine import BaseEngine, MainEngine
 from vnpy.trader.object import TickData, LogData, SubscribeRequest
 from vnpy.trader.event import EVENT_TICK
@@ -16,6 +16,10 @@ EVENT_RTD_LOG = "eRtdLog"
 REP_ADDRESS = "tcp://*:9001"
 PUB_ADDRESS = "tcp://*:9002"
 
+# Excel cells are not refreshed faster than this interval (in seconds),
+# so only the latest tick of each contract is published within it.
+PUBLISH_INTERVAL = 0.5
+
 
 class RtdEngine(BaseEngine):
     """
@@ -26,7 +30,9 @@ class RtdEngine(BaseEngine):
         """"""
         super().__init__(main_engine, event_engine, APP_NAME)
 
-        self.server: RpcServer = RpcServer()
+        self.server: RpcServer = RpcServer(
+            publish_queue=ConflatedQueue(PUBLISH_INTERVAL)
+        )
         self.server.register(self.subscribe)
         self.server.register(self.write_log)
         self.server.start(REP_ADDRESS, PUB_ADDRESS)
@@ -46,7 +52,7 @@ class RtdEngine(BaseEngine):
         Process tick event and update related RTD value.
         """
         tick: TickData = event.data
-        self.server.publish("tick", tick)
+        self.server.publish(tick.vt_symbol, tick)
 
     def write_log(self, msg: str) -> None:
         """
@@ -78,6 +78,12 @@ class RtdClient(RpcClient):
         Add a new RTD into the engine..
         """
         buf = self.rtds[rtd.name]
+
+        # Receive published data of vt_symbol only, which is conflated
+        # by server with vt_symbol as topic
+        if not buf:
+            self.subscribe_topic(rtd.name)
+
         buf.add(rtd)
         self.write_log(f"新增RTD连接：{rtd.name} {rtd.field}")
 
@@ -98,7 +104,6 @@ def init_client() -> None:
     """Initialize vnpy rtd client"""
     global rtd_client
     rtd_client = RtdClient()
-    rtd_client.subscribe_topic("")
     rtd_client.start(REQ_ADDRESS, SUB_ADDRESS)
 
 
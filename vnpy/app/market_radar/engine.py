@@ -1,8 +1,10 @@
 import traceback
-from typing import Dict, Set, Any
+from typing import Callable, Dict, Set, Any, Sequence, Tuple
 from datetime import datetime
 from collections import defaultdict
 from enum import Enum
+from functools import lru_cache
+from keyword import iskeyword
 
 try:
     from winsound import PlaySound, SND_ASYNC
@@ -24,6 +26,7 @@ EVENT_RADAR_RULE = "eRadarRule"
 EVENT_RADAR_UPDATE = "eRadarUpdate"
 EVENT_RADAR_LOG = "eRaderLog"
 EVENT_RADAR_SIGNAL = "eRadarSignal"
+EVENT_RADAR_CALCULATE = "eRadarCalculate"
 
 
 class RadarRule:
@@ -36,6 +39,9 @@ class RadarRule:
         self.params: Dict[str, str] = params
         self.ndigits = ndigits
 
+        self.func: Callable[..., float] = compile_formula(formula, tuple(params.keys()))
+        self.vt_symbols: Tuple[str, ...] = tuple(params.values())
+
 
 class SignalType(Enum):
     """"""
@@ -85,6 +91,10 @@ class RadarEngine(BaseEngine):
 
         self.signal_id: int = 0
 
+        # Rules to be calculated once when calculate event is processed
+        self.pending_rules: Set[RadarRule] = set()
+        self.calculate_event: Event = Event(EVENT_RADAR_CALCULATE)
+
         self.inited = False
 
         self.register_event()
@@ -101,16 +111,33 @@ class RadarEngine(BaseEngine):
         """"""
         self.event_engine.register(EVENT_TICK, self.process_tick_event)
         self.event_engine.register(EVENT_CONTRACT, self.process_contract_event)
+        self.event_engine.register(EVENT_RADAR_CALCULATE, self.process_calculate_event)
 
     def process_tick_event(self, event: Event) -> None:
-        """"""
+        """
+        Rules affected are only calculated once with latest ticks after
+        all ticks already in queue are processed, which also merges rules
+        triggered by ticks of different symbols.
+        """
         tick: TickData = event.data
 
-        if tick.vt_symbol not in self.symbol_rule_map:
+        rules = self.symbol_rule_map.get(tick.vt_symbol, None)
+        if not rules:
             return
 
-        for rule in self.symbol_rule_map[tick.vt_symbol]:
-            self.calculate_rule(rule)
+        if not self.pending_rules:
+            self.event_engine.put(self.calculate_event)
+        self.pending_rules.update(rules)
+
+    def process_calculate_event(self, event: Event) -> None:
+        """"""
+        rules = self.pending_rules
+        self.pending_rules = set()
+
+        for rule in rules:
+            # Skip rules removed after ticks arrived
+            if self.rules.get(rule.name, None) is rule:
+                self.calculate_rule(rule)
 
     def process_contract_event(self, event: Event) -> None:
         """"""
@@ -185,6 +212,8 @@ class RadarEngine(BaseEngine):
         rule.formula = formula
         rule.params = params
         rule.ndigits = ndigits
+        rule.func = compile_formula(formula, tuple(params.keys()))
+        rule.vt_symbols = tuple(params.values())
 
         for vt_symbol in params.values():
             if vt_symbol not in self.symbol_rule_map:
@@ -244,17 +273,17 @@ class RadarEngine(BaseEngine):
 
     def calculate_rule(self, rule: RadarRule) -> None:
         """"""
-        data = {}
+        values = []
 
-        for name, vt_symbol in rule.params.items():
+        for vt_symbol in rule.vt_symbols:
             tick = self.main_engine.get_tick(vt_symbol)
 
             if not tick:
                 return
             else:
-                data[name] = tick.last_price
+                values.append(tick.last_price)
 
-        value = parse_formula(rule.formula, data)
+        value = rule.func(*values)
         if value is None:
             return
         value = round(value, rule.ndigits)
@@ -373,8 +402,24 @@ class RadarEngine(BaseEngine):
                     PlaySound("SystemHand", SND_ASYNC)
 
 
+@lru_cache(maxsize=None)
+def compile_formula(formula: str, names: Sequence[str]) -> Callable[..., float]:
+    """
+    Compile formula into function taking values of names as arguments,
+    so that formula is only parsed once instead of every calculation.
+    """
+    for name in names:
+        if not name.isidentifier() or iskeyword(name):
+            raise ValueError(f"参数名称{name}不合法")
+
+    # Make sure formula is a single expression before wrapping it
+    compile(formula, "<formula>", "eval")
+
+    source = f"lambda {', '.join(names)}: ({formula}\n)"
+    return eval(compile(source, "<formula>", "eval"), {})
+
+
 def parse_formula(formula: str, data: Dict[str, float]) -> float:
     """"""
-    locals().update(data)
-    result = eval(formula)
-    return result
+    func = compile_formula(formula, tuple(data.keys()))
+    return func(*data.values())
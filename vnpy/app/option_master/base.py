@@ -2,6 +2,8 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Callable
 from types import ModuleType
 
+import numpy as np
+
 from vnpy.trader.object import ContractData, TickData, TradeData
 from vnpy.trader.constant import Exchange, OptionType, Direction, Offset
 from vnpy.trader.converter import PositionHolding
@@ -375,6 +377,9 @@ class ChainData:
 
         self.use_synthetic: bool = False
 
+        self.pricing_model: ModuleType = None
+        self.vectorized: bool = False
+
     def add_option(self, option: OptionData) -> None:
         """"""
         self.options[option.vt_symbol] = option
@@ -440,11 +445,98 @@ class ChainData:
         if not self.use_synthetic:
             self.calculate_underlying_adjustment()
 
-        for option in self.options.values():
-            option.update_underlying_tick(self.underlying_adjustment)
+        if self.vectorized:
+            self.calculate_chain_greeks()
+        else:
+            for option in self.options.values():
+                option.update_underlying_tick(self.underlying_adjustment)
 
         self.calculate_pos_greeks()
 
+    def calculate_chain_greeks(self) -> None:
+        """
+        Calculate impv and greeks of all options with one call of
+        vectorized pricing model, same result as update_underlying_tick
+        of each option.
+        """
+        for option in self.options.values():
+            option.underlying_adjustment = self.underlying_adjustment
+
+        if self.underlying and self.underlying.mid_price:
+            underlying_price = self.underlying.mid_price + self.underlying_adjustment
+
+            options = [option for option in self.options.values() if option.tick]
+            if options:
+                self.calculate_options_impv(options, underlying_price)
+
+            options = [option for option in self.options.values() if option.mid_impv]
+            if options:
+                self.calculate_options_cash_greeks(options, underlying_price)
+
+        for option in self.options.values():
+            option.calculate_pos_greeks()
+
+    def calculate_options_impv(
+        self,
+        options: List[OptionData],
+        underlying_price: float
+    ) -> None:
+        """"""
+        ask_prices = np.array([option.tick.ask_price_1 for option in options])
+        bid_prices = np.array([option.tick.bid_price_1 for option in options])
+
+        # Adjustment for crypto inverse option contract
+        if self.inverse:
+            ask_prices *= underlying_price
+            bid_prices *= underlying_price
+
+        # Calculate ask and bid impv together
+        count = len(options)
+
+        impvs = self.pricing_model.calculate_impv(
+            np.concatenate((ask_prices, bid_prices)),
+            underlying_price,
+            np.tile([option.strike_price for option in options], 2),
+            np.tile([option.interest_rate for option in options], 2),
+            np.tile([option.time_to_expiry for option in options], 2),
+            np.tile([option.option_type for option in options], 2)
+        )
+
+        for option, ask_impv, bid_impv in zip(options, impvs[:count], impvs[count:]):
+            option.ask_impv = float(ask_impv)
+            option.bid_impv = float(bid_impv)
+            option.mid_impv = (option.ask_impv + option.bid_impv) / 2
+
+    def calculate_options_cash_greeks(
+        self,
+        options: List[OptionData],
+        underlying_price: float
+    ) -> None:
+        """"""
+        price, delta, gamma, theta, vega = self.pricing_model.calculate_greeks(
+            underlying_price,
+            np.array([option.strike_price for option in options]),
+            np.array([option.interest_rate for option in options]),
+            np.array([option.time_to_expiry for option in options]),
+            np.array([option.mid_impv for option in options]),
+            np.array([option.option_type for option in options])
+        )
+
+        sizes = np.array([option.size for option in options])
+        cash_greeks = np.array([delta, gamma, theta, vega]) * sizes
+
+        # Adjustment for crypto inverse option contract
+        if self.inverse:
+            cash_greeks /= underlying_price
+
+        cash_greeks = cash_greeks.T
+
+        for option, (cash_delta, cash_gamma, cash_theta, cash_vega) in zip(options, cash_greeks):
+            option.cash_delta = float(cash_delta)
+            option.cash_gamma = float(cash_gamma)
+            option.cash_theta = float(cash_theta)
+            option.cash_vega = float(cash_vega)
+
     def update_trade(self, trade: TradeData) -> None:
         """"""
         option = self.options[trade.vt_symbol]
@@ -490,6 +582,9 @@ class ChainData:
 
     def set_pricing_model(self, pricing_model: ModuleType) -> None:
         """"""
+        self.pricing_model = pricing_model
+        self.vectorized = getattr(pricing_model, "VECTORIZED", False)
+
         for option in self.options.values():
             option.set_pricing_model(pricing_model)
 
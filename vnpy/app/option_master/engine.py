@@ -37,11 +37,13 @@ except ImportError:
         black_76, binomial_tree, black_scholes
     )
     print("Faile to import cython option pricing model, please rebuild with cython in cmd.")
+from .pricing import black_76_vector
 from .algo import ElectronicEyeAlgo
 
 
 PRICING_MODELS = {
     "Black-76 欧式期货期权": black_76,
+    "Black-76 欧式期货期权(向量化)": black_76_vector,
     "Black-Scholes 欧式股票期权": black_scholes,
     "二叉树 美式期货期权": binomial_tree
 }
@@ -0,0 +1,250 @@
+"""
+Black-76 model vectorized with numpy, has the same functions as
+black_76 but all parameters can be either float or numpy array, so
+that a whole option chain is calculated with one function call.
+"""
+
+from typing import Tuple, Union
+
+import numpy as np
+from scipy.special import ndtr
+
+# ChainData calculates all options with one call if True
+VECTORIZED = True
+
+ArrayLike = Union[float, np.ndarray]
+
+SQRT_2PI = np.sqrt(2 * np.pi)
+
+
+def cdf(x: ArrayLike) -> ArrayLike:
+    """Cumulative distribution function of standard normal"""
+    return ndtr(x)
+
+
+def pdf(x: ArrayLike) -> ArrayLike:
+    """Probability density function of standard normal"""
+    return np.exp(-0.5 * x * x) / SQRT_2PI
+
+
+def to_result(value: ArrayLike) -> ArrayLike:
+    """Convert 0-dim array into float for scalar input"""
+    if np.ndim(value):
+        return value
+    return float(value)
+
+
+def calculate_d1(
+    s: ArrayLike,
+    k: ArrayLike,
+    r: ArrayLike,
+    t: ArrayLike,
+    v: ArrayLike
+) -> ArrayLike:
+    """Calculate option D1 value"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1 = (np.log(s / k) + (0.5 * v * v) * t) / (v * np.sqrt(t))
+    return d1
+
+
+def calculate_price(
+    s: ArrayLike,
+    k: ArrayLike,
+    r: ArrayLike,
+    t: ArrayLike,
+    v: ArrayLike,
+    cp: ArrayLike,
+    d1: ArrayLike = None
+) -> ArrayLike:
+    """Calculate option price"""
+    if d1 is None:
+        d1 = calculate_d1(s, k, r, t, v)
+    d2 = d1 - v * np.sqrt(t)
+
+    price = cp * (s * cdf(cp * d1) - k * cdf(cp * d2)) * np.exp(-r * t)
+
+    # Use option space value if volatility not positive
+    price = np.where(v > 0, price, np.maximum(0, cp * (s - k)))
+    return to_result(price)
+
+
+def calculate_delta(
+    s: ArrayLike,
+    k: ArrayLike,
+    r: ArrayLike,
+    t: ArrayLike,
+    v: ArrayLike,
+    cp: ArrayLike,
+    d1: ArrayLike = None
+) -> ArrayLike:
+    """Calculate option delta"""
+    if d1 is None:
+        d1 = calculate_d1(s, k, r, t, v)
+
+    _delta = cp * np.exp(-r * t) * cdf(cp * d1)
+    delta = _delta * s * 0.01
+
+    delta = np.where(v > 0, delta, 0)
+    return to_result(delta)
+
+
+def calculate_gamma(
+    s: ArrayLike,
+    k: ArrayLike,
+    r: ArrayLike,
+    t: ArrayLike,
+    v: ArrayLike,
+    d1: ArrayLike = None
+) -> ArrayLike:
+    """Calculate option gamma"""
+    if d1 is None:
+        d1 = calculate_d1(s, k, r, t, v)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        _gamma = np.exp(-r * t) * pdf(d1) / (s * v * np.sqrt(t))
+    gamma = _gamma * s * s * 0.0001
+
+    gamma = np.where(v > 0, gamma, 0)
+    return to_result(gamma)
+
+
+def calculate_theta(
+    s: ArrayLike,
+    k: ArrayLike,
+    r: ArrayLike,
+    t: ArrayLike,
+    v: ArrayLike,
+    cp: ArrayLike,
+    d1: ArrayLike = None,
+    annual_days: int = 240
+) -> ArrayLike:
+    """Calculate option theta"""
+    if d1 is None:
+        d1 = calculate_d1(s, k, r, t, v)
+    d2 = d1 - v * np.sqrt(t)
+
+    discount = np.exp(-r * t)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        _theta = -s * discount * pdf(d1) * v / (2 * np.sqrt(t)) \
+            + cp * r * s * discount * cdf(cp * d1) \
+            - cp * r * k * discount * cdf(cp * d2)
+    theta = _theta / annual_days
+
+    theta = np.where(v > 0, theta, 0)
+    return to_result(theta)
+
+
+def calculate_vega(
+    s: ArrayLike,
+    k: ArrayLike,
+    r: ArrayLike,
+    t: ArrayLike,
+    v: ArrayLike,
+    d1: ArrayLike = None
+) -> ArrayLike:
+    """Calculate option vega(%)"""
+    vega = calculate_original_vega(s, k, r, t, v, d1) / 100
+    return to_result(vega)
+
+
+def calculate_original_vega(
+    s: ArrayLike,
+    k: ArrayLike,
+    r: ArrayLike,
+    t: ArrayLike,
+    v: ArrayLike,
+    d1: ArrayLike = None
+) -> ArrayLike:
+    """Calculate option vega"""
+    if d1 is None:
+        d1 = calculate_d1(s, k, r, t, v)
+
+    vega = s * np.exp(-r * t) * pdf(d1) * np.sqrt(t)
+
+    vega = np.where(v > 0, vega, 0)
+    return to_result(vega)
+
+
+def calculate_greeks(
+    s: ArrayLike,
+    k: ArrayLike,
+    r: ArrayLike,
+    t: ArrayLike,
+    v: ArrayLike,
+    cp: ArrayLike,
+    annual_days: int = 240
+) -> Tuple[ArrayLike, ArrayLike, ArrayLike, ArrayLike, ArrayLike]:
+    """Calculate option price and greeks"""
+    d1 = calculate_d1(s, k, r, t, v)
+    price = calculate_price(s, k, r, t, v, cp, d1)
+    delta = calculate_delta(s, k, r, t, v, cp, d1)
+    gamma = calculate_gamma(s, k, r, t, v, d1)
+    theta = calculate_theta(s, k, r, t, v, cp, d1, annual_days)
+    vega = calculate_vega(s, k, r, t, v, d1)
+    return price, delta, gamma, theta, vega
+
+
+def calculate_impv(
+    price: ArrayLike,
+    s: ArrayLike,
+    k: ArrayLike,
+    r: ArrayLike,
+    t: ArrayLike,
+    cp: ArrayLike
+) -> ArrayLike:
+    """Calculate option implied volatility"""
+    price, s, k, r, t, cp = np.broadcast_arrays(
+        *[np.asarray(x, dtype=float) for x in (price, s, k, r, t, cp)]
+    )
+
+    # Check option price must be positive and meets minimum value
+    # (exercise value)
+    discount = np.exp(-r * t)
+    meet = (price > 0) & (price > cp * (s - k) * discount)
+
+    # Calculate implied volatility with Newton's method, only options
+    # not converged yet are calculated in each round
+    v = np.full(price.shape, 0.01)
+    ix = np.flatnonzero(meet)
+
+    price = price.ravel()
+    s = s.ravel()
+    k = k.ravel()
+    r = r.ravel()
+    t = t.ravel()
+    cp = cp.ravel()
+    v_flat = v.reshape(-1)
+
+    for i in range(50):
+        if not ix.size:
+            break
+
+        # Caculate option price and vega with current guess
+        s_, k_, r_, t_, v_, cp_ = s[ix], k[ix], r[ix], t[ix], v_flat[ix], cp[ix]
+
+        # Vega is calculated with d1 equal to cp the same as black_76,
+        # which keeps steps stable for deep in or out of money options
+        p = calculate_price(s_, k_, r_, t_, v_, cp_)
+        vega = calculate_original_vega(s_, k_, r_, t_, v_, cp_)
+
+        # Stop if vega too close to 0
+        valid = vega != 0
+        ix = ix[valid]
+
+        # Calculate error value
+        dx = (price[ix] - p[valid]) / vega[valid]
+
+        # Stop if error value meets requirement, otherwise calculate
+        # guessed implied volatility of next round
+        unfinished = np.abs(dx) >= 0.00001
+        ix = ix[unfinished]
+        v_flat[ix] += dx[unfinished]
+
+    # Check end result to be non-negative
+    v[~meet | (v <= 0)] = 0
+
+    # Round to 4 decimal places
+    v = np.round(v, 4)
+
+    return to_result(v)
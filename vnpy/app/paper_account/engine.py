@@ -4,7 +4,7 @@ from datetime import datetime
 from tzlocal import get_localzone
 
 from vnpy.event import Event, EventEngine
-from vnpy.trader.utility import extract_vt_symbol, save_json, load_json
+from vnpy.trader.utility import extract_vt_symbol, save_json, load_json, JsonStore
 from vnpy.trader.engine import BaseEngine, MainEngine
 from vnpy.trader.object import (
     OrderRequest, CancelRequest, SubscribeRequest,
@@ -54,6 +54,8 @@ class PaperEngine(BaseEngine):
         self.ticks: Dict[str, TickData] = {}
         self.positions: Dict[Tuple[str, Direction], PositionData] = {}
 
+        self.data_store: JsonStore = JsonStore(self.data_filename)
+
         # Patch main engine functions
         self._subscribe = main_engine.subscribe
         self._query_history = main_engine.query_history
@@ -67,6 +69,10 @@ class PaperEngine(BaseEngine):
         self.load_data()
         self.register_event()
 
+    def close(self) -> None:
+        """"""
+        self.data_store.close()
+
     def register_event(self):
         """"""
         self.event_engine.register(EVENT_CONTRACT, self.process_contract_event)
@@ -427,11 +433,11 @@ class PaperEngine(BaseEngine):
             }
             position_data.append(d)
 
-        save_json(self.data_filename, position_data)
+        self.data_store.save(position_data)
 
     def load_data(self) -> None:
         """"""
-        position_data = load_json(self.data_filename)
+        position_data = self.data_store.load()
 
         for d in position_data:
             vt_symbol = d["vt_symbol"]
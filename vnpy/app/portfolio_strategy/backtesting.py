@@ -1,6 +1,6 @@
 from collections import defaultdict
 from datetime import date, datetime, timedelta
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Set
 from functools import lru_cache
 from copy import copy
 import traceback
@@ -14,6 +14,11 @@ from vnpy.trader.constant import Direction, Offset, Interval, Status
 from vnpy.trader.database import database_manager
 from vnpy.trader.object import OrderData, TradeData, BarData
 from vnpy.trader.utility import round_to, extract_vt_symbol
+from vnpy.trader.columnar import (
+    HistoryArray,
+    create_history_array,
+    concat_history_arrays
+)
 
 from .template import StrategyTemplate
 
@@ -50,7 +55,8 @@ class BacktestingEngine:
 
         self.interval: Interval = None
         self.days: int = 0
-        self.history_data: Dict[Tuple, BarData] = {}
+        self.history_data: Dict[str, HistoryArray] = {}
+        self.history_ixs: Dict[str, int] = {}
         self.dts: Set[datetime] = set()
 
         self.limit_order_count = 0
@@ -142,21 +148,17 @@ class BacktestingEngine:
             end = self.start + progress_delta
             progress = 0
 
-            data_count = 0
+            history_arrays: List[HistoryArray] = []
             while start < self.end:
                 end = min(end, self.end)  # Make sure end time stays within set range
 
-                data = load_bar_data(
+                history = load_bar_array(
                     vt_symbol,
                     self.interval,
                     start,
                     end
                 )
-
-                for bar in data:
-                    self.dts.add(bar.datetime)
-                    self.history_data[(bar.datetime, vt_symbol)] = bar
-                    data_count += 1
+                history_arrays.append(history)
 
                 progress += progress_delta / total_delta
                 progress = min(progress, 1)
@@ -166,7 +168,13 @@ class BacktestingEngine:
                 start = end + interval_delta
                 end += (progress_delta + interval_delta)
 
-            self.output(f"{vt_symbol}历史数据加载完成，数据量：{data_count}")
+            history = concat_history_arrays(history_arrays)
+            self.history_data[vt_symbol] = history
+
+            for ix in range(len(history)):
+                self.dts.add(history.get_datetime(ix))
+
+            self.output(f"{vt_symbol}历史数据加载完成，数据量：{len(history)}")
 
         self.output("所有历史数据加载完成")
 
@@ -174,6 +182,9 @@ class BacktestingEngine:
         """"""
         self.strategy.on_init()
 
+        # Reset replay position of each contract
+        self.history_ixs = {vt_symbol: 0 for vt_symbol in self.history_data}
+
         # Generate sorted datetime list
         dts = list(self.dts)
         dts.sort()
@@ -490,9 +501,12 @@ class BacktestingEngine:
         """"""
         self.datetime = dt
 
+        # History data is stored with naive datetime
+        key = np.datetime64(dt.replace(tzinfo=None), "us")
+
         bars: Dict[str, BarData] = {}
         for vt_symbol in self.vt_symbols:
-            bar = self.history_data.get((dt, vt_symbol), None)
+            bar = self.get_history_bar(vt_symbol, key)
 
             # If bar data of vt_symbol at dt exists
             if bar:
@@ -522,6 +536,22 @@ class BacktestingEngine:
 
         self.update_daily_close(self.bars, dt)
 
+    def get_history_bar(self, vt_symbol: str, key: np.datetime64) -> BarData:
+        """
+        Get bar of vt_symbol at datetime key from history data, which
+        is replayed in sequence.
+        """
+        history = self.history_data.get(vt_symbol, None)
+        if not history:
+            return None
+
+        ix = self.history_ixs.get(vt_symbol, 0)
+        if ix >= len(history) or history.array["datetime"][ix] != key:
+            return None
+
+        self.history_ixs[vt_symbol] = ix + 1
+        return history.get_bar(ix)
+
     def cross_limit_order(self) -> None:
         """
         Cross limit order with last bar/tick data.
@@ -852,3 +882,26 @@ def load_bar_data(
     return database_manager.load_bar_data(
         symbol, exchange, interval, start, end
     )
+
+
+@lru_cache(maxsize=999)
+def load_bar_array(
+    vt_symbol: str,
+    interval: Interval,
+    start: datetime,
+    end: datetime
+) -> HistoryArray:
+    """"""
+    symbol, exchange = extract_vt_symbol(vt_symbol)
+
+    # Convert data chunk by chunk to avoid holding all bar objects in memory
+    histories = [
+        create_history_array(bars, symbol, exchange, interval, False)
+        for bars in database_manager.iter_bar_data(
+            symbol, exchange, interval, start, end
+        )
+    ]
+
+    if not histories:
+        return create_history_array([], symbol, exchange, interval, False)
+    return concat_history_arrays(histories)
@@ -4,15 +4,34 @@ import traceback
 from typing import Optional
 
 from vnpy.event import Event, EventEngine
-from vnpy.rpc import RpcServer
+from vnpy.rpc import RpcServer, PICKLE_MODE, PublishQueue, ConflatedQueue
 from vnpy.trader.engine import BaseEngine, MainEngine
 from vnpy.trader.utility import load_json, save_json
 from vnpy.trader.object import LogData
+from vnpy.trader.event import (
+    EVENT_TICK,
+    EVENT_TRADE,
+    EVENT_ORDER,
+    EVENT_POSITION,
+    EVENT_ACCOUNT,
+    EVENT_QUOTE
+)
 
 APP_NAME = "RpcService"
 
 EVENT_RPC_LOG = "eRpcLog"
 
+# Events of specific contract/order/account are not published, since
+# they are created again from general events by RpcGateway.
+GENERAL_EVENT_TYPES = (
+    EVENT_TICK,
+    EVENT_TRADE,
+    EVENT_ORDER,
+    EVENT_POSITION,
+    EVENT_ACCOUNT,
+    EVENT_QUOTE
+)
+
 
 class RpcEngine(BaseEngine):
     """"""
@@ -25,15 +44,28 @@ class RpcEngine(BaseEngine):
         self.rep_address = "tcp://*:2014"
         self.pub_address = "tcp://*:4102"
 
+        # Transport mode and batch size of publishing, see RpcServer
+        self.mode = PICKLE_MODE
+        self.batch_size = 0
+
+        # Only latest tick of each contract is published within interval
+        # (in seconds) if set, 0 for publishing every tick
+        self.conflate_interval = 0
+
         self.server: Optional[RpcServer] = None
 
-        self.init_server()
         self.load_setting()
+        self.init_server()
         self.register_event()
 
     def init_server(self):
         """"""
-        self.server = RpcServer()
+        if self.conflate_interval:
+            publish_queue = ConflatedQueue(self.conflate_interval, [EVENT_TICK])
+        else:
+            publish_queue = PublishQueue()
+
+        self.server = RpcServer(self.mode, self.batch_size, publish_queue)
 
         self.server.register(self.main_engine.subscribe)
         self.server.register(self.main_engine.send_order)
@@ -55,18 +87,27 @@ class RpcEngine(BaseEngine):
         self.server.register(self.main_engine.get_all_accounts)
         self.server.register(self.main_engine.get_all_contracts)
         self.server.register(self.main_engine.get_all_active_orders)
+        self.server.register(self.main_engine.get_gateway_active_orders)
+        self.server.register(self.main_engine.get_reference_active_orders)
+        self.server.register(self.main_engine.get_active_order_count)
 
     def load_setting(self):
         """"""
         setting = load_json(self.setting_filename)
         self.rep_address = setting.get("rep_address", self.rep_address)
         self.pub_address = setting.get("pub_address", self.pub_address)
+        self.mode = setting.get("mode", self.mode)
+        self.batch_size = setting.get("batch_size", self.batch_size)
+        self.conflate_interval = setting.get("conflate_interval", self.conflate_interval)
 
     def save_setting(self):
         """"""
         setting = {
             "rep_address": self.rep_address,
-            "pub_address": self.pub_address
+            "pub_address": self.pub_address,
+            "mode": self.mode,
+            "batch_size": self.batch_size,
+            "conflate_interval": self.conflate_interval
         }
         save_json(self.setting_filename, setting)
 
@@ -111,11 +152,30 @@ class RpcEngine(BaseEngine):
 
     def process_event(self, event: Event):
         """"""
-        if self.server.is_active():
-            self.server.publish("", event)
+        if not self.server.is_active():
+            return
+
+        if event.type not in GENERAL_EVENT_TYPES and event.type.startswith(GENERAL_EVENT_TYPES):
+            return
+
+        self.server.publish(get_topic(event), event)
 
     def write_log(self, msg: str) -> None:
         """"""
         log = LogData(msg=msg, gateway_name=APP_NAME)
         event = Event(EVENT_RPC_LOG, log)
         self.event_engine.put(event)
+
+
+def get_topic(event: Event) -> str:
+    """
+    Get publish topic of event, vt_symbol of data is appended to event
+    type, e.g. eTick.IF2012.CFFEX, so that clients can subscribe data
+    of specific contracts.
+    """
+    vt_symbol = getattr(event.data, "vt_symbol", "")
+
+    if vt_symbol and event.type in GENERAL_EVENT_TYPES:
+        return event.type + vt_symbol
+    else:
+        return event.type
@@ -279,7 +279,7 @@ def to_df(data_list: Sequence):
     if not data_list:
         return None
 
-    dict_list = [data.__dict__ for data in data_list]
+    dict_list = [data.to_dict() for data in data_list]
     return DataFrame(dict_list)
 
 
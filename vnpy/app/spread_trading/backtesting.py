@@ -136,14 +136,11 @@ class BacktestingEngine:
                 self.end,
                 self.pricetick
             )
+            self.output(f"历史数据加载完成，数据量：{len(self.history_data)}")
         else:
-            self.history_data = load_tick_data(
-                self.spread,
-                self.start,
-                self.end
-            )
-
-        self.output(f"历史数据加载完成，数据量：{len(self.history_data)}")
+            # Tick data is streamed from database when replayed
+            self.history_data = []
+            self.output("Tick数据将在回放时从数据库分块加载")
 
     def run_backtesting(self):
         """"""
@@ -154,11 +151,16 @@ class BacktestingEngine:
 
         self.strategy.on_init()
 
+        if self.mode == BacktestingMode.BAR:
+            history_data = iter(self.history_data)
+        else:
+            history_data = load_tick_data(self.spread, self.start, self.end)
+
         # Use the first [days] of history data for initializing strategy
         day_count = 0
-        ix = 0
+        data = None
 
-        for ix, data in enumerate(self.history_data):
+        for data in history_data:
             if self.datetime and data.datetime.day != self.datetime.day:
                 day_count += 1
                 if day_count >= self.days:
@@ -166,6 +168,8 @@ class BacktestingEngine:
 
             self.datetime = data.datetime
             self.callback(data)
+        else:
+            data = None
 
         self.strategy.inited = True
         self.output("策略初始化完成")
@@ -175,7 +179,10 @@ class BacktestingEngine:
         self.output("开始回放历史数据")
 
         # Use the rest of history data for running backtesting
-        for data in self.history_data[ix:]:
+        if data:
+            func(data)
+
+        for data in history_data:
             func(data)
 
         self.output("历史数据回放结束")
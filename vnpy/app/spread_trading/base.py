@@ -1,16 +1,19 @@
-from typing import Dict, List
+from typing import Callable, Dict, Iterator, List, Tuple
 from datetime import datetime
 from enum import Enum
 from functools import lru_cache
-from parser import expr
+from keyword import iskeyword
 from tzlocal import get_localzone
 
+import numpy as np
+
 from vnpy.trader.object import (
     TickData, PositionData, TradeData, ContractData, BarData
 )
 from vnpy.trader.constant import Direction, Offset, Exchange, Interval
 from vnpy.trader.utility import floor_to, ceil_to, round_to, extract_vt_symbol
 from vnpy.trader.database import database_manager
+from vnpy.trader.columnar import HistoryArray
 
 
 EVENT_SPREAD_DATA = "eSpreadData"
@@ -198,8 +201,11 @@ class SpreadData:
         self.net_pos: float = 0
         self.datetime: datetime = None
 
-    def calculate_price(self):
-        """"""
+    def calculate_price(self, vt_symbol: str = ""):
+        """
+        Calculate spread price and volume after tick of leg vt_symbol
+        is updated, all legs are calculated in the same way here.
+        """
         self.clear_price()
 
         # Go through all legs to calculate price
@@ -391,84 +397,63 @@ class AdvancedSpreadData(SpreadData):
         self.variable_symbols = variable_symbols
         self.variable_directions = variable_directions
         self.price_formula = price_formula
-        self.price_code = expr(price_formula).compile()
+        self.price_code: Callable[..., float] = compile_formula(
+            price_formula, tuple(variable_symbols.keys())
+        )
 
         self.variable_legs = {}
         for variable, vt_symbol in variable_symbols.items():
             leg = self.legs[vt_symbol]
             self.variable_legs[variable] = leg
 
-    def calculate_price(self):
-        """"""
-        self.clear_price()
-
-        # Go through all legs to calculate price
-        bid_data = {}
-        ask_data = {}
-        volume_inited = False
-
-        for variable, leg in self.variable_legs.items():
-            # Filter not all leg price data has been received
-            if not leg.bid_volume or not leg.ask_volume:
-                self.clear_price()
-                return
-
-            # Generate price dict for calculating spread bid/ask
-            variable_direction = self.variable_directions[variable]
-            if variable_direction > 0:
-                bid_data[variable] = leg.bid_price
-                ask_data[variable] = leg.ask_price
-            else:
-                bid_data[variable] = leg.ask_price
-                ask_data[variable] = leg.bid_price
-
-            # Calculate volume
-            trading_multiplier = self.trading_multipliers[leg.vt_symbol]
-            if not trading_multiplier:
-                continue
-
-            inverse_contract = self.inverse_contracts[leg.vt_symbol]
-            if not inverse_contract:
-                leg_bid_volume = leg.bid_volume
-                leg_ask_volume = leg.ask_volume
-            else:
-                leg_bid_volume = calculate_inverse_volume(
-                    leg.bid_volume, leg.bid_price, leg.size)
-                leg_ask_volume = calculate_inverse_volume(
-                    leg.ask_volume, leg.ask_price, leg.size)
-
-            if trading_multiplier > 0:
-                adjusted_bid_volume = floor_to(
-                    leg_bid_volume / trading_multiplier,
-                    self.min_volume
-                )
-                adjusted_ask_volume = floor_to(
-                    leg_ask_volume / trading_multiplier,
-                    self.min_volume
-                )
-            else:
-                adjusted_bid_volume = floor_to(
-                    leg_ask_volume / abs(trading_multiplier),
-                    self.min_volume
-                )
-                adjusted_ask_volume = floor_to(
-                    leg_bid_volume / abs(trading_multiplier),
-                    self.min_volume
-                )
+        # Bid/ask of each variable in the order of formula arguments,
+        # and adjusted bid/ask volume of each trading leg. Only values
+        # of the leg updated are recalculated for each tick.
+        self.variables: List[str] = list(variable_symbols.keys())
+        variable_count = len(self.variables)
+
+        self.bid_values: List[float] = [0] * variable_count
+        self.ask_values: List[float] = [0] * variable_count
+        self.leg_inited: List[bool] = [False] * variable_count
+
+        self.leg_bid_volumes: Dict[str, float] = {}
+        self.leg_ask_volumes: Dict[str, float] = {}
+
+        self.symbol_variable_ixs: Dict[str, List[int]] = {}
+        for ix, vt_symbol in enumerate(variable_symbols.values()):
+            self.symbol_variable_ixs.setdefault(vt_symbol, []).append(ix)
+
+        # Legs may have received ticks before spread is created
+        self.calculate_price()
+
+    def calculate_price(self, vt_symbol: str = ""):
+        """
+        Calculate spread price and volume after tick of leg vt_symbol
+        is updated, all legs are calculated if vt_symbol is empty.
+        """
+        if vt_symbol in self.symbol_variable_ixs:
+            for ix in self.symbol_variable_ixs[vt_symbol]:
+                self.update_variable(ix)
+        else:
+            for ix in range(len(self.bid_values)):
+                self.update_variable(ix)
 
-            # For the first leg, just initialize
-            if not volume_inited:
-                self.bid_volume = adjusted_bid_volume
-                self.ask_volume = adjusted_ask_volume
-                volume_inited = True
-            # For following legs, use min value of each leg quoting volume
-            else:
-                self.bid_volume = min(self.bid_volume, adjusted_bid_volume)
-                self.ask_volume = min(self.ask_volume, adjusted_ask_volume)
+        # Filter not all leg price data has been received
+        if not all(self.leg_inited):
+            self.clear_price()
+            return
 
         # Calculate spread price
-        self.bid_price = self.parse_formula(self.price_code, bid_data)
-        self.ask_price = self.parse_formula(self.price_code, ask_data)
+        self.bid_price = self.price_code(*self.bid_values)
+        self.ask_price = self.price_code(*self.ask_values)
+
+        # Use min value of each leg quoting volume
+        if self.leg_bid_volumes:
+            self.bid_volume = min(self.leg_bid_volumes.values())
+            self.ask_volume = min(self.leg_ask_volumes.values())
+        else:
+            self.bid_volume = 0
+            self.ask_volume = 0
 
         # Round price to pricetick
         if self.pricetick:
@@ -478,13 +463,88 @@ class AdvancedSpreadData(SpreadData):
         # Update calculate time
         self.datetime = datetime.now(LOCAL_TZ)
 
-    def parse_formula(self, formula: str, data: Dict[str, float]):
-        """"""
-        locals().update(data)
-        value = eval(formula)
+    def update_variable(self, ix: int) -> None:
+        """
+        Update bid/ask value of variable and quoting volume of its leg.
+        """
+        variable = self.variables[ix]
+        vt_symbol = self.variable_symbols[variable]
+        leg = self.legs[vt_symbol]
+
+        self.leg_inited[ix] = bool(leg.bid_volume and leg.ask_volume)
+        if not self.leg_inited[ix]:
+            return
+
+        # Generate price for calculating spread bid/ask
+        if self.variable_directions[variable] > 0:
+            self.bid_values[ix] = leg.bid_price
+            self.ask_values[ix] = leg.ask_price
+        else:
+            self.bid_values[ix] = leg.ask_price
+            self.ask_values[ix] = leg.bid_price
+
+        # Calculate volume
+        trading_multiplier = self.trading_multipliers[vt_symbol]
+        if not trading_multiplier:
+            return
+
+        inverse_contract = self.inverse_contracts[vt_symbol]
+        if not inverse_contract:
+            leg_bid_volume = leg.bid_volume
+            leg_ask_volume = leg.ask_volume
+        else:
+            leg_bid_volume = calculate_inverse_volume(
+                leg.bid_volume, leg.bid_price, leg.size)
+            leg_ask_volume = calculate_inverse_volume(
+                leg.ask_volume, leg.ask_price, leg.size)
+
+        if trading_multiplier > 0:
+            adjusted_bid_volume = floor_to(
+                leg_bid_volume / trading_multiplier,
+                self.min_volume
+            )
+            adjusted_ask_volume = floor_to(
+                leg_ask_volume / trading_multiplier,
+                self.min_volume
+            )
+        else:
+            adjusted_bid_volume = floor_to(
+                leg_ask_volume / abs(trading_multiplier),
+                self.min_volume
+            )
+            adjusted_ask_volume = floor_to(
+                leg_bid_volume / abs(trading_multiplier),
+                self.min_volume
+            )
+
+        self.leg_bid_volumes[vt_symbol] = adjusted_bid_volume
+        self.leg_ask_volumes[vt_symbol] = adjusted_ask_volume
+
+    def parse_formula(self, formula: Callable[..., float], data: Dict[str, float]):
+        """
+        Calculate compiled formula with value of each variable in data.
+        """
+        value = formula(**data)
         return value
 
 
+@lru_cache(maxsize=None)
+def compile_formula(formula: str, variables: Tuple[str, ...]) -> Callable[..., float]:
+    """
+    Compile formula into function taking values of variables as
+    arguments, so that formula is only parsed once.
+    """
+    for variable in variables:
+        if not variable.isidentifier() or iskeyword(variable):
+            raise ValueError(f"变量名称{variable}不合法")
+
+    # Make sure formula is a single expression before wrapping it
+    compile(formula, "<formula>", "eval")
+
+    source = f"lambda {', '.join(variables)}: ({formula}\n)"
+    return eval(compile(source, "<formula>", "eval"), {})
+
+
 def calculate_inverse_volume(
     original_volume: float,
     price: float,
@@ -510,65 +570,76 @@ def load_bar_data(
     pricetick: float = 0
 ):
     """"""
-    # Load bar data of each spread leg
-    leg_bars: Dict[str, Dict] = {}
+    # Load bar data of each spread leg into columnar array
+    leg_histories: Dict[str, HistoryArray] = {}
 
     for vt_symbol in spread.legs.keys():
         symbol, exchange = extract_vt_symbol(vt_symbol)
 
-        bar_data: List[BarData] = database_manager.load_bar_data(
+        history: HistoryArray = database_manager.load_bar_array(
             symbol, exchange, interval, start, end
         )
+        if not len(history):
+            return []
 
-        bars: Dict[datetime, BarData] = {bar.datetime: bar for bar in bar_data}
-        leg_bars[vt_symbol] = bars
+        leg_histories[vt_symbol] = history
+
+    # Spread bar is only available when all legs have bar at the datetime
+    dts: np.ndarray = None
+    for history in leg_histories.values():
+        if dts is None:
+            dts = history.column("datetime")
+        else:
+            dts = np.intersect1d(dts, history.column("datetime"))
 
     # Calculate spread bar data
-    spread_bars: List[BarData] = []
+    spread_prices = np.zeros(len(dts))
+    spread_values = np.zeros(len(dts))
 
-    for dt in bars.keys():
-        spread_price = 0
-        spread_value = 0
-        spread_available = True
+    for leg in spread.legs.values():
+        history = leg_histories[leg.vt_symbol]
+        ix = np.searchsorted(history.column("datetime"), dts)
+        close_prices = history.column("close_price")[ix]
 
-        for leg in spread.legs.values():
-            leg_bar = leg_bars[leg.vt_symbol].get(dt, None)
+        price_multiplier = spread.price_multipliers[leg.vt_symbol]
+        spread_prices += price_multiplier * close_prices
+        spread_values += abs(price_multiplier) * close_prices
 
-            if leg_bar:
-                price_multiplier = spread.price_multipliers[leg.vt_symbol]
-                spread_price += price_multiplier * leg_bar.close_price
-                spread_value += abs(price_multiplier) * leg_bar.close_price
-            else:
-                spread_available = False
-
-        if spread_available:
-            if pricetick:
-                spread_price = round_to(spread_price, pricetick)
-
-            spread_bar = BarData(
-                symbol=spread.name,
-                exchange=exchange.LOCAL,
-                datetime=dt,
-                interval=interval,
-                open_price=spread_price,
-                high_price=spread_price,
-                low_price=spread_price,
-                close_price=spread_price,
-                gateway_name="SPREAD",
-            )
-            spread_bar.value = spread_value
-            spread_bars.append(spread_bar)
+    history = history.new_array(history.array[ix])
+    spread_bars: List[BarData] = []
+
+    for n in range(len(dts)):
+        spread_price = float(spread_prices[n])
+        if pricetick:
+            spread_price = round_to(spread_price, pricetick)
+
+        spread_bar = BarData(
+            symbol=spread.name,
+            exchange=Exchange.LOCAL,
+            datetime=history.get_datetime(n),
+            interval=interval,
+            open_price=spread_price,
+            high_price=spread_price,
+            low_price=spread_price,
+            close_price=spread_price,
+            gateway_name="SPREAD",
+        )
+        spread_bar.value = float(spread_values[n])
+        spread_bars.append(spread_bar)
 
     return spread_bars
 
 
-@lru_cache(maxsize=999)
 def load_tick_data(
     spread: SpreadData,
     start: datetime,
     end: datetime
-):
-    """"""
-    return database_manager.load_tick_data(
+) -> Iterator[TickData]:
+    """
+    Ticks are streamed from database chunk by chunk, so that long
+    history is replayed in constant memory.
+    """
+    for ticks in database_manager.iter_tick_data(
         spread.name, Exchange.LOCAL, start, end
-    )
+    ):
+        yield from ticks
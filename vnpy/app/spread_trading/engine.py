@@ -13,7 +13,7 @@ from vnpy.trader.event import (
     EVENT_TICK, EVENT_POSITION, EVENT_CONTRACT,
     EVENT_ORDER, EVENT_TRADE, EVENT_TIMER
 )
-from vnpy.trader.utility import load_json, save_json
+from vnpy.trader.utility import load_json, save_json, JsonStore
 from vnpy.trader.object import (
     TickData, ContractData, LogData,
     SubscribeRequest, OrderRequest
@@ -75,6 +75,10 @@ class SpreadEngine(BaseEngine):
         self.algo_engine.stop()
         self.strategy_engine.stop()
 
+    def close(self):
+        """"""
+        self.strategy_engine.close()
+
     def write_log(self, msg: str):
         """"""
         log = LogData(
@@ -228,7 +232,7 @@ class SpreadDataEngine:
         leg.update_tick(tick)
 
         for spread in self.symbol_spread_map[tick.vt_symbol]:
-            spread.calculate_price()
+            spread.calculate_price(tick.vt_symbol)
             self.put_data_event(spread)
 
     def process_position_event(self, event: Event) -> None:
@@ -700,6 +704,7 @@ class SpreadStrategyEngine:
     """"""
 
     setting_filename = "spread_trading_strategy.json"
+    data_filename = "spread_trading_strategy_data.json"
 
     def __init__(self, spread_engine: SpreadEngine):
         """"""
@@ -710,6 +715,8 @@ class SpreadStrategyEngine:
         self.write_log = spread_engine.write_log
 
         self.strategy_setting: Dict[str: Dict] = {}
+        self.strategy_data: Dict[str: Dict] = {}
+        self.data_store: JsonStore = JsonStore(self.data_filename)
 
         self.classes: Dict[str: Type[SpreadStrategyTemplate]] = {}
         self.strategies: Dict[str: SpreadStrategyTemplate] = {}
@@ -726,6 +733,7 @@ class SpreadStrategyEngine:
     def start(self):
         """"""
         self.load_strategy_setting()
+        self.load_strategy_data()
         self.register_event()
 
         self.write_log("价差策略引擎启动成功")
@@ -733,6 +741,7 @@ class SpreadStrategyEngine:
     def close(self):
         """"""
         self.stop_all_strategies()
+        self.data_store.close()
 
     def load_strategy_class(self):
         """
@@ -811,6 +820,23 @@ class SpreadStrategyEngine:
         self.strategy_setting.pop(strategy_name)
         save_json(self.setting_filename, self.strategy_setting)
 
+    def load_strategy_data(self):
+        """
+        Load strategy data from json file.
+        """
+        self.strategy_data = self.data_store.load()
+
+    def sync_strategy_data(self, strategy: SpreadStrategyTemplate):
+        """
+        Sync strategy data into json file.
+        """
+        data = strategy.get_variables()
+        data.pop("inited")      # Strategy status (inited, trading) should not be synced.
+        data.pop("trading")
+
+        self.strategy_data[strategy.strategy_name] = data
+        self.data_store.save(self.strategy_data)
+
     def register_event(self):
         """"""
         ee = self.event_engine
@@ -863,6 +889,9 @@ class SpreadStrategyEngine:
         if strategy:
             self.call_strategy_func(strategy, strategy.on_trade, trade)
 
+            # Sync strategy variables to data file
+            self.sync_strategy_data(strategy)
+
     def call_strategy_func(
         self, strategy: SpreadStrategyTemplate, func: Callable, params: Any = None
     ):
@@ -953,6 +982,15 @@ class SpreadStrategyEngine:
             return
 
         self.call_strategy_func(strategy, strategy.on_init)
+
+        # Restore strategy data(variables)
+        data = self.strategy_data.get(strategy_name, None)
+        if data:
+            for name in strategy.variables:
+                value = data.get(name, None)
+                if value:
+                    setattr(strategy, name, value)
+
         strategy.inited = True
 
         self.put_strategy_event(strategy)
@@ -987,6 +1025,10 @@ class SpreadStrategyEngine:
 
         strategy.trading = False
 
+        # Sync strategy variables to data file
+        self.sync_strategy_data(strategy)
+        self.data_store.flush()
+
         self.put_strategy_event(strategy)
 
     def init_all_strategies(self):
@@ -23,6 +23,7 @@ from ..engine import (
     EVENT_SPREAD_ALGO,
     EVENT_SPREAD_STRATEGY
 )
+from ..base import compile_formula
 
 
 class SpreadManager(QtWidgets.QWidget):
@@ -1030,10 +1031,9 @@ class AdvancedSpreadDataDialog(QtWidgets.QDialog):
 
     def check_formula(self, formula: str):
         """"""
-        data = {variable: 1 for variable in "ABCDE"}
-        locals().update(data)
         try:
-            result = eval(formula)
+            func = compile_formula(formula, tuple("ABCDE"))
+            func(1, 1, 1, 1, 1)
             return True
         except Exception:
             return False
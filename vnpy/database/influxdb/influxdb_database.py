@@ -1,6 +1,6 @@
 """"""
 from datetime import datetime
-from typing import List
+from typing import Iterator, List
 import shelve
 
 from influxdb import InfluxDBClient
@@ -11,6 +11,7 @@ from vnpy.trader.database import (
     BaseDatabase,
     BarOverview,
     DB_TZ,
+    CHUNK_SIZE,
     convert_tz
 )
 from vnpy.trader.setting import SETTINGS
@@ -174,42 +175,68 @@ class InfluxdbDatabase(BaseDatabase):
         end: datetime
     ) -> List[BarData]:
         """"""
-        query = (
-            "select * from bar_data"
-            " where vt_symbol=$vt_symbol"
-            " and interval=$interval"
-            f" and time >= '{start.date().isoformat()}'"
-            f" and time <= '{end.date().isoformat()}';"
-        )
+        bars: List[BarData] = []
+        for chunk in self.iter_bar_data(symbol, exchange, interval, start, end):
+            bars.extend(chunk)
+
+        return bars
 
+    def iter_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[List[BarData]]:
+        """"""
         bind_params = {
             "vt_symbol": generate_vt_symbol(symbol, exchange),
             "interval": interval.value
         }
 
-        result = self.client.query(query, bind_params=bind_params)
-        points = result.get_points()
-
-        bars: List[BarData] = []
-        for d in points:
-            dt = datetime.strptime(d["time"], "%Y-%m-%dT%H:%M:%SZ")
+        # Query data page by page with time of last point loaded
+        time_filter = f"time >= '{start.date().isoformat()}'"
 
-            bar = BarData(
-                symbol=symbol,
-                exchange=exchange,
-                interval=interval,
-                datetime=DB_TZ.localize(dt),
-                open_price=d["open_price"],
-                high_price=d["high_price"],
-                low_price=d["low_price"],
-                close_price=d["close_price"],
-                volume=d["volume"],
-                open_interest=d["open_interest"],
-                gateway_name="DB"
+        while True:
+            query = (
+                "select * from bar_data"
+                " where vt_symbol=$vt_symbol"
+                " and interval=$interval"
+                f" and {time_filter}"
+                f" and time <= '{end.date().isoformat()}'"
+                f" order by time limit {chunk_size};"
             )
-            bars.append(bar)
 
-        return bars
+            result = self.client.query(query, bind_params=bind_params)
+            points = result.get_points()
+
+            bars: List[BarData] = []
+            for d in points:
+                time_filter = f"time > '{d['time']}'"
+                dt = datetime.strptime(d["time"], "%Y-%m-%dT%H:%M:%SZ")
+
+                bar = BarData(
+                    symbol=symbol,
+                    exchange=exchange,
+                    interval=interval,
+                    datetime=DB_TZ.localize(dt),
+                    open_price=d["open_price"],
+                    high_price=d["high_price"],
+                    low_price=d["low_price"],
+                    close_price=d["close_price"],
+                    volume=d["volume"],
+                    open_interest=d["open_interest"],
+                    gateway_name="DB"
+                )
+                bars.append(bar)
+
+            if bars:
+                yield bars
+
+            if len(bars) < chunk_size:
+                break
 
     def load_tick_data(
         self,
@@ -219,64 +246,88 @@ class InfluxdbDatabase(BaseDatabase):
         end: datetime
     ) -> List[TickData]:
         """"""
-        query = (
-            "select * from tick_data"
-            " where vt_symbol=$vt_symbol"
-            f" and time >= '{start.date().isoformat()}'"
-            f" and time <= '{end.date().isoformat()}';"
-        )
+        ticks: List[TickData] = []
+        for chunk in self.iter_tick_data(symbol, exchange, start, end):
+            ticks.extend(chunk)
+
+        return ticks
 
+    def iter_tick_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[List[TickData]]:
+        """"""
         bind_params = {
             "vt_symbol": generate_vt_symbol(symbol, exchange),
         }
 
-        result = self.client.query(query, bind_params=bind_params)
-        points = result.get_points()
-
-        ticks: List[TickData] = []
-        for d in points:
-            dt = datetime.strptime(d["time"], "%Y-%m-%dT%H:%M:%SZ")
+        time_filter = f"time >= '{start.date().isoformat()}'"
 
-            tick = TickData(
-                symbol=symbol,
-                exchange=exchange,
-                datetime=DB_TZ.localize(dt),
-                name=d["name"],
-                volume=d["volume"],
-                open_interest=d["open_interest"],
-                last_price=d["last_price"],
-                last_volume=d["last_volume"],
-                limit_up=d["limit_up"],
-                limit_down=d["limit_down"],
-                open_price=d["open_price"],
-                high_price=d["high_price"],
-                low_price=d["low_price"],
-                pre_close=d["pre_close"],
-                bid_price_1=d["bid_price_1"],
-                bid_price_2=d["bid_price_2"],
-                bid_price_3=d["bid_price_3"],
-                bid_price_4=d["bid_price_4"],
-                bid_price_5=d["bid_price_5"],
-                ask_price_1=d["ask_price_1"],
-                ask_price_2=d["ask_price_2"],
-                ask_price_3=d["ask_price_3"],
-                ask_price_4=d["ask_price_4"],
-                ask_price_5=d["ask_price_5"],
-                bid_volume_1=d["bid_volume_1"],
-                bid_volume_2=d["bid_volume_2"],
-                bid_volume_3=d["bid_volume_3"],
-                bid_volume_4=d["bid_volume_4"],
-                bid_volume_5=d["bid_volume_5"],
-                ask_volume_1=d["ask_volume_1"],
-                ask_volume_2=d["ask_volume_2"],
-                ask_volume_3=d["ask_volume_3"],
-                ask_volume_4=d["ask_volume_4"],
-                ask_volume_5=d["ask_volume_5"],
-                gateway_name="DB"
+        while True:
+            query = (
+                "select * from tick_data"
+                " where vt_symbol=$vt_symbol"
+                f" and {time_filter}"
+                f" and time <= '{end.date().isoformat()}'"
+                f" order by time limit {chunk_size};"
             )
-            ticks.append(tick)
 
-        return ticks
+            result = self.client.query(query, bind_params=bind_params)
+            points = result.get_points()
+
+            ticks: List[TickData] = []
+            for d in points:
+                time_filter = f"time > '{d['time']}'"
+                dt = datetime.strptime(d["time"], "%Y-%m-%dT%H:%M:%SZ")
+
+                tick = TickData(
+                    symbol=symbol,
+                    exchange=exchange,
+                    datetime=DB_TZ.localize(dt),
+                    name=d["name"],
+                    volume=d["volume"],
+                    open_interest=d["open_interest"],
+                    last_price=d["last_price"],
+                    last_volume=d["last_volume"],
+                    limit_up=d["limit_up"],
+                    limit_down=d["limit_down"],
+                    open_price=d["open_price"],
+                    high_price=d["high_price"],
+                    low_price=d["low_price"],
+                    pre_close=d["pre_close"],
+                    bid_price_1=d["bid_price_1"],
+                    bid_price_2=d["bid_price_2"],
+                    bid_price_3=d["bid_price_3"],
+                    bid_price_4=d["bid_price_4"],
+                    bid_price_5=d["bid_price_5"],
+                    ask_price_1=d["ask_price_1"],
+                    ask_price_2=d["ask_price_2"],
+                    ask_price_3=d["ask_price_3"],
+                    ask_price_4=d["ask_price_4"],
+                    ask_price_5=d["ask_price_5"],
+                    bid_volume_1=d["bid_volume_1"],
+                    bid_volume_2=d["bid_volume_2"],
+                    bid_volume_3=d["bid_volume_3"],
+                    bid_volume_4=d["bid_volume_4"],
+                    bid_volume_5=d["bid_volume_5"],
+                    ask_volume_1=d["ask_volume_1"],
+                    ask_volume_2=d["ask_volume_2"],
+                    ask_volume_3=d["ask_volume_3"],
+                    ask_volume_4=d["ask_volume_4"],
+                    ask_volume_5=d["ask_volume_5"],
+                    gateway_name="DB"
+                )
+                ticks.append(tick)
+
+            if ticks:
+                yield ticks
+
+            if len(ticks) < chunk_size:
+                break
 
     def delete_bar_data(
         self,
@@ -366,17 +417,18 @@ class InfluxdbDatabase(BaseDatabase):
         overview_count = len(f)
 
         if data_count and not overview_count:
-            self.init_bar_overview()
+            self.rebuild_bar_overview()
 
         overviews = list(f.values())
         f.close()
         return overviews
 
-    def init_bar_overview(self) -> None:
+    def rebuild_bar_overview(self) -> None:
         """
-        Init overview table if not exists.
+        Rebuild overview of all bar data.
         """
         f = shelve.open(self.overview_filepath)
+        f.clear()
 
         query: str = "select count(close_price) from bar_data group by *"
         result = self.client.query(query)
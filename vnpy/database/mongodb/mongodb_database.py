@@ -1,6 +1,6 @@
 """"""
 from datetime import datetime
-from typing import List
+from typing import Iterator, List
 
 from mongoengine import (
     Document,
@@ -11,7 +11,7 @@ from mongoengine import (
     connect,
     QuerySet
 )
-from mongoengine.errors import DoesNotExist
+from pymongo import UpdateOne
 
 from vnpy.trader.constant import Exchange, Interval
 from vnpy.trader.object import BarData, TickData
@@ -19,6 +19,7 @@ from vnpy.trader.database import (
     BaseDatabase,
     BarOverview,
     DB_TZ,
+    CHUNK_SIZE,
     convert_tz
 )
 from vnpy.trader.setting import SETTINGS
@@ -158,59 +159,54 @@ class MongodbDatabase(BaseDatabase):
         exchange = bar.exchange
         interval = bar.interval
 
-        # Upsert data into mongodb
+        # Convert bar object to upsert operation and adjust timezone
+        requests = []
+
         for bar in bars:
             bar.datetime = convert_tz(bar.datetime)
 
-            d = bar.__dict__
+            d = bar.to_dict()
             d["exchange"] = d["exchange"].value
             d["interval"] = d["interval"].value
             d.pop("gateway_name")
             d.pop("vt_symbol")
-            param = to_update_param(d)
 
-            DbBarData.objects(
-                symbol=d["symbol"],
-                exchange=d["exchange"],
-                interval=d["interval"],
-                datetime=d["datetime"],
-            ).update_one(upsert=True, **param)
-
-        # Update bar overview
-        try:
-            overview: DbBarOverview = DbBarOverview.objects(
-                symbol=symbol,
-                exchange=exchange.value,
-                interval=interval.value
-            ).get()
-        except DoesNotExist:
-            overview: DbBarOverview = DbBarOverview(
-                symbol=symbol,
-                exchange=exchange.value,
-                interval=interval.value
+            request = UpdateOne(
+                {
+                    "symbol": d["symbol"],
+                    "exchange": d["exchange"],
+                    "interval": d["interval"],
+                    "datetime": d["datetime"],
+                },
+                {"$set": d},
+                upsert=True
             )
+            requests.append(request)
 
-        if not overview.start:
-            overview.start = bars[0].datetime
-            overview.end = bars[-1].datetime
-            overview.count = len(bars)
-        else:
-            overview.start = min(bars[0].datetime, overview.start)
-            overview.end = max(bars[-1].datetime, overview.end)
-            overview.count = DbBarData.objects(
-                symbol=symbol,
-                exchange=exchange.value,
-                interval=interval.value
-            ).count()
-
-        overview.save()
+        # Upsert data into mongodb with one bulk write, new rows are
+        # counted from upserted documents
+        result = DbBarData._get_collection().bulk_write(requests, ordered=False)
+
+        # Update bar overview atomically
+        DbBarOverview.objects(
+            symbol=symbol,
+            exchange=exchange.value,
+            interval=interval.value
+        ).update_one(
+            upsert=True,
+            inc__count=result.upserted_count,
+            min__start=min(bar.datetime for bar in bars),
+            max__end=max(bar.datetime for bar in bars)
+        )
+
+        return True
 
     def save_tick_data(self, ticks: List[TickData]) -> bool:
         """"""
         for tick in ticks:
             tick.datetime = convert_tz(tick.datetime)
 
-            d = tick.__dict__
+            d = tick.to_dict()
             d["exchange"] = d["exchange"].value
             d.pop("gateway_name")
             d.pop("vt_symbol")
@@ -277,6 +273,73 @@ class MongodbDatabase(BaseDatabase):
 
         return ticks
 
+    def iter_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[List[BarData]]:
+        """"""
+        s: QuerySet = DbBarData.objects(
+            symbol=symbol,
+            exchange=exchange.value,
+            interval=interval.value,
+            datetime__gte=convert_tz(start),
+            datetime__lte=convert_tz(end),
+        ).order_by("datetime").no_cache().batch_size(chunk_size)
+
+        vt_symbol = f"{symbol}.{exchange.value}"
+        bars: List[BarData] = []
+        for db_bar in s:
+            db_bar.datetime = DB_TZ.localize(db_bar.datetime)
+            db_bar.exchange = Exchange(db_bar.exchange)
+            db_bar.interval = Interval(db_bar.interval)
+            db_bar.gateway_name = "DB"
+            db_bar.vt_symbol = vt_symbol
+            bars.append(db_bar)
+
+            if len(bars) == chunk_size:
+                yield bars
+                bars = []
+
+        if bars:
+            yield bars
+
+    def iter_tick_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[List[TickData]]:
+        """"""
+        s: QuerySet = DbTickData.objects(
+            symbol=symbol,
+            exchange=exchange.value,
+            datetime__gte=convert_tz(start),
+            datetime__lte=convert_tz(end),
+        ).order_by("datetime").no_cache().batch_size(chunk_size)
+
+        vt_symbol = f"{symbol}.{exchange.value}"
+        ticks: List[TickData] = []
+        for db_tick in s:
+            db_tick.datetime = DB_TZ.localize(db_tick.datetime)
+            db_tick.exchange = Exchange(db_tick.exchange)
+            db_tick.gateway_name = "DB"
+            db_tick.vt_symbol = vt_symbol
+            ticks.append(db_tick)
+
+            if len(ticks) == chunk_size:
+                yield ticks
+                ticks = []
+
+        if ticks:
+            yield ticks
+
     def delete_bar_data(
         self,
         symbol: str,
@@ -319,7 +382,7 @@ class MongodbDatabase(BaseDatabase):
         data_count = DbBarData.objects.count()
         overview_count = DbBarOverview.objects.count()
         if data_count and not overview_count:
-            self.init_bar_overview()
+            self.rebuild_bar_overview()
 
         s: QuerySet = DbBarOverview.objects()
         overviews = []
@@ -329,9 +392,9 @@ class MongodbDatabase(BaseDatabase):
             overviews.append(overview)
         return overviews
 
-    def init_bar_overview(self) -> None:
+    def rebuild_bar_overview(self) -> None:
         """
-        Init overview table if not exists.
+        Rebuild overview of all bar data with one aggregation.
         """
         s: QuerySet = (
             DbBarData.objects.aggregate({
@@ -341,11 +404,15 @@ class MongodbDatabase(BaseDatabase):
                         "exchange": "$exchange",
                         "interval": "$interval",
                     },
-                    "count": {"$sum": 1}
+                    "count": {"$sum": 1},
+                    "start": {"$min": "$datetime"},
+                    "end": {"$max": "$datetime"},
                 }
             })
         )
 
+        overviews = []
+
         for d in s:
             id_data = d["_id"]
 
@@ -354,30 +421,13 @@ class MongodbDatabase(BaseDatabase):
             overview.exchange = id_data["exchange"]
             overview.interval = id_data["interval"]
             overview.count = d["count"]
+            overview.start = d["start"]
+            overview.end = d["end"]
+            overviews.append(overview)
 
-            start_bar: DbBarData = (
-                DbBarData.objects(
-                    symbol=id_data["symbol"],
-                    exchange=id_data["exchange"],
-                    interval=id_data["interval"],
-                )
-                .order_by("+datetime")
-                .first()
-            )
-            overview.start = start_bar.datetime
-
-            end_bar: DbBarData = (
-                DbBarData.objects(
-                    symbol=id_data["symbol"],
-                    exchange=id_data["exchange"],
-                    interval=id_data["interval"],
-                )
-                .order_by("-datetime")
-                .first()
-            )
-            overview.end = end_bar.datetime
-
-            overview.save()
+        DbBarOverview.objects.delete()
+        if overviews:
+            DbBarOverview.objects.insert(overviews)
 
 
 def to_update_param(d: dict) -> dict:
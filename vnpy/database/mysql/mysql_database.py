@@ -1,6 +1,6 @@
 """"""
 from datetime import datetime
-from typing import List
+from typing import Iterator, List
 
 from peewee import (
     AutoField,
@@ -21,6 +21,7 @@ from vnpy.trader.database import (
     BaseDatabase,
     BarOverview,
     DB_TZ,
+    CHUNK_SIZE,
     convert_tz
 )
 from vnpy.trader.setting import SETTINGS
@@ -148,17 +149,27 @@ class MysqlDatabase(BaseDatabase):
         for bar in bars:
             bar.datetime = convert_tz(bar.datetime)
 
-            d = bar.__dict__
+            d = bar.to_dict()
             d["exchange"] = d["exchange"].value
             d["interval"] = d["interval"].value
             d.pop("gateway_name")
             d.pop("vt_symbol")
             data.append(d)
 
+        start = min(d["datetime"] for d in data)
+        end = max(d["datetime"] for d in data)
+
         # Upsert data into database
+        new_count = 0
+
         with self.db.atomic():
             for c in chunked(data, 50):
-                DbBarData.insert_many(c).on_conflict_replace().execute()
+                query = DbBarData.insert_many(c).on_conflict_replace()
+
+                # REPLACE affects 1 row if inserted and 2 rows if existing
+                # one is replaced, so new rows are counted from the result
+                cursor = self.db.execute(query)
+                new_count += len(c) * 2 - cursor.rowcount
 
         # Update bar overview
         overview: DbBarOverview = DbBarOverview.get_or_none(
@@ -172,22 +183,18 @@ class MysqlDatabase(BaseDatabase):
             overview.symbol = symbol
             overview.exchange = exchange.value
             overview.interval = interval.value
-            overview.start = bars[0].datetime
-            overview.end = bars[-1].datetime
-            overview.count = len(bars)
+            overview.start = start
+            overview.end = end
+            overview.count = new_count
         else:
-            overview.start = min(bars[0].datetime, overview.start)
-            overview.end = max(bars[-1].datetime, overview.end)
-
-            s: ModelSelect = DbBarData.select().where(
-                (DbBarData.symbol == symbol)
-                & (DbBarData.exchange == exchange.value)
-                & (DbBarData.interval == interval.value)
-            )
-            overview.count = s.count()
+            overview.start = min(start, overview.start)
+            overview.end = max(end, overview.end)
+            overview.count += new_count
 
         overview.save()
 
+        return True
+
     def save_tick_data(self, ticks: List[TickData]) -> bool:
         """"""
         # Convert bar object to dict and adjust timezone
@@ -196,7 +203,7 @@ class MysqlDatabase(BaseDatabase):
         for tick in ticks:
             tick.datetime = convert_tz(tick.datetime)
 
-            d = tick.__dict__
+            d = tick.to_dict()
             d["exchange"] = d["exchange"].value
             d.pop("gateway_name")
             d.pop("vt_symbol")
@@ -266,6 +273,93 @@ class MysqlDatabase(BaseDatabase):
 
         return ticks
 
+    def iter_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[List[BarData]]:
+        """"""
+        vt_symbol = f"{symbol}.{exchange.value}"
+
+        # Keyset pagination on the unique index, so that each query only
+        # scans rows of one chunk no matter how far it goes.
+        start_filter = DbBarData.datetime >= start
+
+        while True:
+            s: ModelSelect = (
+                DbBarData.select().where(
+                    (DbBarData.symbol == symbol)
+                    & (DbBarData.exchange == exchange.value)
+                    & (DbBarData.interval == interval.value)
+                    & start_filter
+                    & (DbBarData.datetime <= end)
+                ).order_by(DbBarData.datetime).limit(chunk_size)
+            )
+
+            bars: List[BarData] = []
+            for db_bar in s.iterator():
+                last_datetime = db_bar.datetime
+
+                db_bar.datetime = DB_TZ.localize(db_bar.datetime)
+                db_bar.exchange = Exchange(db_bar.exchange)
+                db_bar.interval = Interval(db_bar.interval)
+                db_bar.gateway_name = "DB"
+                db_bar.vt_symbol = vt_symbol
+                bars.append(db_bar)
+
+            if bars:
+                yield bars
+
+            if len(bars) < chunk_size:
+                break
+
+            start_filter = DbBarData.datetime > last_datetime
+
+    def iter_tick_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[List[TickData]]:
+        """"""
+        vt_symbol = f"{symbol}.{exchange.value}"
+
+        start_filter = DbTickData.datetime >= start
+
+        while True:
+            s: ModelSelect = (
+                DbTickData.select().where(
+                    (DbTickData.symbol == symbol)
+                    & (DbTickData.exchange == exchange.value)
+                    & start_filter
+                    & (DbTickData.datetime <= end)
+                ).order_by(DbTickData.datetime).limit(chunk_size)
+            )
+
+            ticks: List[TickData] = []
+            for db_tick in s.iterator():
+                last_datetime = db_tick.datetime
+
+                db_tick.datetime = DB_TZ.localize(db_tick.datetime)
+                db_tick.exchange = Exchange(db_tick.exchange)
+                db_tick.gateway_name = "DB"
+                db_tick.vt_symbol = vt_symbol
+                ticks.append(db_tick)
+
+            if ticks:
+                yield ticks
+
+            if len(ticks) < chunk_size:
+                break
+
+            start_filter = DbTickData.datetime > last_datetime
+
     def delete_bar_data(
         self,
         symbol: str,
@@ -310,7 +404,7 @@ class MysqlDatabase(BaseDatabase):
         data_count = DbBarData.select().count()
         overview_count = DbBarOverview.select().count()
         if data_count and not overview_count:
-            self.init_bar_overview()
+            self.rebuild_bar_overview()
 
         s: ModelSelect = DbBarOverview.select()
         overviews = []
@@ -320,55 +414,30 @@ class MysqlDatabase(BaseDatabase):
             overviews.append(overview)
         return overviews
 
-    def init_bar_overview(self) -> None:
+    def rebuild_bar_overview(self) -> None:
         """
-        Init overview table if not exists.
+        Rebuild overview of all bar data with one aggregated query.
         """
         s: ModelSelect = (
             DbBarData.select(
                 DbBarData.symbol,
                 DbBarData.exchange,
                 DbBarData.interval,
-                fn.COUNT(DbBarData.id).alias("count")
+                fn.COUNT(DbBarData.id).alias("count"),
+                fn.MIN(DbBarData.datetime).alias("start"),
+                fn.MAX(DbBarData.datetime).alias("end")
             ).group_by(
                 DbBarData.symbol,
                 DbBarData.exchange,
                 DbBarData.interval
-            )
+            ).dicts()
         )
 
-        for data in s:
-            overview = DbBarOverview()
-            overview.symbol = data.symbol
-            overview.exchange = data.exchange
-            overview.interval = data.interval
-            overview.count = data.count
-
-            start_bar: DbBarData = (
-                DbBarData.select()
-                .where(
-                    (DbBarData.symbol == data.symbol)
-                    & (DbBarData.exchange == data.exchange)
-                    & (DbBarData.interval == data.interval)
-                )
-                .order_by(DbBarData.datetime.asc())
-                .first()
-            )
-            overview.start = start_bar.datetime
-
-            end_bar: DbBarData = (
-                DbBarData.select()
-                .where(
-                    (DbBarData.symbol == data.symbol)
-                    & (DbBarData.exchange == data.exchange)
-                    & (DbBarData.interval == data.interval)
-                )
-                .order_by(DbBarData.datetime.desc())
-                .first()
-            )
-            overview.end = end_bar.datetime
+        with self.db.atomic():
+            DbBarOverview.delete().execute()
 
-            overview.save()
+            for c in chunked(list(s), 50):
+                DbBarOverview.insert_many(c).execute()
 
 
 database_manager = MysqlDatabase()
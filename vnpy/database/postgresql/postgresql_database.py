@@ -1,16 +1,19 @@
 """"""
 from datetime import datetime
-from typing import List
+from typing import Dict, Iterator, List
 
 from peewee import (
     AutoField,
     CharField,
     DateTimeField,
+    Field,
     FloatField, IntegerField,
     Model,
     PostgresqlDatabase as PeeweePostgresqlDatabase,
     ModelSelect,
     ModelDelete,
+    SQL,
+    chunked,
     fn
 )
 
@@ -20,6 +23,7 @@ from vnpy.trader.database import (
     BaseDatabase,
     BarOverview,
     DB_TZ,
+    CHUNK_SIZE,
     convert_tz
 )
 from vnpy.trader.setting import SETTINGS
@@ -125,6 +129,17 @@ class DbBarOverview(Model):
         indexes = ((("symbol", "exchange", "interval"), True),)
 
 
+# Bar fields updated when upserting existing row
+BAR_VALUE_FIELDS: List[Field] = [
+    DbBarData.volume,
+    DbBarData.open_interest,
+    DbBarData.open_price,
+    DbBarData.high_price,
+    DbBarData.low_price,
+    DbBarData.close_price,
+]
+
+
 class PostgresqlDatabase(BaseDatabase):
     """"""
 
@@ -142,31 +157,44 @@ class PostgresqlDatabase(BaseDatabase):
         exchange = bar.exchange
         interval = bar.interval
 
-        # Convert bar object to dict and adjust timezone
-        data = []
+        # Convert bar object to dict and adjust timezone. Only the last bar
+        # of same datetime is kept, since one upsert statement cannot
+        # affect a row twice in PostgreSQL.
+        bar_dicts: Dict[datetime, dict] = {}
 
         for bar in bars:
             bar.datetime = convert_tz(bar.datetime)
 
-            d = bar.__dict__
+            d = bar.to_dict()
             d["exchange"] = d["exchange"].value
             d["interval"] = d["interval"].value
             d.pop("gateway_name")
             d.pop("vt_symbol")
-            data.append(d)
+            bar_dicts[bar.datetime] = d
+
+        data = list(bar_dicts.values())
+
+        start = min(d["datetime"] for d in data)
+        end = max(d["datetime"] for d in data)
 
         # Upsert data into database
+        new_count = 0
+
         with self.db.atomic():
-            for d in data:
-                DbBarData.insert(d).on_conflict(
-                    update=d,
+            for c in chunked(data, 50):
+                query = DbBarData.insert_many(c).on_conflict(
                     conflict_target=(
                         DbBarData.symbol,
                         DbBarData.exchange,
                         DbBarData.interval,
                         DbBarData.datetime,
                     ),
-                ).execute()
+                    preserve=BAR_VALUE_FIELDS,
+                ).returning(SQL("xmax = 0"))
+
+                # xmax is 0 for inserted rows and not for updated ones,
+                # so new rows are counted from the result
+                new_count += sum(inserted for inserted, in query.tuples().execute())
 
         # Update bar overview
         overview: DbBarOverview = DbBarOverview.get_or_none(
@@ -180,22 +208,18 @@ class PostgresqlDatabase(BaseDatabase):
             overview.symbol = symbol
             overview.exchange = exchange.value
             overview.interval = interval.value
-            overview.start = bars[0].datetime
-            overview.end = bars[-1].datetime
-            overview.count = len(bars)
+            overview.start = start
+            overview.end = end
+            overview.count = new_count
         else:
-            overview.start = min(bars[0].datetime, overview.start)
-            overview.end = max(bars[-1].datetime, overview.end)
-
-            s: ModelSelect = DbBarData.select().where(
-                (DbBarData.symbol == symbol)
-                & (DbBarData.exchange == exchange.value)
-                & (DbBarData.interval == interval.value)
-            )
-            overview.count = s.count()
+            overview.start = min(start, overview.start)
+            overview.end = max(end, overview.end)
+            overview.count += new_count
 
         overview.save()
 
+        return True
+
     def save_tick_data(self, ticks: List[TickData]) -> bool:
         """"""
         # Convert bar object to dict and adjust timezone
@@ -204,7 +228,7 @@ class PostgresqlDatabase(BaseDatabase):
         for tick in ticks:
             tick.datetime = convert_tz(tick.datetime)
 
-            d = tick.__dict__
+            d = tick.to_dict()
             d["exchange"] = d["exchange"].value
             d.pop("gateway_name")
             d.pop("vt_symbol")
@@ -281,6 +305,93 @@ class PostgresqlDatabase(BaseDatabase):
 
         return ticks
 
+    def iter_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[List[BarData]]:
+        """"""
+        vt_symbol = f"{symbol}.{exchange.value}"
+
+        # Keyset pagination on the unique index, so that each query only
+        # scans rows of one chunk no matter how far it goes.
+        start_filter = DbBarData.datetime >= start
+
+        while True:
+            s: ModelSelect = (
+                DbBarData.select().where(
+                    (DbBarData.symbol == symbol)
+                    & (DbBarData.exchange == exchange.value)
+                    & (DbBarData.interval == interval.value)
+                    & start_filter
+                    & (DbBarData.datetime <= end)
+                ).order_by(DbBarData.datetime).limit(chunk_size)
+            )
+
+            bars: List[BarData] = []
+            for db_bar in s.iterator():
+                last_datetime = db_bar.datetime
+
+                db_bar.datetime = DB_TZ.localize(db_bar.datetime)
+                db_bar.exchange = Exchange(db_bar.exchange)
+                db_bar.interval = Interval(db_bar.interval)
+                db_bar.gateway_name = "DB"
+                db_bar.vt_symbol = vt_symbol
+                bars.append(db_bar)
+
+            if bars:
+                yield bars
+
+            if len(bars) < chunk_size:
+                break
+
+            start_filter = DbBarData.datetime > last_datetime
+
+    def iter_tick_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[List[TickData]]:
+        """"""
+        vt_symbol = f"{symbol}.{exchange.value}"
+
+        start_filter = DbTickData.datetime >= start
+
+        while True:
+            s: ModelSelect = (
+                DbTickData.select().where(
+                    (DbTickData.symbol == symbol)
+                    & (DbTickData.exchange == exchange.value)
+                    & start_filter
+                    & (DbTickData.datetime <= end)
+                ).order_by(DbTickData.datetime).limit(chunk_size)
+            )
+
+            ticks: List[TickData] = []
+            for db_tick in s.iterator():
+                last_datetime = db_tick.datetime
+
+                db_tick.datetime = DB_TZ.localize(db_tick.datetime)
+                db_tick.exchange = Exchange(db_tick.exchange)
+                db_tick.gateway_name = "DB"
+                db_tick.vt_symbol = vt_symbol
+                ticks.append(db_tick)
+
+            if ticks:
+                yield ticks
+
+            if len(ticks) < chunk_size:
+                break
+
+            start_filter = DbTickData.datetime > last_datetime
+
     def delete_bar_data(
         self,
         symbol: str,
@@ -325,7 +436,7 @@ class PostgresqlDatabase(BaseDatabase):
         data_count = DbBarData.select().count()
         overview_count = DbBarOverview.select().count()
         if data_count and not overview_count:
-            self.init_bar_overview()
+            self.rebuild_bar_overview()
 
         s: ModelSelect = DbBarOverview.select()
         overviews = []
@@ -335,55 +446,30 @@ class PostgresqlDatabase(BaseDatabase):
             overviews.append(overview)
         return overviews
 
-    def init_bar_overview(self) -> None:
+    def rebuild_bar_overview(self) -> None:
         """
-        Init overview table if not exists.
+        Rebuild overview of all bar data with one aggregated query.
         """
         s: ModelSelect = (
             DbBarData.select(
                 DbBarData.symbol,
                 DbBarData.exchange,
                 DbBarData.interval,
-                fn.COUNT(DbBarData.id).alias("count")
+                fn.COUNT(DbBarData.id).alias("count"),
+                fn.MIN(DbBarData.datetime).alias("start"),
+                fn.MAX(DbBarData.datetime).alias("end")
             ).group_by(
                 DbBarData.symbol,
                 DbBarData.exchange,
                 DbBarData.interval
-            )
+            ).dicts()
         )
 
-        for data in s:
-            overview = DbBarOverview()
-            overview.symbol = data.symbol
-            overview.exchange = data.exchange
-            overview.interval = data.interval
-            overview.count = data.count
-
-            start_bar: DbBarData = (
-                DbBarData.select()
-                .where(
-                    (DbBarData.symbol == data.symbol)
-                    & (DbBarData.exchange == data.exchange)
-                    & (DbBarData.interval == data.interval)
-                )
-                .order_by(DbBarData.datetime.asc())
-                .first()
-            )
-            overview.start = start_bar.datetime
-
-            end_bar: DbBarData = (
-                DbBarData.select()
-                .where(
-                    (DbBarData.symbol == data.symbol)
-                    & (DbBarData.exchange == data.exchange)
-                    & (DbBarData.interval == data.interval)
-                )
-                .order_by(DbBarData.datetime.desc())
-                .first()
-            )
-            overview.end = end_bar.datetime
+        with self.db.atomic():
+            DbBarOverview.delete().execute()
 
-            overview.save()
+            for c in chunked(list(s), 50):
+                DbBarOverview.insert_many(c).execute()
 
 
 database_manager = PostgresqlDatabase()
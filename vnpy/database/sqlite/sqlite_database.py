@@ -1,6 +1,7 @@
 """"""
 from datetime import datetime
-from typing import List
+from operator import attrgetter
+from typing import Iterator, List
 
 from peewee import (
     AutoField,
@@ -22,12 +23,21 @@ from vnpy.trader.database import (
     BaseDatabase,
     BarOverview,
     DB_TZ,
+    CHUNK_SIZE,
     convert_tz
 )
 
 
 path = str(get_file_path("database.db"))
-db = PeeweeSqliteDatabase(path)
+db = PeeweeSqliteDatabase(
+    path,
+    pragmas={
+        "journal_mode": "wal",      # Readers are not blocked while writing
+        "synchronous": "normal",    # Safe with WAL, fsync only on checkpoint
+        "cache_size": -64000,       # 64MB page cache
+        "temp_store": "memory",
+    }
+)
 
 
 class DbBarData(Model):
@@ -120,6 +130,47 @@ class DbBarOverview(Model):
         indexes = ((("symbol", "exchange", "interval"), True),)
 
 
+def generate_insert_sql(model: Model, columns: List[str]) -> str:
+    """
+    Generate upsert statement of model table with columns given.
+    """
+    names = ", ".join(f'"{column}"' for column in columns)
+    values = ", ".join("?" * len(columns))
+
+    return (
+        f'INSERT OR REPLACE INTO "{model._meta.table_name}"'
+        f" ({names}) VALUES ({values})"
+    )
+
+
+BAR_INSERT_SQL: str = generate_insert_sql(
+    DbBarData,
+    [
+        "symbol",
+        "exchange",
+        "datetime",
+        "interval",
+        "volume",
+        "open_interest",
+        "open_price",
+        "high_price",
+        "low_price",
+        "close_price",
+    ]
+)
+
+# Tick fields other than symbol, exchange and datetime
+TICK_VALUE_FIELDS: List[str] = [
+    field.name for field in DbTickData._meta.sorted_fields
+    if field.name not in {"id", "symbol", "exchange", "datetime"}
+]
+TICK_INSERT_SQL: str = generate_insert_sql(
+    DbTickData,
+    ["symbol", "exchange", "datetime"] + TICK_VALUE_FIELDS
+)
+get_tick_values = attrgetter(*TICK_VALUE_FIELDS)
+
+
 class SqliteDatabase(BaseDatabase):
     """"""
 
@@ -131,29 +182,51 @@ class SqliteDatabase(BaseDatabase):
 
     def save_bar_data(self, bars: List[BarData]) -> bool:
         """"""
+        if not bars:
+            return False
+
         # Store key parameters
         bar = bars[0]
         symbol = bar.symbol
         exchange = bar.exchange
         interval = bar.interval
 
-        # Convert bar object to dict and adjust timezone
-        data = []
+        # Convert bar object to tuple and adjust timezone, bar object
+        # passed in is not changed
+        data = [
+            (
+                bar.symbol,
+                bar.exchange.value,
+                convert_tz(bar.datetime),
+                bar.interval.value,
+                bar.volume,
+                bar.open_interest,
+                bar.open_price,
+                bar.high_price,
+                bar.low_price,
+                bar.close_price,
+            )
+            for bar in bars
+        ]
 
-        for bar in bars:
-            bar.datetime = convert_tz(bar.datetime)
+        start = min(d[2] for d in data)
+        end = max(d[2] for d in data)
 
-            d = bar.__dict__
-            d["exchange"] = d["exchange"].value
-            d["interval"] = d["interval"].value
-            d.pop("gateway_name")
-            d.pop("vt_symbol")
-            data.append(d)
+        # Only bars within time range of new data are counted for
+        # updating overview, which is fast with index
+        s: ModelSelect = DbBarData.select().where(
+            (DbBarData.symbol == symbol)
+            & (DbBarData.exchange == exchange.value)
+            & (DbBarData.interval == interval.value)
+            & (DbBarData.datetime >= start)
+            & (DbBarData.datetime <= end)
+        )
 
         # Upsert data into database
         with self.db.atomic():
-            for c in chunked(data, 50):
-                DbBarData.insert_many(c).on_conflict_replace().execute()
+            old_count = s.count()
+            self.db.cursor().executemany(BAR_INSERT_SQL, data)
+            new_count = s.count()
 
         # Update bar overview
         overview: DbBarOverview = DbBarOverview.get_or_none(
@@ -167,40 +240,39 @@ class SqliteDatabase(BaseDatabase):
             overview.symbol = symbol
             overview.exchange = exchange.value
             overview.interval = interval.value
-            overview.start = bars[0].datetime
-            overview.end = bars[-1].datetime
-            overview.count = len(bars)
+            overview.start = start
+            overview.end = end
+            overview.count = new_count
         else:
-            overview.start = min(bars[0].datetime, overview.start)
-            overview.end = max(bars[-1].datetime, overview.end)
-
-            s: ModelSelect = DbBarData.select().where(
-                (DbBarData.symbol == symbol)
-                & (DbBarData.exchange == exchange.value)
-                & (DbBarData.interval == interval.value)
-            )
-            overview.count = s.count()
+            overview.start = min(start, overview.start)
+            overview.end = max(end, overview.end)
+            overview.count += new_count - old_count
 
         overview.save()
 
+        return True
+
     def save_tick_data(self, ticks: List[TickData]) -> bool:
         """"""
-        # Convert bar object to dict and adjust timezone
-        data = []
-
-        for tick in ticks:
-            tick.datetime = convert_tz(tick.datetime)
-
-            d = tick.__dict__
-            d["exchange"] = d["exchange"].value
-            d.pop("gateway_name")
-            d.pop("vt_symbol")
-            data.append(d)
+        if not ticks:
+            return False
+
+        # Convert tick object to tuple and adjust timezone, tick object
+        # passed in is not changed
+        data = [
+            (
+                tick.symbol,
+                tick.exchange.value,
+                convert_tz(tick.datetime),
+            ) + get_tick_values(tick)
+            for tick in ticks
+        ]
 
         # Upsert data into database
         with self.db.atomic():
-            for c in chunked(data, 10):
-                DbTickData.insert_many(c).on_conflict_replace().execute()
+            self.db.cursor().executemany(TICK_INSERT_SQL, data)
+
+        return True
 
     def load_bar_data(
         self,
@@ -261,6 +333,93 @@ class SqliteDatabase(BaseDatabase):
 
         return ticks
 
+    def iter_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[List[BarData]]:
+        """"""
+        vt_symbol = f"{symbol}.{exchange.value}"
+
+        # Keyset pagination on the unique index, so that each query only
+        # scans rows of one chunk no matter how far it goes.
+        start_filter = DbBarData.datetime >= start
+
+        while True:
+            s: ModelSelect = (
+                DbBarData.select().where(
+                    (DbBarData.symbol == symbol)
+                    & (DbBarData.exchange == exchange.value)
+                    & (DbBarData.interval == interval.value)
+                    & start_filter
+                    & (DbBarData.datetime <= end)
+                ).order_by(DbBarData.datetime).limit(chunk_size)
+            )
+
+            bars: List[BarData] = []
+            for db_bar in s.iterator():
+                last_datetime = db_bar.datetime
+
+                db_bar.datetime = DB_TZ.localize(db_bar.datetime)
+                db_bar.exchange = Exchange(db_bar.exchange)
+                db_bar.interval = Interval(db_bar.interval)
+                db_bar.gateway_name = "DB"
+                db_bar.vt_symbol = vt_symbol
+                bars.append(db_bar)
+
+            if bars:
+                yield bars
+
+            if len(bars) < chunk_size:
+                break
+
+            start_filter = DbBarData.datetime > last_datetime
+
+    def iter_tick_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[List[TickData]]:
+        """"""
+        vt_symbol = f"{symbol}.{exchange.value}"
+
+        start_filter = DbTickData.datetime >= start
+
+        while True:
+            s: ModelSelect = (
+                DbTickData.select().where(
+                    (DbTickData.symbol == symbol)
+                    & (DbTickData.exchange == exchange.value)
+                    & start_filter
+                    & (DbTickData.datetime <= end)
+                ).order_by(DbTickData.datetime).limit(chunk_size)
+            )
+
+            ticks: List[TickData] = []
+            for db_tick in s.iterator():
+                last_datetime = db_tick.datetime
+
+                db_tick.datetime = DB_TZ.localize(db_tick.datetime)
+                db_tick.exchange = Exchange(db_tick.exchange)
+                db_tick.gateway_name = "DB"
+                db_tick.vt_symbol = vt_symbol
+                ticks.append(db_tick)
+
+            if ticks:
+                yield ticks
+
+            if len(ticks) < chunk_size:
+                break
+
+            start_filter = DbTickData.datetime > last_datetime
+
     def delete_bar_data(
         self,
         symbol: str,
@@ -306,7 +465,7 @@ class SqliteDatabase(BaseDatabase):
         data_count = DbBarData.select().count()
         overview_count = DbBarOverview.select().count()
         if data_count and not overview_count:
-            self.init_bar_overview()
+            self.rebuild_bar_overview()
 
         s: ModelSelect = DbBarOverview.select()
         overviews = []
@@ -316,55 +475,30 @@ class SqliteDatabase(BaseDatabase):
             overviews.append(overview)
         return overviews
 
-    def init_bar_overview(self) -> None:
+    def rebuild_bar_overview(self) -> None:
         """
-        Init overview table if not exists.
+        Rebuild overview of all bar data with one aggregated query.
         """
         s: ModelSelect = (
             DbBarData.select(
                 DbBarData.symbol,
                 DbBarData.exchange,
                 DbBarData.interval,
-                fn.COUNT(DbBarData.id).alias("count")
+                fn.COUNT(DbBarData.id).alias("count"),
+                fn.MIN(DbBarData.datetime).alias("start"),
+                fn.MAX(DbBarData.datetime).alias("end")
             ).group_by(
                 DbBarData.symbol,
                 DbBarData.exchange,
                 DbBarData.interval
-            )
+            ).dicts()
         )
 
-        for data in s:
-            overview = DbBarOverview()
-            overview.symbol = data.symbol
-            overview.exchange = data.exchange
-            overview.interval = data.interval
-            overview.count = data.count
-
-            start_bar: DbBarData = (
-                DbBarData.select()
-                .where(
-                    (DbBarData.symbol == data.symbol)
-                    & (DbBarData.exchange == data.exchange)
-                    & (DbBarData.interval == data.interval)
-                )
-                .order_by(DbBarData.datetime.asc())
-                .first()
-            )
-            overview.start = start_bar.datetime
-
-            end_bar: DbBarData = (
-                DbBarData.select()
-                .where(
-                    (DbBarData.symbol == data.symbol)
-                    & (DbBarData.exchange == data.exchange)
-                    & (DbBarData.interval == data.interval)
-                )
-                .order_by(DbBarData.datetime.desc())
-                .first()
-            )
-            overview.end = end_bar.datetime
+        with self.db.atomic():
+            DbBarOverview.delete().execute()
 
-            overview.save()
+            for c in chunked(list(s), 50):
+                DbBarOverview.insert_many(c).execute()
 
 
 database_manager = SqliteDatabase()
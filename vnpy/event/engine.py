@@ -2,13 +2,16 @@
 Event-driven framework of vn.py framework.
 """
 
-from collections import defaultdict
+from collections import defaultdict, deque
 from queue import Empty, Queue
-from threading import Thread
-from time import sleep
-from typing import Any, Callable, List
+from threading import Thread, Event as ThreadEvent
+from time import sleep, perf_counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .profiler import EventProfiler
 
 EVENT_TIMER = "eTimer"
+EVENT_CONFLATE = "eConflate."
 
 
 class Event:
@@ -22,12 +25,58 @@ class Event:
         """"""
         self.type: str = type
         self.data: Any = data
+        self.put_time: float = 0
 
 
 # Defines handler function to be used in event engine.
 HandlerType = Callable[[Event], None]
 
 
+class ConflatedHandler:
+    """
+    Wraps a handler function so that only the latest event of each
+    vt_symbol (or of the event type if data has no vt_symbol) is
+    delivered when the handler falls behind the event queue.
+
+    Incoming events are cached and a flush event is put at the end of
+    the queue, all events cached before the flush event is processed
+    are conflated into the latest one of each key.
+    """
+
+    def __init__(self, event_engine: "EventEngine", handler: HandlerType):
+        """"""
+        self.event_engine: "EventEngine" = event_engine
+        self.handler: HandlerType = handler
+        self.__qualname__: str = getattr(handler, "__qualname__", repr(handler))
+
+        self.flush_event: Event = Event(f"{EVENT_CONFLATE}{id(self)}", self)
+        self.pending: Dict[Any, Event] = {}
+        self.scheduled: bool = False
+
+    def __call__(self, event: Event) -> None:
+        """
+        Cache event and schedule a flush if not yet.
+        """
+        key = getattr(event.data, "vt_symbol", event.type)
+        self.pending[key] = event
+
+        if not self.scheduled:
+            self.scheduled = True
+            self.event_engine.put(self.flush_event)
+
+    def flush(self, event: Event) -> None:
+        """
+        Deliver all cached events to the wrapped handler.
+        """
+        self.scheduled = False
+
+        pending = self.pending
+        self.pending = {}
+
+        for cached_event in pending.values():
+            self.handler(cached_event)
+
+
 class EventEngine:
     """
     Event engine distributes event object based on its type
@@ -37,19 +86,41 @@ class EventEngine:
     which can be used for timing purpose.
     """
 
-    def __init__(self, interval: int = 1):
+    def __init__(self, interval: int = 1, batch_size: int = 0):
         """
         Timer event is generated every 1 second by default, if
         interval not specified.
+
+        Batched dispatch mode is enabled if batch_size is larger than 0,
+        events are then drained from a lock-free deque by up to
+        batch_size events each time the dispatch thread wakes up.
         """
         self._interval: int = interval
+        self._batch_size: int = batch_size
         self._queue: Queue = Queue()
+        self._deque: deque = deque()
+        self._signal: ThreadEvent = ThreadEvent()
         self._active: bool = False
-        self._thread: Thread = Thread(target=self._run)
         self._timer: Thread = Thread(target=self._run_timer)
         self._handlers: defaultdict = defaultdict(list)
         self._general_handlers: List = []
 
+        # Event type to handler tuple, rebuilt on every (un)register so that
+        # dispatch thread only needs a single dict lookup without locking.
+        self._dispatch_map: Dict[str, Tuple[HandlerType, ...]] = {}
+        self._general_tuple: Tuple[HandlerType, ...] = ()
+
+        # Flush events of conflated handlers are not sent to general handlers.
+        self._conflated_handlers: Dict[Tuple[str, HandlerType], ConflatedHandler] = {}
+        self._flush_handlers: Dict[str, Tuple[HandlerType, ...]] = {}
+
+        self._profiler: Optional[EventProfiler] = None
+
+        if batch_size > 0:
+            self._thread: Thread = Thread(target=self._run_batch)
+        else:
+            self._thread = Thread(target=self._run)
+
     def _run(self) -> None:
         """
         Get event from queue and then process it.
@@ -57,10 +128,54 @@ class EventEngine:
         while self._active:
             try:
                 event = self._queue.get(block=True, timeout=1)
-                self._process(event)
+
+                if self._profiler:
+                    self._process_profiled(event)
+                else:
+                    self._process(event)
             except Empty:
                 pass
 
+    def _run_batch(self) -> None:
+        """
+        Drain events from deque in batches and then process them.
+        """
+        events = self._deque
+        signal = self._signal
+        batch_size = self._batch_size
+
+        while self._active:
+            if not signal.wait(timeout=1):
+                continue
+            signal.clear()
+
+            count = 0
+            if self._profiler:
+                while events and count < batch_size:
+                    self._process_profiled(events.popleft())
+                    count += 1
+            else:
+                while events and count < batch_size:
+                    self._process(events.popleft())
+                    count += 1
+
+            # Wake up immediately if there are events left in deque.
+            if events:
+                signal.set()
+
+    def _process_profiled(self, event: Event) -> None:
+        """
+        Distribute event through profiler to record handler latency.
+        """
+        handlers = self._dispatch_map.get(event.type, self._general_tuple)
+
+        profiler = self._profiler
+        if profiler:
+            profiler.process(event, handlers)
+        else:
+            for handler in handlers:
+                handler(event)
+
     def _process(self, event: Event) -> None:
         """
         First ditribute event to those handlers registered listening
@@ -68,12 +183,12 @@ class EventEngine:
 
         Then distrubute event to those general handlers which listens
         to all types.
-        """
-        if event.type in self._handlers:
-            [handler(event) for handler in self._handlers[event.type]]
 
-        if self._general_handlers:
-            [handler(event) for handler in self._general_handlers]
+        Both are merged into one pre-built handler tuple of each type.
+        """
+        handlers = self._dispatch_map.get(event.type, self._general_tuple)
+        for handler in handlers:
+            handler(event)
 
     def _run_timer(self) -> None:
         """
@@ -104,21 +219,102 @@ class EventEngine:
         """
         Put an event object into event queue.
         """
-        self._queue.put(event)
+        if self._profiler:
+            event.put_time = perf_counter()
+
+        if self._batch_size > 0:
+            self._deque.append(event)
+            if not self._signal.is_set():
+                self._signal.set()
+        else:
+            self._queue.put(event)
+
+    def get_queue_size(self) -> int:
+        """
+        Get number of events waiting to be processed.
+        """
+        if self._batch_size > 0:
+            return len(self._deque)
+        else:
+            return self._queue.qsize()
+
+    def start_profile(self, profiler: EventProfiler = None) -> EventProfiler:
+        """
+        Start recording latency of event dispatching.
+        """
+        if not profiler:
+            profiler = EventProfiler()
+        self._profiler = profiler
+        return profiler
+
+    def stop_profile(self) -> None:
+        """
+        Stop recording latency of event dispatching.
+        """
+        self._profiler = None
+
+    def get_profiler(self) -> Optional[EventProfiler]:
+        """
+        Get profiler currently used, None if profiling is not active.
+        """
+        return self._profiler
+
+    def _update_dispatch_map(self) -> None:
+        """
+        Rebuild handler tuples used for dispatching.
+        """
+        general_tuple = tuple(self._general_handlers)
+
+        dispatch_map = {}
+        for type, handler_list in self._handlers.items():
+            dispatch_map[type] = tuple(handler_list) + general_tuple
+
+        dispatch_map.update(self._flush_handlers)
+
+        self._general_tuple = general_tuple
+        self._dispatch_map = dispatch_map
 
-    def register(self, type: str, handler: HandlerType) -> None:
+    def register(self, type: str, handler: HandlerType, conflate: bool = False) -> None:
         """
         Register a new handler function for a specific event type. Every
         function can only be registered once for each event type.
+
+        If conflate is True, the handler only receives the latest event
+        of each vt_symbol when it falls behind the event queue, which is
+        useful for handlers only interested in latest market data. A
+        function already registered for the event type is not registered
+        again, whether conflated or not.
         """
         handler_list = self._handlers[type]
-        if handler not in handler_list:
-            handler_list.append(handler)
+
+        key = (type, handler)
+        if key in self._conflated_handlers or handler in handler_list:
+            return
+
+        if conflate:
+            conflated_handler = ConflatedHandler(self, handler)
+            self._conflated_handlers[key] = conflated_handler
+
+            flush_type = conflated_handler.flush_event.type
+            self._flush_handlers[flush_type] = (conflated_handler.flush,)
+
+            handler = conflated_handler
+
+        handler_list.append(handler)
+        self._update_dispatch_map()
 
     def unregister(self, type: str, handler: HandlerType) -> None:
         """
         Unregister an existing handler function from event engine.
         """
+        conflated_handler = self._conflated_handlers.pop((type, handler), None)
+        if conflated_handler:
+            # Flush event may be still in queue, which should be dropped
+            # instead of being sent to general handlers.
+            flush_type = conflated_handler.flush_event.type
+            self._flush_handlers[flush_type] = ()
+            handler = conflated_handler
+
         handler_list = self._handlers[type]
 
         if handler in handler_list:
@@ -127,6 +323,8 @@ class EventEngine:
         if not handler_list:
             self._handlers.pop(type)
 
+        self._update_dispatch_map()
+
     def register_general(self, handler: HandlerType) -> None:
         """
         Register a new handler function for all event types. Every
@@ -134,6 +332,7 @@ class EventEngine:
         """
         if handler not in self._general_handlers:
             self._general_handlers.append(handler)
+            self._update_dispatch_map()
 
     def unregister_general(self, handler: HandlerType) -> None:
         """
@@ -141,3 +340,4 @@ class EventEngine:
         """
         if handler in self._general_handlers:
             self._general_handlers.remove(handler)
+            self._update_dispatch_map()
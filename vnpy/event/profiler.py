@@ -0,0 +1,153 @@
+"""
+Latency profiler of event engine dispatching.
+"""
+
+import csv
+from collections import defaultdict, deque
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Tuple
+
+
+class LatencyStats:
+    """
+    Running statistics of a latency series, percentiles are calculated
+    from the most recent samples.
+    """
+
+    def __init__(self, size: int = 10000):
+        """"""
+        self.count: int = 0
+        self.total: float = 0
+        self.max: float = 0
+        self.samples: deque = deque(maxlen=size)
+
+    def update(self, value: float) -> None:
+        """
+        Add a new latency value (in seconds).
+        """
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, n: float) -> float:
+        """
+        Get percentile value of recent samples.
+        """
+        if not self.samples:
+            return 0
+
+        samples = sorted(self.samples)
+        ix = min(int(len(samples) * n / 100), len(samples) - 1)
+        return samples[ix]
+
+
+class EventProfiler:
+    """
+    Records call count and latency of every handler by event type,
+    and also the lag between event put into queue and dispatched.
+    """
+
+    def __init__(self, sample_size: int = 10000):
+        """"""
+        self.sample_size: int = sample_size
+
+        self.lag_stats: Dict[str, LatencyStats] = defaultdict(self.new_stats)
+        self.handler_stats: Dict[Tuple[str, str], LatencyStats] = defaultdict(self.new_stats)
+        self.handler_names: Dict[Callable, str] = {}
+
+        self.dump_path: str = ""
+        self.dump_interval: float = 0
+        self.dump_time: float = perf_counter()
+
+    def new_stats(self) -> LatencyStats:
+        """"""
+        return LatencyStats(self.sample_size)
+
+    def get_handler_name(self, handler: Callable) -> str:
+        """
+        Get readable name of a handler function.
+        """
+        name = self.handler_names.get(handler, "")
+        if not name:
+            name = getattr(handler, "__qualname__", repr(handler))
+            self.handler_names[handler] = name
+        return name
+
+    def process(self, event: Any, handlers: Tuple[Callable, ...]) -> None:
+        """
+        Distribute event to handlers and record latency of each call.
+        """
+        start = perf_counter()
+
+        put_time = getattr(event, "put_time", 0)
+        if put_time:
+            self.lag_stats[event.type].update(start - put_time)
+
+        for handler in handlers:
+            handler(event)
+
+            end = perf_counter()
+            name = self.get_handler_name(handler)
+            self.handler_stats[(event.type, name)].update(end - start)
+            start = end
+
+        if self.dump_interval and start - self.dump_time >= self.dump_interval:
+            self.dump_time = start
+            self.dump(self.dump_path)
+
+    def set_dump(self, path: str, interval: float) -> None:
+        """
+        Dump profile data into file periodically.
+        """
+        self.dump_path = path
+        self.dump_interval = interval
+
+    def get_stats(self) -> List[dict]:
+        """
+        Get profile data of all event types and handlers, latency values
+        are in milliseconds.
+        """
+        data = []
+
+        for type, stats in list(self.lag_stats.items()):
+            data.append(self.to_dict(type, "[queue lag]", stats))
+
+        for (type, name), stats in list(self.handler_stats.items()):
+            data.append(self.to_dict(type, name, stats))
+
+        return data
+
+    def to_dict(self, type: str, name: str, stats: LatencyStats) -> dict:
+        """"""
+        return {
+            "type": type,
+            "handler": name,
+            "count": stats.count,
+            "mean": stats.total / stats.count * 1000 if stats.count else 0,
+            "p50": stats.percentile(50) * 1000,
+            "p99": stats.percentile(99) * 1000,
+            "max": stats.max * 1000,
+        }
+
+    def dump(self, path: str) -> None:
+        """
+        Write profile data into csv file.
+        """
+        data = self.get_stats()
+        if not path or not data:
+            return
+
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(data[0].keys()), lineterminator="\n")
+            writer.writeheader()
+            writer.writerows(data)
+
+    def clear(self) -> None:
+        """
+        Clear all recorded data.
+        """
+        self.lag_stats.clear()
+        self.handler_stats.clear()
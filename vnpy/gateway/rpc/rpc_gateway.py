@@ -1,5 +1,5 @@
 from vnpy.event import Event
-from vnpy.rpc import RpcClient
+from vnpy.rpc import RpcClient, PICKLE_MODE, FAST_MODE
 from vnpy.trader.gateway import BaseGateway
 from vnpy.trader.object import (
     SubscribeRequest,
@@ -7,6 +7,14 @@ from vnpy.trader.object import (
     OrderRequest
 )
 from vnpy.trader.constant import Exchange
+from vnpy.trader.event import (
+    EVENT_TICK,
+    EVENT_TRADE,
+    EVENT_ORDER,
+    EVENT_POSITION,
+    EVENT_ACCOUNT,
+    EVENT_QUOTE
+)
 
 
 class RpcGateway(BaseGateway):
@@ -16,7 +24,8 @@ class RpcGateway(BaseGateway):
 
     default_setting = {
         "主动请求地址": "tcp://127.0.0.1:2014",
-        "推送订阅地址": "tcp://127.0.0.1:4102"
+        "推送订阅地址": "tcp://127.0.0.1:4102",
+        "传输模式": [PICKLE_MODE, FAST_MODE]
     }
 
     exchanges = list(Exchange)
@@ -27,6 +36,17 @@ class RpcGateway(BaseGateway):
 
         self.symbol_gateway_map = {}
 
+        # Server only publishes general events, events of specific
+        # contract/order/account are created again by callbacks.
+        self.callbacks = {
+            EVENT_TICK: self.on_tick,
+            EVENT_TRADE: self.on_trade,
+            EVENT_ORDER: self.on_order,
+            EVENT_POSITION: self.on_position,
+            EVENT_ACCOUNT: self.on_account,
+            EVENT_QUOTE: self.on_quote
+        }
+
         self.client = RpcClient()
         self.client.callback = self.client_callback
 
@@ -34,6 +54,11 @@ class RpcGateway(BaseGateway):
         """"""
         req_address = setting["主动请求地址"]
         pub_address = setting["推送订阅地址"]
+        mode = setting.get("传输模式", PICKLE_MODE)
+
+        # Transport mode must be the same as server
+        self.client = RpcClient(mode)
+        self.client.callback = self.client_callback
 
         self.client.subscribe_topic("")
         self.client.start(req_address, pub_address)
@@ -114,4 +139,8 @@ class RpcGateway(BaseGateway):
         if hasattr(data, "gateway_name"):
             data.gateway_name = self.gateway_name
 
-        self.event_engine.put(event)
+        callback = self.callbacks.get(event.type, None)
+        if callback:
+            callback(data)
+        else:
+            self.event_engine.put(event)
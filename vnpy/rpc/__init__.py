@@ -1,18 +1,23 @@
 import os
 from os import truncate
+import pickle
 import signal
 import threading
 import traceback
 from datetime import datetime, timedelta
 from functools import lru_cache
-from typing import Any, Callable, Dict
+from itertools import count
+from typing import Any, Callable, Dict, List
 from pathlib import Path
 
 import zmq
 import zmq.auth
-from zmq.backend.cython.constants import NOBLOCK
+from zmq import NOBLOCK
 from zmq.auth.thread import ThreadAuthenticator
 
+from . import codec
+from .publisher import PublishQueue, ConflatedQueue
+
 
 # Achieve Ctrl-c interrupt recv
 signal.signal(signal.SIGINT, signal.SIG_DFL)
@@ -22,6 +27,19 @@ KEEP_ALIVE_TOPIC: str = "_keep_alive"
 KEEP_ALIVE_INTERVAL: timedelta = timedelta(seconds=1)
 KEEP_ALIVE_TOLERANCE: timedelta = timedelta(seconds=30)
 
+# Transport modes, server and client must use the same one
+PICKLE_MODE: str = "pickle"     # REQ/REP sockets, pickled objects
+FAST_MODE: str = "fast"         # ROUTER/DEALER sockets with pipelined calls, compact encoding
+
+# Max time publisher thread waits for data in queue
+PUBLISH_TIMEOUT: float = 1
+
+# Max time publish data stays in batch before sent out
+BATCH_INTERVAL: timedelta = timedelta(milliseconds=10)
+
+# Third frame of message published in batch
+BATCH_FLAG: bytes = b"1"
+
 
 class RemoteException(Exception):
     """
@@ -41,13 +59,81 @@ class RemoteException(Exception):
         return self.__value
 
 
+class RpcFuture:
+    """
+    Result of a remote call sent in fast mode.
+    """
+
+    def __init__(self, reqid: bytes, req: list, futures: Dict[bytes, "RpcFuture"] = None):
+        """
+        futures: dict of futures waiting for reply, which the future is
+        removed from when timed out.
+        """
+        self.reqid: bytes = reqid
+        self.req: list = req
+        self.rep: list = None
+        self.event: threading.Event = threading.Event()
+        self.futures: Dict[bytes, "RpcFuture"] = futures
+
+    def set_reply(self, rep: list) -> None:
+        """"""
+        self.rep = rep
+        self.event.set()
+
+    def done(self) -> bool:
+        """"""
+        return self.event.is_set()
+
+    def result(self, timeout: int = 30000) -> Any:
+        """
+        Wait for reply within timeout (in milliseconds) and return result.
+        """
+        if not self.event.wait(timeout / 1000):
+            # Reply arriving later is discarded
+            if self.futures is not None:
+                self.futures.pop(self.reqid, None)
+
+            msg = f"Timeout of {timeout}ms reached for {self.req}"
+            raise RemoteException(msg)
+
+        if self.rep[0]:
+            return self.rep[1]
+        else:
+            raise RemoteException(self.rep[1])
+
+
 class RpcServer:
-    """"""
+    """
+    In fast mode, requests from both REQ (pickle mode) and DEALER (fast
+    mode) clients are served, while published data can only be received
+    by fast mode clients.
+
+    Published data is sent with topic in a separate frame, so that
+    clients only receive topics subscribed.
+    """
 
-    def __init__(self):
+    def __init__(
+        self,
+        mode: str = PICKLE_MODE,
+        batch_size: int = 0,
+        publish_queue: PublishQueue = None
+    ):
         """
         Constructor
+
+        batch_size: max number of data published in one message in
+        fast mode, 0 for sending every data immediately.
+
+        publish_queue: if provided, data is put into queue and sent by
+        publisher thread, instead of in the thread calling publish.
         """
+        self.__mode: str = mode
+        self.__batch_size: int = batch_size
+        self.__batches: Dict[str, List[Any]] = {}
+
+        self.__publish_queue: PublishQueue = publish_queue
+        self.__publish_thread: threading.Thread = None
+
         # Save functions dict: key is fuction name, value is fuction object
         self.__functions: Dict[str, Any] = {}
 
@@ -55,7 +141,10 @@ class RpcServer:
         self.__context: zmq.Context = zmq.Context()
 
         # Reply socket (Request–reply pattern)
-        self.__socket_rep: zmq.Socket = self.__context.socket(zmq.REP)
+        if mode == FAST_MODE:
+            self.__socket_rep: zmq.Socket = self.__context.socket(zmq.ROUTER)
+        else:
+            self.__socket_rep: zmq.Socket = self.__context.socket(zmq.REP)
 
         # Publish socket (Publish–subscribe pattern)
         self.__socket_pub: zmq.Socket = self.__context.socket(zmq.PUB)
@@ -126,6 +215,10 @@ class RpcServer:
         self.__thread = threading.Thread(target=self.run)
         self.__thread.start()
 
+        if self.__publish_queue:
+            self.__publish_thread = threading.Thread(target=self.run_publish)
+            self.__publish_thread.start()
+
     def stop(self) -> None:
         """
         Stop RpcServer
@@ -142,12 +235,22 @@ class RpcServer:
             self.__thread.join()
         self.__thread = None
 
+        if self.__publish_thread and self.__publish_thread.is_alive():
+            self.__publish_thread.join()
+        self.__publish_thread = None
+
     def run(self) -> None:
         """
         Run RpcServer functions
         """
         start = datetime.utcnow()
 
+        # Wake up in time for sending out data in batch
+        if self.__batch_size:
+            timeout = int(BATCH_INTERVAL.total_seconds() * 1000)
+        else:
+            timeout = 1000
+
         while self.__active:
             # Use poll to wait event arrival, waiting time is 1 second (1000 milliseconds)
             cur = datetime.utcnow()
@@ -155,8 +258,16 @@ class RpcServer:
 
             if delta >= KEEP_ALIVE_INTERVAL:
                 self.publish(KEEP_ALIVE_TOPIC, cur)
+                start = cur
+
+            if self.__batch_size:
+                self.flush()
+
+            if not self.__socket_rep.poll(timeout):
+                continue
 
-            if not self.__socket_rep.poll(1000):
+            if self.__mode == FAST_MODE:
+                self.process_requests()
                 continue
 
             # Receive request data from Reply socket
@@ -165,13 +276,7 @@ class RpcServer:
             # Get function name and parameters
             name, args, kwargs = req
 
-            # Try to get and execute callable function object; capture exception information if it fails
-            try:
-                func = self.__functions[name]
-                r = func(*args, **kwargs)
-                rep = [True, r]
-            except Exception as e:  # noqa
-                rep = [False, traceback.format_exc()]
+            rep = self.call_function(name, args, kwargs)
 
             # send callable response by Reply socket
             self.__socket_rep.send_pyobj(rep)
@@ -183,12 +288,94 @@ class RpcServer:
         if self.__authenticator:
             self.__authenticator.stop()
 
+    def call_function(self, name: str, args: tuple, kwargs: dict) -> list:
+        """
+        Call registered function and return reply.
+        """
+        # Try to get and execute callable function object; capture exception information if it fails
+        try:
+            func = self.__functions[name]
+            r = func(*args, **kwargs)
+            rep = [True, r]
+        except Exception as e:  # noqa
+            rep = [False, traceback.format_exc()]
+
+        return rep
+
+    def process_requests(self) -> None:
+        """
+        Process all requests received by router socket in fast mode.
+        """
+        while True:
+            try:
+                frames = self.__socket_rep.recv_multipart(flags=NOBLOCK)
+            except zmq.Again:
+                break
+
+            # Request from REQ socket: [identity, b"", request]
+            if len(frames) == 3:
+                name, args, kwargs = pickle.loads(frames[2])
+                rep = self.call_function(name, args, kwargs)
+                frames[2] = pickle.dumps(rep)
+            # Request from DEALER socket: [identity, b"", request id, request]
+            else:
+                name, args, kwargs = codec.decode(frames[3])
+                rep = self.call_function(name, args, kwargs)
+                frames[3] = codec.encode(rep)
+
+            self.__socket_rep.send_multipart(frames)
+
+    def run_publish(self) -> None:
+        """
+        Send out data in publish queue.
+        """
+        while self.__active:
+            for topic, data in self.__publish_queue.get(PUBLISH_TIMEOUT):
+                self.send_data(topic, data)
+
     def publish(self, topic: str, data: Any) -> None:
         """
         Publish data
         """
+        if self.__publish_queue:
+            self.__publish_queue.put(topic, data)
+        else:
+            self.send_data(topic, data)
+
+    def send_data(self, topic: str, data: Any) -> None:
+        """
+        Send data through publish socket.
+        """
+        if self.__mode != FAST_MODE:
+            with self.__lock:
+                self.__socket_pub.send_multipart([topic.encode(), pickle.dumps(data)])
+        elif self.__batch_size:
+            with self.__lock:
+                batch = self.__batches.setdefault(topic, [])
+                batch.append(data)
+
+                if len(batch) >= self.__batch_size:
+                    self.send_batch(topic, batch)
+                    self.__batches[topic] = []
+        else:
+            with self.__lock:
+                self.__socket_pub.send_multipart([topic.encode(), codec.encode(data)])
+
+    def send_batch(self, topic: str, batch: List[Any]) -> None:
+        """
+        Send out data of a topic in batch, should be called with lock.
+        """
+        self.__socket_pub.send_multipart([topic.encode(), codec.encode(batch), BATCH_FLAG])
+
+    def flush(self) -> None:
+        """
+        Send out all data waiting in batch.
+        """
         with self.__lock:
-            self.__socket_pub.send_pyobj([topic, data])
+            for topic, batch in self.__batches.items():
+                if batch:
+                    self.send_batch(topic, batch)
+                    self.__batches[topic] = []
 
     def register(self, func: Callable) -> None:
         """
@@ -198,19 +385,44 @@ class RpcServer:
 
 
 class RpcClient:
-    """"""
+    """
+    In fast mode, every thread sends calls with its own DEALER socket,
+    and call_async can be used to keep many calls in flight at the
+    same time.
+    """
 
-    def __init__(self):
+    def __init__(self, mode: str = PICKLE_MODE):
         """Constructor"""
+        self.__mode: str = mode
+        self.__req_address: str = ""
+        self.__socket_options: Dict[str, Any] = {}
+
         # zmq port related
         self.__context: zmq.Context = zmq.Context()
 
         # Request socket (Request–reply pattern)
-        self.__socket_req: zmq.Socket = self.__context.socket(zmq.REQ)
+        if mode == FAST_MODE:
+            self.__socket_req: zmq.Socket = self.__context.socket(zmq.DEALER)
+
+            # Calls from other threads are passed to worker thread
+            self.__pull_address: str = f"inproc://rpc_client_{id(self)}"
+            self.__socket_pull: zmq.Socket = self.__context.socket(zmq.PULL)
+            self.__socket_pull.bind(self.__pull_address)
+
+            # Each thread uses its own sockets, which are closed on exit
+            self.__local: threading.local = threading.local()
+            self.__thread_sockets: List[zmq.Socket] = []
+            self.__futures: Dict[bytes, RpcFuture] = {}
+            self.__request_count: count = count()
+        else:
+            self.__socket_req: zmq.Socket = self.__context.socket(zmq.REQ)
 
         # Subscribe socket (Publish–subscribe pattern)
         self.__socket_sub: zmq.Socket = self.__context.socket(zmq.SUB)
 
+        # Keep-alive is always needed for checking connection
+        self.__socket_sub.setsockopt_string(zmq.SUBSCRIBE, KEEP_ALIVE_TOPIC)
+
         # Worker thread relate, used to process data pushed from server
         self.__active: bool = False                 # RpcClient status
         self.__thread: threading.Thread = None      # RpcClient thread
@@ -239,16 +451,19 @@ class RpcClient:
             req = [name, args, kwargs]
 
             # Send request and wait for response
-            with self.__lock:
-                self.__socket_req.send_pyobj(req)
-                
-                # Timeout reached without any data
-                n = self.__socket_req.poll(timeout)
-                if not n:
-                    msg = f"Timeout of {timeout}ms reached for {req}"
-                    raise RemoteException(msg)
-                
-                rep = self.__socket_req.recv_pyobj()
+            if self.__mode == FAST_MODE:
+                rep = self.call_sync(req, timeout)
+            else:
+                with self.__lock:
+                    self.__socket_req.send_pyobj(req)
+
+                    # Timeout reached without any data
+                    n = self.__socket_req.poll(timeout)
+                    if not n:
+                        msg = f"Timeout of {timeout}ms reached for {req}"
+                        raise RemoteException(msg)
+
+                    rep = self.__socket_req.recv_pyobj()
 
             # Return response if successed; Trigger exception if failed
             if rep[0]:
@@ -258,6 +473,76 @@ class RpcClient:
 
         return dorpc
 
+    def call_sync(self, req: list, timeout: int) -> list:
+        """
+        Send request with dealer socket of current thread and wait for
+        reply, so that calls from different threads won't block each other.
+        """
+        # Zmq socket can only be used in one thread
+        socket = getattr(self.__local, "socket_dealer", None)
+        if not socket:
+            socket = self.create_thread_socket(zmq.DEALER)
+            for key, value in self.__socket_options.items():
+                setattr(socket, key, value)
+            socket.connect(self.__req_address)
+            self.__local.socket_dealer = socket
+
+        reqid = str(next(self.__request_count)).encode()
+        socket.send_multipart([b"", reqid, codec.encode(req)])
+
+        while True:
+            # Timeout reached without any data
+            n = socket.poll(timeout)
+            if not n:
+                msg = f"Timeout of {timeout}ms reached for {req}"
+                raise RemoteException(msg)
+
+            # Discard reply of previous call which is timed out
+            _, rep_id, rep = socket.recv_multipart()
+            if rep_id == reqid:
+                return codec.decode(rep)
+
+    def call_async(self, name: str, *args, **kwargs) -> RpcFuture:
+        """
+        Send remote call without waiting for reply (fast mode only),
+        calls are passed to server by worker thread.
+        """
+        reqid = str(next(self.__request_count)).encode()
+
+        future = RpcFuture(reqid, [name, args, kwargs], self.__futures)
+        self.__futures[reqid] = future
+
+        socket = getattr(self.__local, "socket_push", None)
+        if not socket:
+            socket = self.create_thread_socket(zmq.PUSH)
+            socket.connect(self.__pull_address)
+            self.__local.socket_push = socket
+
+        socket.send_multipart([reqid, codec.encode(future.req)])
+        return future
+
+    def create_thread_socket(self, socket_type: int) -> zmq.Socket:
+        """
+        Create socket used by current thread only, which is closed when
+        client is stopped.
+        """
+        socket = self.__context.socket(socket_type)
+
+        with self.__lock:
+            self.__thread_sockets.append(socket)
+
+        return socket
+
+    def cancel_futures(self, msg: str) -> None:
+        """
+        Set all futures waiting for reply as failed, since their requests
+        or replies are lost.
+        """
+        for reqid in list(self.__futures.keys()):
+            future = self.__futures.pop(reqid, None)
+            if future:
+                future.set_reply([False, msg])
+
     def start(
         self, 
         req_address: str, 
@@ -285,13 +570,11 @@ class RpcClient:
             publickey, secretkey = zmq.auth.load_certificate(client_secretkey_path)
             serverkey, _ = zmq.auth.load_certificate(server_publickey_path)
             
-            self.__socket_sub.curve_secretkey = secretkey
-            self.__socket_sub.curve_publickey = publickey
-            self.__socket_sub.curve_serverkey = serverkey
-
-            self.__socket_req.curve_secretkey = secretkey
-            self.__socket_req.curve_publickey = publickey
-            self.__socket_req.curve_serverkey = serverkey
+            self.__socket_options = {
+                "curve_secretkey": secretkey,
+                "curve_publickey": publickey,
+                "curve_serverkey": serverkey
+            }
         elif username and password:
             self.__authenticator = ThreadAuthenticator(self.__context)
             self.__authenticator.start()
@@ -300,13 +583,17 @@ class RpcClient:
                 passwords={username: password}
             )
 
-            self.__socket_sub.plain_username = username.encode()
-            self.__socket_sub.plain_password = password.encode()
-            
-            self.__socket_req.plain_username = username.encode()
-            self.__socket_req.plain_password = password.encode()
-            
+            self.__socket_options = {
+                "plain_username": username.encode(),
+                "plain_password": password.encode()
+            }
+
+        for key, value in self.__socket_options.items():
+            setattr(self.__socket_sub, key, value)
+            setattr(self.__socket_req, key, value)
+
         # Connect zmq port
+        self.__req_address = req_address
         self.__socket_req.connect(req_address)
         self.__socket_sub.connect(sub_address)
 
@@ -339,6 +626,10 @@ class RpcClient:
         """
         Run RpcClient function
         """
+        if self.__mode == FAST_MODE:
+            self.run_fast()
+            return
+
         pull_tolerance = int(KEEP_ALIVE_TOLERANCE.total_seconds() * 1000)
 
         while self.__active:
@@ -347,7 +638,9 @@ class RpcClient:
                 continue
 
             # Receive data from subscribe socket
-            topic, data = self.__socket_sub.recv_pyobj(flags=NOBLOCK)
+            topic, buf = self.__socket_sub.recv_multipart(flags=NOBLOCK)
+            topic = topic.decode()
+            data = pickle.loads(buf)
 
             if topic == KEEP_ALIVE_TOPIC:
                 self._last_received_ping = data
@@ -362,6 +655,94 @@ class RpcClient:
         if self.__authenticator:
             self.__authenticator.stop()
 
+    def run_fast(self) -> None:
+        """
+        Run RpcClient function in fast mode
+        """
+        poller = zmq.Poller()
+        poller.register(self.__socket_sub, zmq.POLLIN)
+        poller.register(self.__socket_req, zmq.POLLIN)
+        poller.register(self.__socket_pull, zmq.POLLIN)
+
+        last_received = datetime.utcnow()
+
+        while self.__active:
+            events = dict(poller.poll(1000))
+
+            # Forward calls to server
+            if self.__socket_pull in events:
+                self.process_calls()
+
+            # Set reply to call sent
+            if self.__socket_req in events:
+                self.process_replies()
+
+            # Receive data from subscribe socket
+            if self.__socket_sub in events:
+                self.process_subscribed()
+                last_received = datetime.utcnow()
+            elif datetime.utcnow() - last_received > KEEP_ALIVE_TOLERANCE:
+                self.cancel_futures("Connection to RpcServer is lost")
+                self.on_disconnected()
+                last_received = datetime.utcnow()
+
+        self.cancel_futures("RpcClient is stopped")
+
+        # Close socket
+        self.__socket_req.close()
+        self.__socket_sub.close()
+        self.__socket_pull.close()
+
+        with self.__lock:
+            for socket in self.__thread_sockets:
+                socket.close(linger=0)
+            self.__thread_sockets.clear()
+
+        if self.__authenticator:
+            self.__authenticator.stop()
+
+    def process_calls(self) -> None:
+        """"""
+        while True:
+            try:
+                reqid, req = self.__socket_pull.recv_multipart(flags=NOBLOCK)
+            except zmq.Again:
+                break
+
+            self.__socket_req.send_multipart([b"", reqid, req])
+
+    def process_replies(self) -> None:
+        """"""
+        while True:
+            try:
+                _, reqid, rep = self.__socket_req.recv_multipart(flags=NOBLOCK)
+            except zmq.Again:
+                break
+
+            future = self.__futures.pop(reqid, None)
+            if future:
+                future.set_reply(codec.decode(rep))
+
+    def process_subscribed(self) -> None:
+        """"""
+        while True:
+            try:
+                frames = self.__socket_sub.recv_multipart(flags=NOBLOCK)
+            except zmq.Again:
+                break
+
+            topic = frames[0].decode()
+            if len(frames) == 3:
+                batch = codec.decode(frames[1])
+            else:
+                batch = [codec.decode(frames[1])]
+
+            if topic == KEEP_ALIVE_TOPIC:
+                self._last_received_ping = batch[-1]
+            else:
+                for data in batch:
+                    self.callback(topic, data)
+
     def callback(self, topic: str, data: Any) -> None:
         """
         Callable function
@@ -370,7 +751,7 @@ class RpcClient:
 
     def subscribe_topic(self, topic: str) -> None:
         """
-        Subscribe data
+        Subscribe data of topics starting with topic string
         """
         self.__socket_sub.setsockopt_string(zmq.SUBSCRIBE, topic)
 
@@ -0,0 +1,230 @@
+"""
+Compact serialization of vnpy objects used by the fast RPC transport.
+
+Data objects are encoded as tuples of attribute values in a fixed
+order instead of pickled dicts, enums as their values and pytz-aware
+datetimes as naive time with zone name. The result is then pickled,
+so any other Python object can still be transferred.
+
+Only attributes in __slots__ of slotted data objects are transferred.
+"""
+
+import pickle
+from dataclasses import fields, is_dataclass
+from datetime import datetime
+from enum import Enum
+from operator import attrgetter
+from typing import Any, Dict, List, Tuple
+
+from pytz import timezone
+
+from vnpy.event import Event
+from vnpy.trader import object as trader_object
+
+
+# Tags of encoded values, other values are kept as is
+OBJECT_TAG = 0
+EVENT_TAG = 1
+LIST_TAG = 2
+TUPLE_TAG = 3
+DICT_TAG = 4
+
+
+class ObjectSchema:
+    """
+    Attribute layout of a dataclass, including attributes created
+    in __post_init__.
+    """
+
+    def __init__(self, cls: type):
+        """"""
+        self.cls: type = cls
+        self.name: str = cls.__name__
+
+        # Create a sample object to find out attributes and their types
+        sample = cls.__new__(cls)
+        for field in fields(cls):
+            setattr(sample, field.name, get_sample_value(field.type))
+
+        if hasattr(sample, "__post_init__"):
+            sample.__post_init__()
+
+        self.slotted: bool = "__slots__" in cls.__dict__
+
+        if self.slotted:
+            self.keys: Tuple[str, ...] = tuple(cls.__slots__)
+            self.getter: attrgetter = attrgetter(*self.keys)
+            self.setters: list = [getattr(cls, key).__set__ for key in self.keys]
+        else:
+            self.keys: Tuple[str, ...] = tuple(sample.__dict__.keys())
+
+        self.key_set: set = set(self.keys)
+
+        self.enum_ixs: List[Tuple[int, type]] = []
+        self.datetime_ixs: List[int] = []
+
+        for ix, key in enumerate(self.keys):
+            value = getattr(sample, key)
+            if isinstance(value, Enum):
+                self.enum_ixs.append((ix, type(value)))
+            elif isinstance(value, datetime):
+                self.datetime_ixs.append(ix)
+
+    def encode(self, obj: Any) -> tuple:
+        """
+        Encode object into tuple, returns None if object has attributes
+        not in schema.
+        """
+        if self.slotted:
+            values = list(self.getter(obj))
+        else:
+            d = obj.__dict__
+            if d.keys() != self.key_set:
+                return None
+
+            values = list(map(d.__getitem__, self.keys))
+
+        for ix, _ in self.enum_ixs:
+            value = values[ix]
+            if isinstance(value, Enum):
+                values[ix] = value.value
+
+        for ix in self.datetime_ixs:
+            value = values[ix]
+            if value is not None and hasattr(value.tzinfo, "zone"):
+                values[ix] = (value.replace(tzinfo=None), value.tzinfo.zone)
+
+        return (OBJECT_TAG, self.name, values)
+
+    def decode(self, values: list) -> Any:
+        """
+        Create object from encoded values.
+        """
+        for ix, enum_type in self.enum_ixs:
+            value = values[ix]
+            if value is not None:
+                values[ix] = enum_type._value2member_map_.get(value, value)
+
+        for ix in self.datetime_ixs:
+            value = values[ix]
+            if type(value) is tuple:
+                dt, zone = value
+                values[ix] = get_timezone(zone).localize(dt)
+
+        obj = self.cls.__new__(self.cls)
+
+        if self.slotted:
+            for setter, value in zip(self.setters, values):
+                setter(obj, value)
+        else:
+            obj.__dict__.update(zip(self.keys, values))
+
+        return obj
+
+
+def get_sample_value(type_: type) -> Any:
+    """
+    Get a placeholder value of field type for creating sample object.
+    """
+    if isinstance(type_, type):
+        if issubclass(type_, Enum):
+            return next(iter(type_))
+        elif issubclass(type_, datetime):
+            return datetime(2000, 1, 1)
+
+        try:
+            return type_()
+        except Exception:
+            pass
+
+    return None
+
+
+timezones: Dict[str, Any] = {}
+
+
+def get_timezone(zone: str) -> Any:
+    """"""
+    tz = timezones.get(zone, None)
+    if not tz:
+        tz = timezone(zone)
+        timezones[zone] = tz
+    return tz
+
+
+schemas: Dict[type, ObjectSchema] = {}
+schema_names: Dict[str, ObjectSchema] = {}
+
+
+def register_schema(cls: type) -> None:
+    """
+    Register a dataclass to be encoded by attribute layout.
+    """
+    schema = ObjectSchema(cls)
+    schemas[cls] = schema
+    schema_names[schema.name] = schema
+
+
+def pack(obj: Any) -> Any:
+    """
+    Convert object into structure of tagged tuples and builtin values.
+    """
+    t = type(obj)
+
+    schema = schemas.get(t, None)
+    if schema:
+        data = schema.encode(obj)
+        if data:
+            return data
+        return obj
+    elif t is Event:
+        return (EVENT_TAG, obj.type, pack(obj.data))
+    elif t is list:
+        return (LIST_TAG, [pack(v) for v in obj])
+    elif t is tuple:
+        return (TUPLE_TAG, [pack(v) for v in obj])
+    elif t is dict:
+        return (DICT_TAG, {k: pack(v) for k, v in obj.items()})
+    else:
+        return obj
+
+
+def unpack(data: Any) -> Any:
+    """
+    Restore object from packed structure.
+    """
+    if type(data) is not tuple:
+        return data
+
+    tag = data[0]
+
+    if tag == OBJECT_TAG:
+        return schema_names[data[1]].decode(data[2])
+    elif tag == EVENT_TAG:
+        return Event(data[1], unpack(data[2]))
+    elif tag == LIST_TAG:
+        return [unpack(v) for v in data[1]]
+    elif tag == TUPLE_TAG:
+        return tuple([unpack(v) for v in data[1]])
+    else:
+        return {k: unpack(v) for k, v in data[1].items()}
+
+
+def encode(obj: Any) -> bytes:
+    """
+    Serialize object into bytes.
+    """
+    return pickle.dumps(pack(obj), pickle.HIGHEST_PROTOCOL)
+
+
+def decode(buf: bytes) -> Any:
+    """
+    Deserialize object from bytes.
+    """
+    return unpack(pickle.loads(buf))
+
+
+# Register all data and request classes of trader
+for value in list(vars(trader_object).values()):
+    if isinstance(value, type) and is_dataclass(value):
+        register_schema(value)
@@ -0,0 +1,113 @@
+"""
+Queues of data waiting to be published by RpcServer.
+"""
+
+from collections import deque
+from threading import Condition
+from time import perf_counter
+from typing import Any, Dict, List, Sequence, Tuple
+
+
+class PublishQueue:
+    """
+    Data is published in the same order as put into queue. If maxlen
+    is set, the oldest data is dropped when queue is full, so that a
+    slow publisher never blocks the caller thread.
+    """
+
+    def __init__(self, maxlen: int = 0):
+        """"""
+        self.queue: deque = deque(maxlen=maxlen or None)
+        self.condition: Condition = Condition()
+
+    def put(self, topic: str, data: Any) -> None:
+        """
+        Put data into queue.
+        """
+        with self.condition:
+            self.queue.append((topic, data))
+            self.condition.notify()
+
+    def get(self, timeout: float) -> List[Tuple[str, Any]]:
+        """
+        Get all data ready to be published, wait for at most timeout
+        seconds if there is none.
+        """
+        with self.condition:
+            items = self.pop_items()
+
+            if not items:
+                self.condition.wait(self.get_wait_time(timeout))
+                items = self.pop_items()
+
+        return items
+
+    def pop_items(self) -> List[Tuple[str, Any]]:
+        """
+        Remove data ready to be published from queue, should be called
+        with condition locked.
+        """
+        items = list(self.queue)
+        self.queue.clear()
+        return items
+
+    def get_wait_time(self, timeout: float) -> float:
+        """"""
+        return timeout
+
+
+class ConflatedQueue(PublishQueue):
+    """
+    Only the latest data of each topic is kept and published at most
+    once every interval (in seconds). Topics not starting with any of
+    the prefixes are published one by one as PublishQueue.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        prefixes: Sequence[str] = ("",),
+        maxlen: int = 0
+    ):
+        """"""
+        super().__init__(maxlen)
+
+        self.interval: float = interval
+        self.prefixes: Tuple[str, ...] = tuple(prefixes)
+
+        self.latest: Dict[str, Any] = {}
+        self.sent_times: Dict[str, float] = {}
+
+    def put(self, topic: str, data: Any) -> None:
+        """"""
+        if not topic.startswith(self.prefixes):
+            super().put(topic, data)
+            return
+
+        with self.condition:
+            self.latest[topic] = data
+            self.condition.notify()
+
+    def pop_items(self) -> List[Tuple[str, Any]]:
+        """"""
+        items = super().pop_items()
+
+        now = perf_counter()
+        for topic, data in list(self.latest.items()):
+            if now - self.sent_times.get(topic, 0) >= self.interval:
+                items.append((topic, data))
+                self.sent_times[topic] = now
+                self.latest.pop(topic)
+
+        return items
+
+    def get_wait_time(self, timeout: float) -> float:
+        """
+        Wake up when the earliest conflated data can be published.
+        """
+        if not self.latest:
+            return timeout
+
+        now = perf_counter()
+        sent_time = min(self.sent_times.get(topic, 0) for topic in self.latest)
+        return max(min(sent_time + self.interval - now, timeout), 0)
@@ -0,0 +1,340 @@
+"""
+Local cache of history data stored as columnar day partitions on disk.
+"""
+
+import os
+import shutil
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+from .constant import Exchange, Interval
+from .columnar import BAR_DTYPE, TICK_DTYPE, HistoryArray, to_structured_array
+from .database import BaseDatabase, BarOverview, DB_TZ, CHUNK_SIZE, convert_tz
+from .object import BarData, TickData
+from .utility import get_folder_path
+
+
+# Folder name of tick data partitions, in place of interval
+TICK_FOLDER = "tick"
+
+
+class CachedDatabase(BaseDatabase):
+    """
+    Database wrapper keeping history data loaded from database in local
+    files, one numpy structured array of each symbol + interval + day.
+
+    Data of a day is loaded from database at the first query, and then
+    memory-mapped from file afterwards. Only days before today are cached
+    since data of today may be still growing.
+
+    Cache of a day is removed when data of that day is saved, and cache
+    of a symbol is removed when its data is deleted. Data written by
+    other processes into database is not noticed, so cache folder should
+    be cleared after updating database from elsewhere.
+    """
+
+    def __init__(self, database: BaseDatabase, folder: Union[str, Path] = None):
+        """"""
+        self.database: BaseDatabase = database
+
+        if folder:
+            self.folder: Path = Path(folder)
+        else:
+            self.folder: Path = get_folder_path("history_cache")
+
+    def __getattr__(self, name: str) -> Any:
+        """
+        Forward other attributes (e.g. db connection) to database.
+        """
+        if name == "database":
+            raise AttributeError(name)
+        return getattr(self.database, name)
+
+    def save_bar_data(self, bars: List[BarData]) -> bool:
+        """"""
+        result = self.database.save_bar_data(bars)
+
+        keys: Set[Tuple[str, Exchange, Interval]] = {
+            (bar.symbol, bar.exchange, bar.interval) for bar in bars
+        }
+        for symbol, exchange, interval in keys:
+            days = {
+                convert_tz(bar.datetime).date() for bar in bars
+                if bar.symbol == symbol and bar.exchange == exchange and bar.interval == interval
+            }
+            self.clear_days(self.get_bar_folder(symbol, exchange, interval), days)
+
+        return result
+
+    def save_tick_data(self, ticks: List[TickData]) -> bool:
+        """"""
+        result = self.database.save_tick_data(ticks)
+
+        keys: Set[Tuple[str, Exchange]] = {(tick.symbol, tick.exchange) for tick in ticks}
+        for symbol, exchange in keys:
+            days = {
+                convert_tz(tick.datetime).date() for tick in ticks
+                if tick.symbol == symbol and tick.exchange == exchange
+            }
+            self.clear_days(self.get_tick_folder(symbol, exchange), days)
+
+        return result
+
+    def load_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime
+    ) -> List[BarData]:
+        """"""
+        return list(self.load_bar_array(symbol, exchange, interval, start, end))
+
+    def load_tick_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime
+    ) -> List[TickData]:
+        """"""
+        return list(self.load_tick_array(symbol, exchange, start, end))
+
+    def iter_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[List[BarData]]:
+        """"""
+        history = self.load_bar_array(symbol, exchange, interval, start, end)
+
+        for i in range(0, len(history), chunk_size):
+            yield list(history[i:i + chunk_size])
+
+    def iter_tick_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[List[TickData]]:
+        """"""
+        history = self.load_tick_array(symbol, exchange, start, end)
+
+        for i in range(0, len(history), chunk_size):
+            yield list(history[i:i + chunk_size])
+
+    def load_bar_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime
+    ) -> HistoryArray:
+        """
+        Load bar data from cache files, days not cached yet are loaded
+        from database and saved into cache.
+        """
+        def query(start: datetime, end: datetime) -> Iterator[List[BarData]]:
+            return self.database.iter_bar_data(symbol, exchange, interval, start, end)
+
+        array = self.load_array(
+            self.get_bar_folder(symbol, exchange, interval),
+            start,
+            end,
+            False,
+            query
+        )
+
+        return HistoryArray(array, symbol, exchange, interval, DB_TZ)
+
+    def load_tick_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime
+    ) -> HistoryArray:
+        """
+        Load tick data from cache files, days not cached yet are loaded
+        from database and saved into cache.
+        """
+        def query(start: datetime, end: datetime) -> Iterator[List[TickData]]:
+            return self.database.iter_tick_data(symbol, exchange, start, end)
+
+        array = self.load_array(
+            self.get_tick_folder(symbol, exchange),
+            start,
+            end,
+            True,
+            query
+        )
+
+        return HistoryArray(array, symbol, exchange, None, DB_TZ)
+
+    def delete_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval
+    ) -> int:
+        """"""
+        count = self.database.delete_bar_data(symbol, exchange, interval)
+        shutil.rmtree(self.get_bar_folder(symbol, exchange, interval), ignore_errors=True)
+        return count
+
+    def delete_tick_data(
+        self,
+        symbol: str,
+        exchange: Exchange
+    ) -> int:
+        """"""
+        count = self.database.delete_tick_data(symbol, exchange)
+        shutil.rmtree(self.get_tick_folder(symbol, exchange), ignore_errors=True)
+        return count
+
+    def get_bar_overview(self) -> List[BarOverview]:
+        """"""
+        return self.database.get_bar_overview()
+
+    def rebuild_bar_overview(self) -> None:
+        """"""
+        self.database.rebuild_bar_overview()
+
+    def clear(self) -> None:
+        """
+        Remove all cache files.
+        """
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def get_bar_folder(self, symbol: str, exchange: Exchange, interval: Interval) -> Path:
+        """"""
+        return self.folder.joinpath(exchange.value, symbol, interval.value)
+
+    def get_tick_folder(self, symbol: str, exchange: Exchange) -> Path:
+        """"""
+        return self.folder.joinpath(exchange.value, symbol, TICK_FOLDER)
+
+    def clear_days(self, folder: Path, days: Set[date]) -> None:
+        """
+        Remove cache files of days.
+        """
+        for day in days:
+            path = get_day_path(folder, day)
+            if path.exists():
+                path.unlink()
+
+    def load_array(
+        self,
+        folder: Path,
+        start: datetime,
+        end: datetime,
+        is_tick: bool,
+        query: Callable[[datetime, datetime], Iterator[Sequence[Union[BarData, TickData]]]]
+    ) -> np.ndarray:
+        """
+        Load data between start and end into one structured array.
+        """
+        start = to_db_datetime(start)
+        end = to_db_datetime(end)
+        today = datetime.now(DB_TZ).date()
+
+        arrays: List[np.ndarray] = []
+        missing_days: List[date] = []
+
+        day = start.date()
+        while day <= end.date():
+            path = get_day_path(folder, day)
+
+            if day < today and path.exists():
+                if missing_days:
+                    arrays.append(self.fill_days(folder, missing_days, is_tick, query))
+                    missing_days = []
+
+                arrays.append(np.load(path, mmap_mode="r"))
+            else:
+                missing_days.append(day)
+
+            day += timedelta(days=1)
+
+        if missing_days:
+            arrays.append(self.fill_days(folder, missing_days, is_tick, query))
+
+        if arrays:
+            array = np.concatenate(arrays)
+        else:
+            array = np.empty(0, dtype=TICK_DTYPE if is_tick else BAR_DTYPE)
+
+        # Select data between start and end, both inclusive
+        dts = array["datetime"]
+        ix_start = np.searchsorted(dts, np.datetime64(start), side="left")
+        ix_end = np.searchsorted(dts, np.datetime64(end), side="right")
+        return array[ix_start:ix_end]
+
+    def fill_days(
+        self,
+        folder: Path,
+        days: List[date],
+        is_tick: bool,
+        query: Callable[[datetime, datetime], Iterator[Sequence[Union[BarData, TickData]]]]
+    ) -> np.ndarray:
+        """
+        Load data of continuous days from database with one query, and
+        save data of each finished day into cache file.
+        """
+        start = datetime.combine(days[0], time())
+        end = datetime.combine(days[-1] + timedelta(days=1), time()) - timedelta(microseconds=1)
+
+        arrays = [to_structured_array(data, is_tick) for data in query(start, end)]
+        if arrays:
+            array = np.concatenate(arrays)
+        else:
+            array = np.empty(0, dtype=TICK_DTYPE if is_tick else BAR_DTYPE)
+
+        today = datetime.now(DB_TZ).date()
+        folder.mkdir(parents=True, exist_ok=True)
+
+        dts = array["datetime"]
+        for day in days:
+            if day >= today:
+                break
+
+            ix_start, ix_end = np.searchsorted(
+                dts,
+                [np.datetime64(day), np.datetime64(day + timedelta(days=1))]
+            )
+
+            # Write into temp file first, so that reader never sees
+            # a partially written file.
+            path = get_day_path(folder, day)
+            temp_path = path.with_suffix(".tmp")
+            with open(temp_path, "wb") as f:
+                np.save(f, array[ix_start:ix_end])
+            os.replace(temp_path, path)
+
+        return array
+
+
+def get_day_path(folder: Path, day: date) -> Path:
+    """"""
+    return folder.joinpath(f"{day:%Y%m%d}.npy")
+
+
+def to_db_datetime(dt: datetime) -> datetime:
+    """
+    Convert datetime into naive datetime of DB_TZ, naive datetime is
+    treated as DB_TZ already.
+    """
+    if dt.tzinfo:
+        return convert_tz(dt)
+    return dt
@@ -0,0 +1,321 @@
+"""
+Columnar storage of bar and tick history data based on numpy structured array.
+"""
+
+import json
+from datetime import datetime, tzinfo
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+from pytz import FixedOffset, timezone
+
+from .constant import Exchange, Interval
+from .object import BarData, TickData
+
+
+BAR_FIELDS: List[str] = [
+    "volume",
+    "open_interest",
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+]
+
+TICK_FIELDS: List[str] = [
+    "volume",
+    "open_interest",
+    "last_price",
+    "last_volume",
+    "limit_up",
+    "limit_down",
+    "open_price",
+    "high_price",
+    "low_price",
+    "pre_close",
+]
+for n in range(1, 6):
+    TICK_FIELDS.extend([
+        f"bid_price_{n}",
+        f"ask_price_{n}",
+        f"bid_volume_{n}",
+        f"ask_volume_{n}",
+    ])
+
+# Datetime is stored as naive wall clock time of the data timezone.
+BAR_DTYPE: np.dtype = np.dtype(
+    [("datetime", "datetime64[us]")] + [(name, "f8") for name in BAR_FIELDS]
+)
+TICK_DTYPE: np.dtype = np.dtype(
+    [("datetime", "datetime64[us]")] + [(name, "f8") for name in TICK_FIELDS]
+)
+
+
+class HistoryArray:
+    """
+    Bar or tick history data stored in a structured numpy array, with
+    one column for each field.
+
+    BarData/TickData objects are only created when accessed by index
+    or iteration, so that large history data can be held with a small
+    memory footprint, or memory-mapped from a file on disk.
+    """
+
+    def __init__(
+        self,
+        array: np.ndarray,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval = None,
+        tz: tzinfo = None,
+        name: str = "",
+        gateway_name: str = "DB"
+    ):
+        """"""
+        self.array: np.ndarray = array
+        self.symbol: str = symbol
+        self.exchange: Exchange = exchange
+        self.interval: Optional[Interval] = interval
+        self.tz: Optional[tzinfo] = tz
+        self.name: str = name
+        self.gateway_name: str = gateway_name
+
+        self.is_tick: bool = array.dtype == TICK_DTYPE
+
+    def __len__(self) -> int:
+        """"""
+        return len(self.array)
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[BarData, TickData, "HistoryArray"]:
+        """
+        Return data object with integer index, or a new HistoryArray
+        sharing the same buffer with slice.
+        """
+        if isinstance(key, slice):
+            return self.new_array(self.array[key])
+
+        if self.is_tick:
+            return self.get_tick(key)
+        else:
+            return self.get_bar(key)
+
+    def __iter__(self) -> Iterator[Union[BarData, TickData]]:
+        """"""
+        for ix in range(len(self.array)):
+            yield self[ix]
+
+    def new_array(self, array: np.ndarray) -> "HistoryArray":
+        """
+        Create a new HistoryArray with the same meta data.
+        """
+        return HistoryArray(
+            array,
+            self.symbol,
+            self.exchange,
+            self.interval,
+            self.tz,
+            self.name,
+            self.gateway_name
+        )
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Get data of a field as numpy array.
+        """
+        return self.array[name]
+
+    def get_datetime(self, ix: int) -> datetime:
+        """
+        Get datetime of data at index.
+        """
+        dt = self.array["datetime"][ix].item()
+        if self.tz:
+            if hasattr(self.tz, "localize"):
+                dt = self.tz.localize(dt)
+            else:
+                dt = dt.replace(tzinfo=self.tz)
+        return dt
+
+    def get_bar(self, ix: int) -> BarData:
+        """
+        Create bar object from data at index.
+        """
+        row = self.array[ix]
+
+        bar = BarData(
+            symbol=self.symbol,
+            exchange=self.exchange,
+            datetime=self.get_datetime(ix),
+            interval=self.interval,
+            gateway_name=self.gateway_name
+        )
+        for name in BAR_FIELDS:
+            setattr(bar, name, float(row[name]))
+
+        return bar
+
+    def get_tick(self, ix: int) -> TickData:
+        """
+        Create tick object from data at index.
+        """
+        row = self.array[ix]
+
+        tick = TickData(
+            symbol=self.symbol,
+            exchange=self.exchange,
+            datetime=self.get_datetime(ix),
+            name=self.name,
+            gateway_name=self.gateway_name
+        )
+        for name in TICK_FIELDS:
+            setattr(tick, name, float(row[name]))
+
+        return tick
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Save array data into .npy file, with meta data into .json file
+        of the same name.
+        """
+        path = Path(path)
+        np.save(path.with_suffix(".npy"), self.array)
+
+        meta = {
+            "symbol": self.symbol,
+            "exchange": self.exchange.value,
+            "interval": self.interval.value if self.interval else "",
+            "tz": "",
+            "tz_offset": None,
+            "name": self.name,
+            "gateway_name": self.gateway_name
+        }
+
+        # Timezone without name (e.g. pytz FixedOffset) is saved as
+        # utc offset in minutes
+        if self.tz:
+            zone = getattr(self.tz, "zone", None) or getattr(self.tz, "key", None)
+            if zone:
+                meta["tz"] = zone
+            else:
+                offset = self.tz.utcoffset(None)
+                if offset is not None:
+                    meta["tz_offset"] = int(offset.total_seconds() // 60)
+
+        with open(path.with_suffix(".json"), mode="w", encoding="UTF-8") as f:
+            json.dump(meta, f, indent=4, ensure_ascii=False)
+
+
+def load_history_array(path: Union[str, Path], mmap: bool = True) -> HistoryArray:
+    """
+    Load HistoryArray saved in file, the array is memory-mapped
+    in read-only mode if mmap is True.
+    """
+    path = Path(path)
+
+    if mmap:
+        array = np.load(path.with_suffix(".npy"), mmap_mode="r")
+    else:
+        array = np.load(path.with_suffix(".npy"))
+
+    with open(path.with_suffix(".json"), mode="r", encoding="UTF-8") as f:
+        meta = json.load(f)
+
+    if meta["tz"]:
+        tz = timezone(meta["tz"])
+    elif meta.get("tz_offset") is not None:
+        tz = FixedOffset(meta["tz_offset"])
+    else:
+        tz = None
+
+    return HistoryArray(
+        array,
+        meta["symbol"],
+        Exchange(meta["exchange"]),
+        Interval(meta["interval"]) if meta["interval"] else None,
+        tz,
+        meta["name"],
+        meta["gateway_name"]
+    )
+
+
+def to_structured_array(data: Sequence[Union[BarData, TickData]], is_tick: bool) -> np.ndarray:
+    """
+    Convert list of bar/tick objects into structured array.
+    """
+    if is_tick:
+        dtype = TICK_DTYPE
+        fields = TICK_FIELDS
+    else:
+        dtype = BAR_DTYPE
+        fields = BAR_FIELDS
+
+    array = np.empty(len(data), dtype=dtype)
+    array["datetime"] = [d.datetime.replace(tzinfo=None) for d in data]
+
+    for name in fields:
+        # Depth fields of tick may be None if not provided.
+        array[name] = [getattr(d, name) or 0 for d in data]
+
+    return array
+
+
+def create_history_array(
+    data: Sequence[Union[BarData, TickData]],
+    symbol: str = "",
+    exchange: Exchange = None,
+    interval: Interval = None,
+    is_tick: bool = None
+) -> HistoryArray:
+    """
+    Create HistoryArray from list of bar/tick objects.
+    """
+    tz = None
+    name = ""
+    gateway_name = "DB"
+
+    if data:
+        first = data[0]
+        symbol = first.symbol
+        exchange = first.exchange
+        tz = first.datetime.tzinfo
+        gateway_name = first.gateway_name
+
+        if is_tick is None:
+            is_tick = isinstance(first, TickData)
+
+        if is_tick:
+            name = first.name
+        elif not interval:
+            interval = first.interval
+
+    array = to_structured_array(data, bool(is_tick))
+
+    return HistoryArray(
+        array,
+        symbol,
+        exchange,
+        interval,
+        tz,
+        name,
+        gateway_name
+    )
+
+
+def concat_history_arrays(arrays: Sequence[HistoryArray]) -> HistoryArray:
+    """
+    Concatenate HistoryArrays of the same contract into one.
+    """
+    first = arrays[0]
+    tz = first.tz
+
+    # Empty arrays have no timezone info
+    for history in arrays:
+        if history.tz:
+            tz = history.tz
+            break
+
+    array = np.concatenate([history.array for history in arrays])
+    history = first.new_array(array)
+    history.tz = tz
+    return history
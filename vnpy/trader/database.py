@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import List
+from typing import Iterator, List
 from pytz import timezone
 from dataclasses import dataclass
 from importlib import import_module
@@ -8,10 +8,14 @@ from importlib import import_module
 from .constant import Interval, Exchange
 from .object import BarData, TickData
 from .setting import SETTINGS
+from .columnar import HistoryArray, create_history_array, concat_history_arrays
 
 
 DB_TZ = timezone(SETTINGS["database.timezone"])
 
+# Number of rows loaded from database each time by iter functions
+CHUNK_SIZE = 10000
+
 
 def convert_tz(dt: datetime) -> datetime:
     """
@@ -81,6 +85,83 @@ class BaseDatabase(ABC):
         """
         pass
 
+    def iter_bar_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[List[BarData]]:
+        """
+        Load bar data from database in chunks sorted by datetime, so that
+        only one chunk is held in memory at a time.
+
+        Database drivers should override this function with cursor or
+        paginated query, the default one loads all data at once.
+        """
+        bars = self.load_bar_data(symbol, exchange, interval, start, end)
+
+        for i in range(0, len(bars), chunk_size):
+            yield bars[i:i + chunk_size]
+
+    def iter_tick_data(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[List[TickData]]:
+        """
+        Load tick data from database in chunks sorted by datetime.
+        """
+        ticks = self.load_tick_data(symbol, exchange, start, end)
+
+        for i in range(0, len(ticks), chunk_size):
+            yield ticks[i:i + chunk_size]
+
+    def load_bar_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        interval: Interval,
+        start: datetime,
+        end: datetime
+    ) -> HistoryArray:
+        """
+        Load bar data from database into columnar array, converted chunk
+        by chunk to avoid holding all bar objects in memory.
+        """
+        histories = [
+            create_history_array(bars, symbol, exchange, interval, False)
+            for bars in self.iter_bar_data(symbol, exchange, interval, start, end)
+        ]
+
+        if not histories:
+            return create_history_array([], symbol, exchange, interval, False)
+        return concat_history_arrays(histories)
+
+    def load_tick_array(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        start: datetime,
+        end: datetime
+    ) -> HistoryArray:
+        """
+        Load tick data from database into columnar array.
+        """
+        histories = [
+            create_history_array(ticks, symbol, exchange, None, True)
+            for ticks in self.iter_tick_data(symbol, exchange, start, end)
+        ]
+
+        if not histories:
+            return create_history_array([], symbol, exchange, None, True)
+        return concat_history_arrays(histories)
+
     @abstractmethod
     def delete_bar_data(
         self,
@@ -111,6 +192,16 @@ class BaseDatabase(ABC):
         """
         pass
 
+    def rebuild_bar_overview(self) -> None:
+        """
+        Rebuild overview of all bar data from scratch, which is needed
+        only if overview is lost or data is changed out of vn.py.
+
+        Overview is updated incrementally in save_bar_data, database
+        drivers should override this with one aggregated query.
+        """
+        pass
+
 
 driver: str = SETTINGS["database.driver"]
 module_name: str = f"vnpy.database.{driver}"
@@ -119,3 +210,8 @@ try:
 except ModuleNotFoundError:
     print(f"找不到数据库驱动{module_name}，使用默认的SQLite数据库")
     database_manager: BaseDatabase = import_module("vnpy.database.sqlite").database_manager
+
+# Local columnar cache consulted before database
+if SETTINGS["database.cache"]:
+    from .cache import CachedDatabase
+    database_manager = CachedDatabase(database_manager)
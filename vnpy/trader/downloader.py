@@ -0,0 +1,264 @@
+"""
+Download history data of many symbols into database concurrently.
+"""
+
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Callable, Dict, List, Optional
+
+from .constant import Interval
+from .database import DB_TZ, database_manager
+from .engine import MainEngine
+from .object import BarData, HistoryRequest, TickData
+from .rqdata import rqdata_client
+
+
+# Length of date window queried by each request
+WINDOW_DAYS: Dict[Interval, int] = {
+    Interval.TICK: 1,
+    Interval.MINUTE: 30,
+    Interval.HOUR: 180,
+    Interval.DAILY: 3650,
+    Interval.WEEKLY: 3650,
+}
+
+
+@dataclass
+class DownloadProgress:
+    """
+    Progress of download, passed to callback every time data of a
+    window is saved into database.
+    """
+
+    total: int = 0
+    finished: int = 0
+    failed: int = 0
+    count: int = 0
+    cost: float = 0
+
+    @property
+    def rate(self) -> float:
+        """Number of bars/ticks downloaded per second"""
+        if not self.cost:
+            return 0
+        return self.count / self.cost
+
+
+# Return False in callback to cancel windows not started yet
+CallbackType = Callable[[DownloadProgress], Optional[bool]]
+
+
+class HistoryDownloader:
+    """
+    Split history requests into date windows and query them with a
+    pool of worker threads, from gateway if history data is provided
+    or otherwise from RQData.
+
+    Data of each window is saved into database in caller thread as soon
+    as it arrives, so that database is only written by one thread and
+    memory usage is bounded by window size.
+    """
+
+    def __init__(
+        self,
+        main_engine: MainEngine,
+        max_workers: int = 4,
+        write_log: Callable[[str], None] = None
+    ):
+        """
+        :param write_log: function for logging failed windows, log is
+            written into main engine if not given.
+        """
+        self.main_engine: MainEngine = main_engine
+        self.max_workers: int = max_workers
+
+        if write_log:
+            self.write_log = write_log
+
+    def download_bar_data(
+        self,
+        reqs: List[HistoryRequest],
+        callback: CallbackType = None
+    ) -> DownloadProgress:
+        """
+        Download bar data of all requests.
+        """
+        windows = []
+        for req in reqs:
+            rqdata = not self.get_history_gateway(req)
+            windows.extend(split_request(req, rqdata))
+
+            # RQData is initialized before querying in worker threads
+            if rqdata and not rqdata_client.inited:
+                rqdata_client.init()
+
+        return self.download(windows, self.query_bar_data, database_manager.save_bar_data, callback)
+
+    def download_tick_data(
+        self,
+        reqs: List[HistoryRequest],
+        callback: CallbackType = None
+    ) -> DownloadProgress:
+        """
+        Download tick data of all requests from RQData.
+        """
+        if not rqdata_client.inited:
+            rqdata_client.init()
+
+        windows = []
+        for req in reqs:
+            windows.extend(split_request(req, True))
+
+        return self.download(windows, self.query_tick_data, database_manager.save_tick_data, callback)
+
+    def update_bar_data(self, callback: CallbackType = None) -> DownloadProgress:
+        """
+        Download bar data after the end of all data in database.
+        """
+        end = datetime.now(DB_TZ)
+        reqs = []
+
+        for overview in database_manager.get_bar_overview():
+            req = HistoryRequest(
+                symbol=overview.symbol,
+                exchange=overview.exchange,
+                interval=overview.interval,
+                start=overview.end,
+                end=end
+            )
+            reqs.append(req)
+
+        return self.download_bar_data(reqs, callback)
+
+    def download(
+        self,
+        windows: List[HistoryRequest],
+        query: Callable[[HistoryRequest], Optional[list]],
+        save: Callable[[list], bool],
+        callback: CallbackType
+    ) -> DownloadProgress:
+        """"""
+        progress = DownloadProgress(total=len(windows))
+        start = perf_counter()
+
+        with ThreadPoolExecutor(self.max_workers) as executor:
+            futures: Dict[Future, HistoryRequest] = {
+                executor.submit(query, window): window for window in windows
+            }
+
+            for future in as_completed(futures):
+                window = futures[future]
+
+                try:
+                    data = future.result()
+                except Exception:
+                    data = None
+                    progress.failed += 1
+
+                    self.write_log(
+                        f"{window.vt_symbol}历史数据下载失败，"
+                        f"起始时间{window.start}，触发异常：\n"
+                        f"{traceback.format_exc()}"
+                    )
+
+                if data:
+                    try:
+                        save(data)
+                        progress.count += len(data)
+                    except Exception:
+                        progress.failed += 1
+
+                        self.write_log(
+                            f"{window.vt_symbol}历史数据保存失败，"
+                            f"起始时间{window.start}，触发异常：\n"
+                            f"{traceback.format_exc()}"
+                        )
+
+                progress.finished += 1
+                progress.cost = perf_counter() - start
+
+                if callback and callback(progress) is False:
+                    for pending in futures:
+                        pending.cancel()
+                    break
+
+        progress.cost = perf_counter() - start
+        return progress
+
+    def write_log(self, msg: str) -> None:
+        """"""
+        self.main_engine.write_log(msg, "HistoryDownloader")
+
+    def get_history_gateway(self, req: HistoryRequest) -> str:
+        """
+        Get name of gateway providing history data of request symbol.
+        """
+        contract = self.main_engine.get_contract(req.vt_symbol)
+        if contract and contract.history_data:
+            return contract.gateway_name
+        return ""
+
+    def query_bar_data(self, req: HistoryRequest) -> Optional[List[BarData]]:
+        """"""
+        gateway_name = self.get_history_gateway(req)
+
+        if gateway_name:
+            return self.main_engine.query_history(req, gateway_name)
+        else:
+            return rqdata_client.query_history(req, extend_end=False)
+
+    def query_tick_data(self, req: HistoryRequest) -> Optional[List[TickData]]:
+        """"""
+        return rqdata_client.query_tick_history(req, extend_end=False)
+
+
+def split_request(req: HistoryRequest, rqdata: bool = False) -> List[HistoryRequest]:
+    """
+    Split history request into requests of date windows, which are
+    aligned to day boundary and not overlapping with each other.
+
+    If rqdata is True, windows are queried by RQData without extending
+    end, since RQData queries by trading date and night trading data
+    after end date belongs to the trading date of next window. So end of
+    the last window is extended by one day explicitly instead.
+    """
+    start = req.start
+    end = req.end or datetime.now(DB_TZ)
+
+    # Make sure start and end can be compared
+    if start.tzinfo and not end.tzinfo:
+        end = DB_TZ.localize(end)
+    elif end.tzinfo and not start.tzinfo:
+        start = DB_TZ.localize(start)
+
+    # Request of tick data has no interval
+    interval = req.interval or Interval.TICK
+    window = timedelta(days=WINDOW_DAYS.get(interval, 30))
+    reqs = []
+
+    while start < end:
+        day_start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        next_start = day_start + window
+
+        if next_start < end:
+            window_end = next_start - timedelta(microseconds=1)
+        elif rqdata:
+            window_end = end + timedelta(days=1)
+        else:
+            window_end = end
+
+        window_req = HistoryRequest(
+            symbol=req.symbol,
+            exchange=req.exchange,
+            interval=req.interval,
+            start=start,
+            end=window_end
+        )
+        reqs.append(window_req)
+
+        start = next_start
+
+    return reqs
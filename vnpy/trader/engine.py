@@ -217,6 +217,37 @@ class MainEngine:
         else:
             return None
 
+    def start_event_profile(self, dump_interval: int = 0) -> None:
+        """
+        Start recording latency of event handlers.
+
+        If dump_interval is specified, profile data will also be written
+        into csv file under log folder every dump_interval seconds.
+        """
+        profiler = self.event_engine.start_profile()
+
+        if dump_interval:
+            today_date = datetime.now().strftime("%Y%m%d")
+            filename = f"event_profile_{today_date}.csv"
+            file_path = get_folder_path("log").joinpath(filename)
+            profiler.set_dump(str(file_path), dump_interval)
+
+    def stop_event_profile(self) -> None:
+        """
+        Stop recording latency of event handlers.
+        """
+        self.event_engine.stop_profile()
+
+    def get_event_profile(self) -> List[dict]:
+        """
+        Get call count and latency (in milliseconds) of every event handler.
+        """
+        profiler = self.event_engine.get_profiler()
+        if profiler:
+            return profiler.get_stats()
+        else:
+            return []
+
     def close(self) -> None:
         """
         Make sure every gateway and app is closed properly before
@@ -346,6 +377,11 @@ class OmsEngine(BaseEngine):
 
         self.active_orders: Dict[str, OrderData] = {}
 
+        # Secondary indexes of active orders, updated with active_orders
+        self.symbol_active_orders: Dict[str, Dict[str, OrderData]] = {}
+        self.gateway_active_orders: Dict[str, Dict[str, OrderData]] = {}
+        self.reference_active_orders: Dict[str, Dict[str, OrderData]] = {}
+
         self.add_function()
         self.register_event()
 
@@ -364,6 +400,9 @@ class OmsEngine(BaseEngine):
         self.main_engine.get_all_accounts = self.get_all_accounts
         self.main_engine.get_all_contracts = self.get_all_contracts
         self.main_engine.get_all_active_orders = self.get_all_active_orders
+        self.main_engine.get_gateway_active_orders = self.get_gateway_active_orders
+        self.main_engine.get_reference_active_orders = self.get_reference_active_orders
+        self.main_engine.get_active_order_count = self.get_active_order_count
 
     def register_event(self) -> None:
         """"""
@@ -384,12 +423,35 @@ class OmsEngine(BaseEngine):
         order = event.data
         self.orders[order.vt_orderid] = order
 
-        # If order is active, then update data in dict.
+        # Remove old data of the order from active orders and indexes
+        if order.vt_orderid in self.active_orders:
+            self.remove_active_order(order.vt_orderid)
+
+        # If order is active, then add latest data into active orders
         if order.is_active():
-            self.active_orders[order.vt_orderid] = order
-        # Otherwise, pop inactive order from in dict
-        elif order.vt_orderid in self.active_orders:
-            self.active_orders.pop(order.vt_orderid)
+            self.add_active_order(order)
+
+    def add_active_order(self, order: OrderData) -> None:
+        """
+        Add order into active orders and indexes.
+        """
+        vt_orderid = order.vt_orderid
+        self.active_orders[vt_orderid] = order
+
+        self.symbol_active_orders.setdefault(order.vt_symbol, {})[vt_orderid] = order
+        self.gateway_active_orders.setdefault(order.gateway_name, {})[vt_orderid] = order
+        self.reference_active_orders.setdefault(order.reference, {})[vt_orderid] = order
+
+    def remove_active_order(self, vt_orderid: str) -> None:
+        """
+        Remove order from active orders and indexes, using the data
+        stored when it was added.
+        """
+        order = self.active_orders.pop(vt_orderid)
+
+        remove_index_item(self.symbol_active_orders, order.vt_symbol, vt_orderid)
+        remove_index_item(self.gateway_active_orders, order.gateway_name, vt_orderid)
+        remove_index_item(self.reference_active_orders, order.reference, vt_orderid)
 
     def process_trade_event(self, event: Event) -> None:
         """"""
@@ -492,12 +554,46 @@ class OmsEngine(BaseEngine):
         if not vt_symbol:
             return list(self.active_orders.values())
         else:
-            active_orders = [
-                order
-                for order in self.active_orders.values()
-                if order.vt_symbol == vt_symbol
-            ]
-            return active_orders
+            active_orders = self.symbol_active_orders.get(vt_symbol, {})
+            return list(active_orders.values())
+
+    def get_gateway_active_orders(self, gateway_name: str) -> List[OrderData]:
+        """
+        Get all active orders of gateway.
+        """
+        active_orders = self.gateway_active_orders.get(gateway_name, {})
+        return list(active_orders.values())
+
+    def get_reference_active_orders(self, reference: str) -> List[OrderData]:
+        """
+        Get all active orders sent with reference.
+        """
+        active_orders = self.reference_active_orders.get(reference, {})
+        return list(active_orders.values())
+
+    def get_active_order_count(self, vt_symbol: str = "") -> int:
+        """
+        Get number of active orders by vt_symbol without creating list.
+
+        If vt_symbol is empty, return number of all active orders.
+        """
+        if not vt_symbol:
+            return len(self.active_orders)
+        else:
+            return len(self.symbol_active_orders.get(vt_symbol, {}))
+
+
+def remove_index_item(index: Dict[str, Dict[str, Any]], key: str, vt_orderid: str) -> None:
+    """
+    Remove item from index, and remove the key once it becomes empty.
+    """
+    items = index.get(key, None)
+    if items is None:
+        return
+
+    items.pop(vt_orderid, None)
+    if not items:
+        index.pop(key)
 
 
 class EmailEngine(BaseEngine):
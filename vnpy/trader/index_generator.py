@@ -1,8 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import Any, Sequence, Dict, List, Optional, Callable, Set
+from typing import Any, Sequence, Dict, List, Optional, Callable, Set, Tuple
 from copy import copy
+from decimal import Decimal
+from itertools import chain
+from operator import attrgetter
 import math
 
+import numpy as np
+
 from .utility import round_to as util_round_to
 from vnpy.event import Event, EventEngine
 from .event import (
@@ -33,9 +38,45 @@ from .object import (
     BarData
 )
 
+from .columnar import BAR_DTYPE, HistoryArray
 from vnpy.gateway.tqsdk.tqsdk_gateway import INDEX_CONTRACT_TAG as TQ_INDEX_TAG
 INDEX_CONTRACT_TAG = "99"
 
+# 按持仓量加权平均的价格字段
+INDEX_PRICE_FIELDS: List[str] = [
+    "last_price",
+    "limit_up",
+    "limit_down",
+    "open_price",
+    "high_price",
+    "low_price",
+    "pre_close",
+]
+# 直接求和的成交量字段
+INDEX_VOLUME_FIELDS: List[str] = [
+    "volume",
+    "last_volume",
+]
+for n in range(1, 6):
+    INDEX_PRICE_FIELDS.extend([f"bid_price_{n}", f"ask_price_{n}"])
+    INDEX_VOLUME_FIELDS.extend([f"bid_volume_{n}", f"ask_volume_{n}"])
+
+INDEX_FIELDS: List[str] = INDEX_PRICE_FIELDS + INDEX_VOLUME_FIELDS
+PRICE_COUNT: int = len(INDEX_PRICE_FIELDS)
+get_index_values = attrgetter(*INDEX_FIELDS)
+BAR_VALUE_FIELDS: List[str] = [
+    "open_interest",
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+    "volume",
+]
+get_bar_values = attrgetter(*BAR_VALUE_FIELDS)
+
+# 增量更新累计的浮点误差，每隔一定次数全量重算一次
+RECALCULATE_COUNT = 1000
+
 
 def extract_sec_id(vt_symbol: str) -> str:
     """
@@ -60,11 +101,124 @@ def round_to(value: float, target: float) -> float:
     return util_round_to(value, target)
 
 
+def round_array_to(values: np.ndarray, target: float) -> np.ndarray:
+    """
+    Round price array to price tick value.
+    """
+    # 按最小价位变动的小数位数再取整一次，避免浮点误差
+    digits = max(-Decimal(str(target)).as_tuple().exponent, 0)
+    return np.round(np.rint(values / target) * target, digits)
+
+
+def calculate_index_values(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculate open interest weighted index bar values.
+
+    Shape of values is (contract, bar, field) with fields in BAR_VALUE_FIELDS.
+    Returns mask of bars with open interest, and index values of each bar.
+    """
+    open_interests = values[:, :, 0]
+    total_open_interest = open_interests.sum(axis=0)
+
+    # 持仓量为0的K线不合成指数
+    valid = total_open_interest != 0
+    weights = np.divide(
+        open_interests,
+        total_open_interest,
+        out=np.zeros_like(open_interests),
+        where=valid
+    )
+
+    index_values = np.empty(values.shape[1:])
+    index_values[:, 0] = total_open_interest
+    index_values[:, 1:5] = (values[:, :, 1:5] * weights[:, :, np.newaxis]).sum(axis=0)
+    index_values[:, 5] = values[:, :, 5].sum(axis=0)
+
+    return valid, index_values
+
+
 def is_index_contract(vt_symbol):
     symbol, _ = vt_symbol.split(".")
     return symbol.endswith(INDEX_CONTRACT_TAG) or symbol.endswith(TQ_INDEX_TAG)
 
 
+class IndexComponents:
+    """
+    指数成分合约的最新行情，每个合约对应数组中的一行。
+
+    每行保存合约对指数的贡献：价格乘以持仓量，成交量保持不变。合约行情
+    更新时只对该行做增量调整，合成指数时无需遍历所有合约。
+    """
+
+    def __init__(self) -> None:
+        """"""
+        self.rows: Dict[str, int] = {}
+        self.open_interests: List[float] = []
+        self.contributions: np.ndarray = np.zeros((0, len(INDEX_FIELDS)))
+
+        self.total_open_interest: float = 0
+        self.totals: np.ndarray = np.zeros(len(INDEX_FIELDS))
+
+        # 价格字段系数为持仓量，成交量字段系数为1
+        self.factors: np.ndarray = np.ones(len(INDEX_FIELDS))
+        self.update_count: int = 0
+
+    def __len__(self) -> int:
+        """"""
+        return len(self.rows)
+
+    def update_tick(self, tick: TickData) -> None:
+        """
+        更新合约最新行情，并增量调整加权总和。
+        """
+        values = get_index_values(tick)
+
+        # 部分接口的深度行情可能为None
+        if None in values:
+            values = [v or 0 for v in values]
+
+        open_interest = float(tick.open_interest or 0)
+        self.factors[:PRICE_COUNT] = open_interest
+        contribution = np.array(values, dtype=float) * self.factors
+
+        row = self.rows.get(tick.vt_symbol, None)
+        if row is None:
+            row = len(self.rows)
+            self.rows[tick.vt_symbol] = row
+            self.open_interests.append(0)
+            self.contributions = np.vstack([self.contributions, np.zeros(len(INDEX_FIELDS))])
+
+        # 扣除旧行情的贡献，加上新行情的贡献
+        self.total_open_interest += open_interest - self.open_interests[row]
+        self.totals += contribution - self.contributions[row]
+
+        self.open_interests[row] = open_interest
+        self.contributions[row] = contribution
+
+        self.update_count += 1
+        if self.update_count >= RECALCULATE_COUNT:
+            self.recalculate()
+
+    def recalculate(self) -> None:
+        """
+        全量重新计算加权总和，消除累计误差。
+        """
+        self.total_open_interest = sum(self.open_interests)
+        self.totals = self.contributions.sum(axis=0)
+        self.update_count = 0
+
+    def get_index_data(self) -> Optional[tuple]:
+        """
+        返回加权平均价格、成交量总和以及持仓量总和，无持仓时返回None。
+        """
+        if not self.total_open_interest:
+            return None
+
+        prices = self.totals[:PRICE_COUNT] / self.total_open_interest
+        volumes = self.totals[PRICE_COUNT:]
+        return prices, volumes, self.total_open_interest
+
+
 class IndexGenerator(ABC):
 
     def __init__(self, main_engine, event_engine: EventEngine):
@@ -74,7 +228,7 @@ class IndexGenerator(ABC):
         self.subscribe_index_symbol: Set[str] = set()  # 保存已订阅的指数编号
         self.subscribe_index_contract: Dict[str, ContractData] = {}  # 指数合约
         self.subscribe_sec_id: Set[str] = set()  # 保存已经订阅的sec编号
-        self.symbol_tick_dict: Dict[str, dict] = {}  # 保存每个指数的每个合约的最新tick
+        self.index_components: Dict[str, IndexComponents] = {}  # 保存每个指数的成分合约最新行情
         self.symbol_last_tick: Dict[str, TickData] = {}  # 保存每个指数的下的最后一个tick
 
         self.register_event()
@@ -90,40 +244,80 @@ class IndexGenerator(ABC):
         self.subscribe_index_contract[sec_id] = self.main_engine._get_index_contract(req.vt_symbol)
 
     def query_history(self, data: Dict[str, List[BarData]]) -> List[BarData]:
+        # 按位置对齐各合约K线，长度以最短的为准
+        size = min([len(bars or []) for bars in data.values()], default=0)
+        if not size:
+            return []
+
+        # 数组形状为(合约, K线, 字段)
+        field_count = len(BAR_VALUE_FIELDS)
+        values = np.stack([
+            np.fromiter(
+                chain.from_iterable(map(get_bar_values, bars[:size])),
+                dtype=float,
+                count=size * field_count
+            ).reshape(size, field_count)
+            for bars in data.values()
+        ])
+
+        valid, index_values = calculate_index_values(values)
+
+        first_bars = next(iter(data.values()))
+        sec_id = extract_sec_id(first_bars[0].symbol)
+
         result = []
-        for group in zip(*data.values()):
-            tick_data = group[0]
-            sec_id = extract_sec_id(tick_data.symbol)
+        for ix in np.flatnonzero(valid).tolist():
+            bar = first_bars[ix]
+            open_interest, open_price, high_price, low_price, close_price, volume = index_values[ix].tolist()
 
-            index_tick = BarData(
+            index_bar = BarData(
                 symbol=f"{sec_id}{INDEX_CONTRACT_TAG}",
-                exchange=tick_data.exchange,
-                datetime=tick_data.datetime,
-                interval=tick_data.interval,
-                gateway_name=tick_data.gateway_name,
+                exchange=bar.exchange,
+                datetime=bar.datetime,
+                interval=bar.interval,
+                gateway_name=bar.gateway_name,
+                volume=volume,
+                open_interest=open_interest,
+                open_price=open_price,
+                high_price=high_price,
+                low_price=low_price,
+                close_price=close_price,
             )
-            for tick in group:
-                index_tick.open_interest += tick.open_interest
-            if index_tick.open_interest:
-                for tick in group:
-                    tick_weight = float(tick.open_interest) / index_tick.open_interest
-                    index_tick.volume += tick.volume
-
-                    index_tick.open_price += tick.open_price * tick_weight
-                    index_tick.high_price += tick.high_price * tick_weight
-                    index_tick.low_price += tick.low_price * tick_weight
-                    index_tick.close_price += tick.close_price * tick_weight
-                    # 价格取整到最小价位变动
-                # price_tick = self.subscribe_index_contract[sec_id].pricetick
-                #
-                # index_tick.open_price = round_to(index_tick.open_price, price_tick)
-                # index_tick.high_price = round_to(index_tick.high_price, price_tick)
-                # index_tick.low_price = round_to(index_tick.low_price, price_tick)
-                # index_tick.close_price = round_to(index_tick.close_price, price_tick)
-                result.append(index_tick)
+            result.append(index_bar)
 
         return result
 
+    def generate_index_history(self, histories: Dict[str, HistoryArray]) -> HistoryArray:
+        """
+        用各合约的列式K线数据合成指数K线，按时间对齐，缺失的K线不参与加权。
+        """
+        histories = [history for history in histories.values() if len(history)]
+        if not histories:
+            return None
+
+        dts = np.unique(np.concatenate([history.column("datetime") for history in histories]))
+
+        # 数组形状为(合约, K线, 字段)
+        values = np.zeros((len(histories), len(dts), len(BAR_VALUE_FIELDS)))
+        for n, history in enumerate(histories):
+            ix = np.searchsorted(dts, history.column("datetime"))
+            for i, name in enumerate(BAR_VALUE_FIELDS):
+                values[n, ix, i] = history.column(name)
+
+        valid, index_values = calculate_index_values(values)
+
+        array = np.zeros(np.count_nonzero(valid), dtype=BAR_DTYPE)
+        array["datetime"] = dts[valid]
+        for i, name in enumerate(BAR_VALUE_FIELDS):
+            array[name] = index_values[valid, i]
+
+        first = histories[0]
+        sec_id = extract_sec_id(first.symbol)
+
+        index_history = first.new_array(array)
+        index_history.symbol = f"{sec_id}{INDEX_CONTRACT_TAG}"
+        return index_history
+
     def process_tick_event(self, event: Event):
         tick_data = event.data
         vt_symbol = tick_data.vt_symbol
@@ -136,69 +330,47 @@ class IndexGenerator(ABC):
         if tick_data.bid_price_1 > 9999999 or tick_data.ask_price_1 > 9999999:
             return
         # 下面合成最新的指数tick：每秒合成1个
-        symbol_tick_dict = self.symbol_tick_dict.setdefault(sec_id, {})
-        symbol_last_tick = self.symbol_last_tick.get(sec_id)
-        if symbol_last_tick and tick_data.datetime.second != symbol_last_tick.datetime.second and symbol_tick_dict:
-            index_tick = TickData(
-                symbol=f"{sec_id}{INDEX_CONTRACT_TAG}",
-                exchange=tick_data.exchange,
-                datetime=tick_data.datetime,
-                gateway_name=tick_data.gateway_name,
-                name=self.subscribe_index_contract[sec_id].name
-            )
-            for tick in symbol_tick_dict.values():
-                index_tick.open_interest += tick.open_interest
-            if index_tick.open_interest:
-                for tick in symbol_tick_dict.values():
-                    tick_weight = float(tick.open_interest) / index_tick.open_interest
-                    index_tick.last_price += tick.last_price * tick_weight
-                    index_tick.volume += tick.volume
-                    index_tick.last_volume += tick.last_volume
-                    index_tick.limit_up += tick.limit_up * tick_weight
-                    index_tick.limit_down += tick.limit_down * tick_weight
-
-                    index_tick.open_price += tick.open_price * tick_weight
-                    index_tick.high_price += tick.high_price * tick_weight
-                    index_tick.low_price += tick.low_price * tick_weight
-                    index_tick.pre_close += tick.pre_close * tick_weight
-
-                    index_tick.bid_price_1 += tick.bid_price_1 * tick_weight
-                    index_tick.ask_price_1 += tick.ask_price_1 * tick_weight
-                    index_tick.bid_volume_1 += tick.bid_volume_1
-                    index_tick.ask_volume_1 += tick.ask_volume_1
-
-                    # 5档有需要再加进来吧，省点计算资源
-                    # tick_data.ask_price_2 += tick.ask_price_2 * tick_weight
-                    # tick_data.ask_price_3 += tick.ask_price_3 * tick_weight
-                    # tick_data.ask_price_4 += tick.ask_price_4 * tick_weight
-                    # tick_data.ask_price_5 += tick.ask_price_5 * tick_weight
-                    # tick_data.bid_price_2 += tick.bid_price_2 * tick_weight
-                    # tick_data.bid_price_3 += tick.bid_price_3 * tick_weight
-                    # tick_data.bid_price_4 += tick.bid_price_4 * tick_weight
-                    # tick_data.bid_price_5 += tick.bid_price_5 * tick_weight
-                    # tick_data.bid_volume_2 += tick.bid_volume_2 * tick_weight
-                    # tick_data.bid_volume_3 += tick.bid_volume_3 * tick_weight
-                    # tick_data.bid_volume_4 += tick.bid_volume_4 * tick_weight
-                    # tick_data.bid_volume_5 += tick.bid_volume_5 * tick_weight
-                    # tick_data.ask_volume_2 += tick.ask_volume_2 * tick_weight
-                    # tick_data.ask_volume_3 += tick.ask_volume_3 * tick_weight
-                    # tick_data.ask_volume_4 += tick.ask_volume_4 * tick_weight
-                    # tick_data.ask_volume_5 += tick.ask_volume_5 * tick_weight
-                # 价格取整到最小价位变动
-                price_tick = self.subscribe_index_contract[sec_id].pricetick
-                index_tick.last_price = round_to(index_tick.last_price, price_tick)
-
-                index_tick.bid_price_1 = round_to(index_tick.bid_price_1, price_tick)
-                index_tick.ask_price_1 = round_to(index_tick.ask_price_1, price_tick)
-                index_tick.limit_up = round_to(index_tick.limit_up, price_tick)
-                index_tick.limit_down = round_to(index_tick.limit_down, price_tick)
-                index_tick.open_price = round_to(index_tick.open_price, price_tick)
-                index_tick.high_price = round_to(index_tick.high_price, price_tick)
-                index_tick.low_price = round_to(index_tick.low_price, price_tick)
-                index_tick.pre_close = round_to(index_tick.pre_close, price_tick)
+        components = self.index_components.get(sec_id, None)
+        if components is None:
+            components = IndexComponents()
+            self.index_components[sec_id] = components
 
+        symbol_last_tick = self.symbol_last_tick.get(sec_id)
+        if symbol_last_tick and tick_data.datetime.second != symbol_last_tick.datetime.second and components:
+            index_data = components.get_index_data()
+            if index_data:
+                index_tick = self.generate_index_tick(sec_id, tick_data, *index_data)
                 event = Event(EVENT_TICK, index_tick)
                 self.event_engine.put(event)
 
-        symbol_tick_dict[vt_symbol] = tick_data
+        components.update_tick(tick_data)
         self.symbol_last_tick[sec_id] = tick_data
+
+    def generate_index_tick(
+        self,
+        sec_id: str,
+        tick_data: TickData,
+        prices: np.ndarray,
+        volumes: np.ndarray,
+        open_interest: float
+    ) -> TickData:
+        index_tick = TickData(
+            symbol=f"{sec_id}{INDEX_CONTRACT_TAG}",
+            exchange=tick_data.exchange,
+            datetime=tick_data.datetime,
+            gateway_name=tick_data.gateway_name,
+            name=self.subscribe_index_contract[sec_id].name,
+            open_interest=open_interest
+        )
+
+        # 价格取整到最小价位变动
+        price_tick = self.subscribe_index_contract[sec_id].pricetick
+        prices = round_array_to(prices, price_tick)
+
+        for name, value in zip(INDEX_PRICE_FIELDS, prices.tolist()):
+            setattr(index_tick, name, value)
+
+        for name, value in zip(INDEX_VOLUME_FIELDS, volumes.tolist()):
+            setattr(index_tick, name, value)
+
+        return index_tick
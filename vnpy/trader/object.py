@@ -2,15 +2,63 @@
 Basic data structure used for general trading function in VN Trader.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import datetime
 from logging import INFO
+from typing import Callable
 
 from .constant import Direction, Exchange, Interval, Offset, Status, Product, OptionType, OrderType
 
 ACTIVE_STATUSES = set([Status.SUBMITTING, Status.NOTTRADED, Status.PARTTRADED])
 
 
+def add_slots(*names: str) -> Callable[[type], type]:
+    """
+    Recreate dataclass with all fields and names (attributes created in
+    __post_init__) stored in __slots__, so that instances don't need
+    __dict__, and add a fast __copy__ of all slots.
+
+    Instance __dict__ inherited from BaseData is only used when other
+    attributes are set (e.g. extra data of some gateways), which are also
+    copied by __copy__.
+
+    No freeze operation is provided: a frozen subclass would break
+    pickling and codecs looking up data class by type, while copying
+    is already cheap enough for keeping a snapshot of data object.
+    """
+    def wrap(cls: type) -> type:
+        slots = tuple(field.name for field in fields(cls)) + names
+
+        # Default values are already in __init__, remove them from class
+        # attributes which conflict with slots
+        d = dict(cls.__dict__)
+        for name in slots:
+            d.pop(name, None)
+        d.pop("__dict__", None)
+        d.pop("__weakref__", None)
+        d["__slots__"] = slots
+
+        slotted_cls = type(cls)(cls.__name__, cls.__bases__, d)
+
+        # Generate __copy__ assigning slots one by one as dataclass does
+        lines = ["def __copy__(self):", "    obj = new(cls)"]
+        lines.extend(f"    obj.{name} = self.{name}" for name in slots)
+        lines.extend([
+            "    d = self.__dict__",
+            "    if d:",
+            "        obj.__dict__.update(d)",
+            "    return obj"
+        ])
+
+        namespace = {"new": object.__new__, "cls": slotted_cls}
+        exec("\n".join(lines), namespace)
+
+        slotted_cls.__copy__ = namespace["__copy__"]
+        return slotted_cls
+
+    return wrap
+
+
 @dataclass
 class BaseData:
     """
@@ -20,7 +68,16 @@ class BaseData:
 
     gateway_name: str
 
+    def to_dict(self) -> dict:
+        """
+        Get all attributes of data object, including those in __slots__.
+        """
+        d = {name: getattr(self, name) for name in getattr(type(self), "__slots__", ())}
+        d.update(self.__dict__)
+        return d
+
 
+@add_slots("vt_symbol")
 @dataclass
 class TickData(BaseData):
     """
@@ -76,6 +133,7 @@ class TickData(BaseData):
         self.vt_symbol = f"{self.symbol}.{self.exchange.value}"
 
 
+@add_slots("vt_symbol")
 @dataclass
 class BarData(BaseData):
     """
@@ -134,9 +134,12 @@ class RqdataClient:
 
         return rq_symbol
 
-    def query_history(self, req: HistoryRequest) -> Optional[List[BarData]]:
+    def query_history(self, req: HistoryRequest, extend_end: bool = True) -> Optional[List[BarData]]:
         """
         Query history bar data from RQData.
+
+        End is extended by one day to include night trading data after
+        end date, unless extend_end is False.
         """
         if self.symbols is None:
             return None
@@ -159,7 +162,8 @@ class RqdataClient:
         adjustment = INTERVAL_ADJUSTMENT_MAP[interval]
 
         # For querying night trading period data
-        end += timedelta(1)
+        if extend_end:
+            end += timedelta(1)
 
         # Only query open interest for futures contract
         fields = ["open", "high", "low", "close", "volume"]
@@ -200,9 +204,12 @@ class RqdataClient:
 
         return data
 
-    def query_tick_history(self, req: HistoryRequest) -> Optional[List[TickData]]:
+    def query_tick_history(self, req: HistoryRequest, extend_end: bool = True) -> Optional[List[TickData]]:
         """
-        Query history bar data from RQData.
+        Query history tick data from RQData.
+
+        End is extended by one day to include night trading data after
+        end date, unless extend_end is False.
         """
         if self.symbols is None:
             return None
@@ -217,7 +224,8 @@ class RqdataClient:
             return None
 
         # For querying night trading period data
-        end += timedelta(1)
+        if extend_end:
+            end += timedelta(1)
 
         # Only query open interest for futures contract
         fields = [
@@ -35,6 +35,7 @@ SETTINGS: Dict[str, Any] = {
     "database.user": "root",
     "database.password": "",
     "database.authentication_source": "admin",  # for mongodb
+    "database.cache": False,                    # cache history data on local disk
 
     "genus.parent_host": "",
     "genus.parent_port": "",
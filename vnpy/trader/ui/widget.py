@@ -192,6 +192,7 @@ class BaseMonitor(QtWidgets.QTableWidget):
     event_type: str = ""
     data_key: str = ""
     sorting: bool = False
+    conflate: bool = False
     headers: Dict[str, dict] = {}
 
     signal: QtCore.pyqtSignal = QtCore.pyqtSignal(Event)
@@ -251,7 +252,9 @@ class BaseMonitor(QtWidgets.QTableWidget):
         """
         if self.event_type:
             self.signal.connect(self.process_event)
-            self.event_engine.register(self.event_type, self.signal.emit)
+            self.event_engine.register(
+                self.event_type, self.signal.emit, conflate=self.conflate
+            )
 
     def process_event(self, event: Event) -> None:
         """
@@ -374,6 +377,7 @@ class TickMonitor(BaseMonitor):
     event_type = EVENT_TICK
     data_key = "vt_symbol"
     sorting = True
+    conflate = True
 
     headers = {
         "symbol": {"display": "代码", "cell": BaseCell, "update": False},
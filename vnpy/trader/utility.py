@@ -4,11 +4,14 @@ General utility functions.
 
 import json
 import logging
+import os
 import sys
+from copy import copy
 from pathlib import Path
-from typing import Callable, Dict, Tuple, Union, Optional
+from threading import Condition, Event, Lock, Thread
+from typing import Any, Callable, Dict, List, Tuple, Union, Optional
 from decimal import Decimal
-from math import floor, ceil
+from math import floor, ceil, sqrt
 
 import numpy as np
 import talib
@@ -117,6 +120,111 @@ def save_json(filename: str, data: dict) -> None:
         )
 
 
+class JsonStore:
+    """
+    Write-behind json file in temp path.
+
+    Data saved is written into file by a background thread, at most
+    once every interval seconds, so that frequent saving on event thread
+    won't be blocked by file writing. Only the latest data is written if
+    saved more than once within interval.
+
+    File is written into a temp file first and then renamed, so it won't
+    be corrupted if the program exits during writing. Call flush to write
+    immediately, and close to write data left before exit.
+    """
+
+    def __init__(self, filename: str, interval: float = 1):
+        """"""
+        self.filename: str = filename
+        self.filepath: Path = get_file_path(filename)
+        self.interval: float = interval
+
+        self.data: Any = None
+        self.dirty: bool = False
+        self.condition: Condition = Condition()
+
+        # Make sure file is written by one thread at a time
+        self.write_lock: Lock = Lock()
+
+        self.active: bool = True
+        self.stop_event: Event = Event()
+        self.thread: Thread = Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def load(self) -> Any:
+        """
+        Load data from json file.
+        """
+        return load_json(self.filename)
+
+    def save(self, data: Any) -> None:
+        """
+        Save data into json file later. Data is shallow copied, so the
+        same dict/list can be modified and saved again, while values
+        inside should not be modified after saved.
+        """
+        with self.condition:
+            self.data = copy(data)
+            self.dirty = True
+            self.condition.notify()
+
+    def flush(self) -> None:
+        """
+        Write data saved into file immediately.
+        """
+        with self.write_lock:
+            with self.condition:
+                if not self.dirty:
+                    return
+                data = self.data
+                self.dirty = False
+
+            # Serialize on the calling thread (usually the writer thread)
+            # instead of in save, to keep event thread unblocked
+            try:
+                text = json.dumps(data, indent=4, ensure_ascii=False)
+
+                temp_path = self.filepath.with_name(self.filepath.name + ".tmp")
+                with open(temp_path, mode="w+", encoding="UTF-8") as f:
+                    f.write(text)
+                os.replace(temp_path, self.filepath)
+            except Exception:
+                # Keep data dirty to be written again later
+                with self.condition:
+                    self.dirty = True
+                raise
+
+    def close(self) -> None:
+        """
+        Stop background thread and write data left.
+        """
+        if self.active:
+            self.active = False
+            self.stop_event.set()
+
+            with self.condition:
+                self.condition.notify()
+            self.thread.join()
+
+        self.flush()
+
+    def run(self) -> None:
+        """"""
+        while self.active:
+            with self.condition:
+                while self.active and not self.dirty:
+                    self.condition.wait()
+
+            try:
+                self.flush()
+            except Exception:
+                logging.exception("Failed to write %s", self.filename)
+
+            # Wait for more data to be saved within interval
+            self.stop_event.wait(self.interval)
+
+
 def round_to(value: float, target: float) -> float:
     """
     Round price to price tick value.
@@ -937,6 +1045,336 @@ class ArrayManager(object):
         return result[-1]
 
 
+class SmoothingIndicator:
+    """
+    Exponential smoothing of input values in a moving window, which is
+    seeded with simple average of the first n values in window. This is
+    the same way TA-Lib calculates EMA/ATR/RSI on the window, but last
+    value is updated in O(1) time when window moves forward.
+    """
+
+    def __init__(self, values: np.ndarray, n: int, decay: float):
+        """"""
+        self.n: int = n
+        self.decay: float = decay
+
+        self.window: int = len(values)
+        self.values: np.ndarray = np.array(values, dtype=float)
+        self.head: int = 0                  # Index of first value in window
+
+        # Weight of seed average in last value
+        self.seed_weight: float = decay ** (self.window - n)
+
+        self.seed_sum: float = self.values[:n].sum()
+
+        weights = decay ** np.arange(self.window - n - 1, -1, -1)
+        self.weighted_sum: float = (self.values[n:] * weights).sum()
+
+    def update(self, value: float) -> None:
+        """
+        Move window forward with a new input value.
+        """
+        values = self.values
+        window = self.window
+        head = self.head
+
+        first = values[head]
+        middle = values[(head + self.n) % window]
+
+        self.seed_sum += middle - first
+        self.weighted_sum = value + self.decay * self.weighted_sum - self.seed_weight * middle
+
+        values[head] = value
+        self.head = (head + 1) % window
+
+        # Recalculate sums once every window to eliminate rounding drift
+        if not self.head:
+            self.recalculate()
+
+    def recalculate(self) -> None:
+        """
+        Calculate sums from values in window.
+        """
+        values = np.roll(self.values, -self.head)
+        n = self.n
+
+        self.seed_sum = values[:n].sum()
+
+        weights = self.decay ** np.arange(self.window - n - 1, -1, -1)
+        self.weighted_sum = (values[n:] * weights).sum()
+
+    @property
+    def value(self) -> float:
+        """
+        Smoothed value of the last input in window.
+        """
+        return (
+            self.seed_weight * self.seed_sum / self.n
+            + (1 - self.decay) * self.weighted_sum
+        )
+
+
+class RollingWindow:
+    """
+    Running sum and sum of squares of the last n input values.
+
+    Sums are kept of deviations from an anchor value close to the window
+    mean, since running sum of squares of raw values loses precision when
+    price is large compared with its changes.
+    """
+
+    def __init__(self, values: np.ndarray):
+        """"""
+        self.n: int = len(values)
+        self.values: np.ndarray = np.array(values, dtype=float)
+        self.head: int = 0
+
+        self.anchor: float = 0
+        self.total: float = 0
+        self.total_square: float = 0
+        self.recalculate()
+
+    def recalculate(self) -> None:
+        """
+        Re-anchor to mean of window and recalculate sums exactly.
+        """
+        self.anchor = self.values.mean()
+
+        deviations = self.values - self.anchor
+        self.total = deviations.sum()
+        self.total_square = np.dot(deviations, deviations)
+
+    def update(self, value: float) -> None:
+        """
+        Move window forward with a new input value.
+        """
+        new_deviation = value - self.anchor
+        old_deviation = self.values[self.head] - self.anchor
+
+        self.total += new_deviation - old_deviation
+        self.total_square += new_deviation * new_deviation - old_deviation * old_deviation
+
+        self.values[self.head] = value
+        self.head = (self.head + 1) % self.n
+
+        # Recalculate once every window to eliminate rounding drift
+        if not self.head:
+            self.recalculate()
+
+    @property
+    def mean(self) -> float:
+        """"""
+        return self.anchor + self.total / self.n
+
+    @property
+    def std(self) -> float:
+        """
+        Population standard deviation.
+        """
+        mean_deviation = self.total / self.n
+        variance = self.total_square / self.n - mean_deviation * mean_deviation
+        return sqrt(max(variance, 0))
+
+
+class IncrementalArrayManager(ArrayManager):
+    """
+    ArrayManager with ring buffer data storage and O(1) updated indicators.
+
+    Price arrays are stored in ring buffers of twice the size, every
+    value is written twice so that the latest window is always available
+    as a continuous array view without shifting data.
+
+    Indicator state of sma/ema/std/atr/rsi (and boll/keltner based on
+    them) is created on first call, and then updated incrementally on
+    every new bar. Other indicators and array results fall back to TA-Lib
+    on the window arrays.
+    """
+
+    def __init__(self, size: int = 100):
+        """Constructor"""
+        super().__init__(size)
+
+        self.pos: int = 0       # Position of the oldest value in window
+
+        self.open_buffer: np.ndarray = np.zeros(size * 2)
+        self.high_buffer: np.ndarray = np.zeros(size * 2)
+        self.low_buffer: np.ndarray = np.zeros(size * 2)
+        self.close_buffer: np.ndarray = np.zeros(size * 2)
+        self.volume_buffer: np.ndarray = np.zeros(size * 2)
+        self.open_interest_buffer: np.ndarray = np.zeros(size * 2)
+
+        self.indicators: Dict[Tuple[str, int], Any] = {}
+
+        # Update functions of indicator states grouped by input value
+        self.close_updates: List[Callable] = []
+        self.range_updates: List[Callable] = []
+        self.gain_updates: List[Callable] = []
+        self.loss_updates: List[Callable] = []
+
+    def update_bar(self, bar: BarData) -> None:
+        """
+        Update new bar data into array manager.
+        """
+        self.count += 1
+        if not self.inited and self.count >= self.size:
+            self.inited = True
+
+        size = self.size
+        pos = self.pos
+        pre_close = self.close_buffer[pos + size - 1]
+
+        # Overwrite the oldest value in both halves of buffer
+        self.open_buffer[pos] = self.open_buffer[pos + size] = bar.open_price
+        self.high_buffer[pos] = self.high_buffer[pos + size] = bar.high_price
+        self.low_buffer[pos] = self.low_buffer[pos + size] = bar.low_price
+        self.close_buffer[pos] = self.close_buffer[pos + size] = bar.close_price
+        self.volume_buffer[pos] = self.volume_buffer[pos + size] = bar.volume
+        self.open_interest_buffer[pos] = self.open_interest_buffer[pos + size] = bar.open_interest
+
+        self.pos = (pos + 1) % size
+
+        if not self.indicators:
+            return
+
+        close_price = bar.close_price
+        for func in self.close_updates:
+            func(close_price)
+
+        if self.range_updates:
+            true_range = max(bar.high_price, pre_close) - min(bar.low_price, pre_close)
+            for func in self.range_updates:
+                func(true_range)
+
+        if self.gain_updates:
+            close_change = close_price - pre_close
+            gain = max(close_change, 0)
+            loss = max(-close_change, 0)
+
+            for func in self.gain_updates:
+                func(gain)
+            for func in self.loss_updates:
+                func(loss)
+
+    def get_indicator(self, name: str, n: int) -> Any:
+        """
+        Get indicator state, create it from current window if not exists.
+        """
+        key = (name, n)
+        indicator = self.indicators.get(key, None)
+        if indicator:
+            return indicator
+
+        if name == "window":
+            indicator = RollingWindow(self.close[-n:])
+            self.close_updates.append(indicator.update)
+        elif name == "ema":
+            indicator = SmoothingIndicator(self.close, n, 1 - 2 / (n + 1))
+            self.close_updates.append(indicator.update)
+        elif name == "atr":
+            true_range = talib.TRANGE(self.high, self.low, self.close)[1:]
+            indicator = SmoothingIndicator(true_range, n, 1 - 1 / n)
+            self.range_updates.append(indicator.update)
+        elif name == "rsi":
+            close_change = np.diff(self.close)
+            gain_indicator = SmoothingIndicator(np.maximum(close_change, 0), n, 1 - 1 / n)
+            loss_indicator = SmoothingIndicator(np.maximum(-close_change, 0), n, 1 - 1 / n)
+            self.gain_updates.append(gain_indicator.update)
+            self.loss_updates.append(loss_indicator.update)
+            indicator = (gain_indicator, loss_indicator)
+
+        self.indicators[key] = indicator
+        return indicator
+
+    @property
+    def open(self) -> np.ndarray:
+        """
+        Get open price time series.
+        """
+        return self.open_buffer[self.pos:self.pos + self.size]
+
+    @property
+    def high(self) -> np.ndarray:
+        """
+        Get high price time series.
+        """
+        return self.high_buffer[self.pos:self.pos + self.size]
+
+    @property
+    def low(self) -> np.ndarray:
+        """
+        Get low price time series.
+        """
+        return self.low_buffer[self.pos:self.pos + self.size]
+
+    @property
+    def close(self) -> np.ndarray:
+        """
+        Get close price time series.
+        """
+        return self.close_buffer[self.pos:self.pos + self.size]
+
+    @property
+    def volume(self) -> np.ndarray:
+        """
+        Get trading volume time series.
+        """
+        return self.volume_buffer[self.pos:self.pos + self.size]
+
+    @property
+    def open_interest(self) -> np.ndarray:
+        """
+        Get open interest time series.
+        """
+        return self.open_interest_buffer[self.pos:self.pos + self.size]
+
+    def sma(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
+        """
+        Simple moving average.
+        """
+        if array:
+            return super().sma(n, array)
+        return self.get_indicator("window", n).mean
+
+    def ema(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
+        """
+        Exponential moving average.
+        """
+        if array:
+            return super().ema(n, array)
+        return self.get_indicator("ema", n).value
+
+    def std(self, n: int, nbdev: int = 1, array: bool = False) -> Union[float, np.ndarray]:
+        """
+        Standard deviation.
+        """
+        if array:
+            return super().std(n, nbdev, array)
+        return self.get_indicator("window", n).std * nbdev
+
+    def atr(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
+        """
+        Average True Range (ATR).
+        """
+        if array:
+            return super().atr(n, array)
+        return self.get_indicator("atr", n).value
+
+    def rsi(self, n: int, array: bool = False) -> Union[float, np.ndarray]:
+        """
+        Relative Strenght Index (RSI).
+        """
+        if array:
+            return super().rsi(n, array)
+
+        gain_indicator, loss_indicator = self.get_indicator("rsi", n)
+        gain = gain_indicator.value
+        loss = loss_indicator.value
+
+        if gain + loss:
+            return 100 * gain / (gain + loss)
+        return 0
+
+
 def virtual(func: Callable) -> Callable:
     """
     mark a function as "virtual", which means that this function can be override.